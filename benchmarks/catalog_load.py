@@ -0,0 +1,85 @@
+"""Load-time benchmark for tariff catalogs.
+
+Writes a synthetic NDJSON catalog of time-of-use tariffs, then times:
+    - building each tariff independently, with parse_catalog of a catalog of it alone (one validation per sub-object)
+    - building the catalog with load_catalog (shared, cached sub-objects)
+    - compiling the catalog and opening the saved plans as a memory-mapped PlanCatalog
+
+Usage:
+    python benchmarks/catalog_load.py [n_tariffs]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from pytariff.core.catalog import compile_catalog, load_catalog, parse_catalog
+from pytariff.core.plan import PlanCatalog, save_plans
+
+STATES = ["NSW", "VIC", "QLD", "SA", "TAS"]
+
+
+def _child(start: str, end: str, rate: float, state: str) -> dict[str, Any]:
+    return {
+        "start_time": start,
+        "end_time": end,
+        "tzinfo": "Australia/Sydney",
+        "days_applied": {
+            "day_types": ["BUSINESS_DAYS"],
+            "holidays": {"country": "AU", "subdiv": state, "years": [2023]},
+        },
+        "charge": {
+            "blocks": [
+                {"rate": {"currency": "AUD", "value": rate}, "from_quantity": 0, "to_quantity": 10},
+                {"rate": {"currency": "AUD", "value": rate / 2}, "from_quantity": 10, "to_quantity": float("inf")},
+            ],
+            "unit": {"metric": "kWh", "convention": "Passive", "direction": "Import"},
+            "reset_data": {"anchor": "2023-01-01T00:00:00+11:00", "period": "1D"},
+        },
+    }
+
+
+def tariff_record(n: int) -> dict[str, Any]:
+    state = STATES[n % len(STATES)]
+    peak_rate = round(0.3 + (n % 20) / 100, 2)
+    return {
+        "key": f"tou-{n}",
+        "type": "TimeOfUseTariff",
+        "start": "2023-01-01",
+        "end": "2023-12-31",
+        "tzinfo": "Australia/Sydney",
+        "children": [
+            _child("16:00", "21:00", peak_rate, state),
+            _child("21:00", "16:00", 0.2, state),
+        ],
+    }
+
+
+def timed(label: str, fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main(n_tariffs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path, plans_path = Path(tmp) / "catalog.ndjson", Path(tmp) / "plans.arrow"
+        lines = [json.dumps(tariff_record(n)) for n in range(n_tariffs)]
+        catalog_path.write_text("\n".join(lines))
+        print(f"{n_tariffs} tariffs")
+
+        timed("independent construction", lambda: [parse_catalog(line) for line in lines])
+        catalog = timed("load_catalog", lambda: load_catalog(catalog_path))
+
+        plans = timed("compile_catalog", lambda: compile_catalog(catalog))
+        timed("save_plans", lambda: save_plans(plans_path, plans))
+        plan_catalog = timed("PlanCatalog (open)", lambda: PlanCatalog(plans_path))
+        timed("PlanCatalog (build every plan)", lambda: [plan_catalog[key] for key in plan_catalog])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
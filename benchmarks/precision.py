@@ -0,0 +1,99 @@
+"""Memory and throughput benchmark for single precision plan evaluation.
+
+Evaluates a time-of-use tariff with a monthly peak demand charge over a synthetic (T, N) fleet of meters, at double
+and at single precision, and reports for each:
+    - the time taken
+    - the peak memory allocated by the evaluation (by tracemalloc, which tracks NumPy allocations)
+    - the greatest relative error of the total cost of any meter, against double precision
+
+Usage:
+    python benchmarks/precision.py [n_meters] [n_days]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from datetime import time as time_of_day
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
+from pytariff.core.plan import TariffPlan
+from pytariff.core.precision import Precision
+from pytariff.core.rate import TariffRate
+from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection, UsageChargeMethod
+
+UTC = ZoneInfo("UTC")
+UNIT = TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive)
+DAYS_APPLIED = DaysApplied(day_types=(DayType.ALL_DAYS,))
+
+
+def _interval(start: int, end: int, charge: TariffCharge) -> TariffInterval:
+    return TariffInterval(
+        start_time=time_of_day(start),
+        end_time=time_of_day(end),
+        days_applied=DAYS_APPLIED,
+        tzinfo=UTC,
+        charge=charge,
+    )
+
+
+def build_plan() -> TariffPlan:
+    """Off-peak and shoulder energy charges, in two blocks, and a monthly demand charge in the peak period"""
+
+    def energy(rate: float) -> TariffCharge:
+        return TariffCharge(
+            blocks=(
+                TariffBlock(rate=TariffRate("AUD", rate), from_quantity=0, to_quantity=1),
+                TariffBlock(rate=TariffRate("AUD", rate / 2), from_quantity=1, to_quantity=float("inf")),
+            ),
+            unit=UNIT,
+            reset_data=None,
+        )
+
+    demand = TariffCharge(
+        blocks=(TariffBlock(rate=TariffRate("AUD", 0.25), from_quantity=0, to_quantity=float("inf")),),
+        unit=UNIT,
+        reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.FIRST_OF_MONTH),
+        method=UsageChargeMethod.max,
+    )
+    children = (_interval(21, 7, energy(0.2)), _interval(7, 16, energy(0.3)), _interval(16, 21, demand))
+    start, end = datetime(2023, 1, 1, tzinfo=UTC), datetime(2023, 12, 31, tzinfo=UTC)
+    return GenericTariff(start=start, end=end, children=children).compile()
+
+
+def measured(label: str, fn: Callable[[], tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+    tracemalloc.start()
+    start = time.perf_counter()
+    import_cost, export_cost = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<20} {elapsed:8.3f} s {peak / 2**20:10.1f} MiB peak {import_cost.nbytes / 2**20:10.1f} MiB costs")
+    return import_cost.sum(axis=(0, 1), dtype=np.float64) + export_cost.sum(axis=(0, 1), dtype=np.float64)
+
+
+def main(n_meters: int, n_days: int) -> None:
+    plan = build_plan()
+    index = pd.date_range(start="2023-01-01", periods=n_days * 48, freq="30min", tz=UTC)
+    usage = -np.random.default_rng(0).uniform(0, 2, (len(index), n_meters))
+    print(f"{len(index)} intervals x {n_meters} meters")
+
+    double = measured("double", lambda: plan.evaluate(index, usage))
+    single = measured("single", lambda: plan.evaluate(index, usage, precision=Precision.SINGLE))
+    print(f"{'max relative error':<20} {np.max(np.abs(single - double) / np.abs(double)):8.1e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000, int(sys.argv[2]) if len(sys.argv) > 2 else 364)
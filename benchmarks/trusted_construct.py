@@ -0,0 +1,74 @@
+"""Construction-time benchmark for trusted tariff models.
+
+Times building a time-of-use tariff tree with validation, with construct, and with construct followed by
+validate_tree.
+
+Usage:
+    python benchmarks/trusted_construct.py [n_builds]
+"""
+
+import sys
+import time
+from datetime import datetime
+from datetime import time as time_of_day
+from typing import Any, Callable
+from zoneinfo import ZoneInfo
+
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
+from pytariff.core.rate import TariffRate
+from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.tariff import TimeOfUseTariff
+from pytariff.core.trusted import construct, validate_tree
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection
+
+UTC = ZoneInfo("UTC")
+UNIT = TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive)
+RESET_DATA = ResetData(anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.DAILY)
+DAYS_APPLIED = DaysApplied(day_types=(DayType.ALL_DAYS,))
+HOURS = range(0, 24, 3)
+
+
+def build(make: Callable[..., Any]) -> TimeOfUseTariff:
+    """Build an eight period time-of-use tariff with three blocks per period, using make(cls, **fields)"""
+
+    children = []
+    for hour in HOURS:
+        blocks = tuple(
+            make(TariffBlock, rate=TariffRate("AUD", 0.1 * hour), from_quantity=lo, to_quantity=hi)
+            for lo, hi in ((0.0, 10.0), (10.0, 100.0), (100.0, float("inf")))
+        )
+        charge = make(TariffCharge, blocks=blocks, unit=UNIT, reset_data=RESET_DATA)
+        children.append(
+            make(
+                TariffInterval,
+                start_time=time_of_day(hour, tzinfo=UTC),
+                end_time=time_of_day((hour + 3) % 24, tzinfo=UTC),
+                days_applied=DAYS_APPLIED,
+                tzinfo=UTC,
+                charge=charge,
+            )
+        )
+
+    start, end = datetime(2023, 1, 1, tzinfo=UTC), datetime(2023, 12, 31, tzinfo=UTC)
+    return make(TimeOfUseTariff, start=start, end=end, tzinfo=UTC, children=tuple(children))
+
+
+def timed(label: str, n: int, fn: Callable[[], Any]) -> None:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    print(f"{label:<40} {1e6 * (time.perf_counter() - start) / n:10.1f} us per tariff")
+
+
+def main(n: int) -> None:
+    timed("validated", n, lambda: build(lambda cls, **kwargs: cls(**kwargs)))
+    timed("construct", n, lambda: build(construct))
+    timed("construct + validate_tree", n, lambda: validate_tree(build(construct)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
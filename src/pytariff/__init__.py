@@ -19,6 +19,10 @@ __all__ = [
     "UsageChargeMethod",
     "ResetData",
     "ResetPeriod",
+    "ResetScope",
+    "Ratchet",
+    "BillingData",
+    "BillingPeriod",
     "TariffRate",
     "TariffInterval",
     "ConsumptionInterval",
@@ -34,7 +38,8 @@ from .core.charge import TariffCharge
 from .core.day import DayType, DaysApplied
 from .core.typing import Consumption, Demand
 from .core.unit import TariffUnit, SignConvention, TradeDirection, UsageChargeMethod
-from .core.reset import ResetData, ResetPeriod
+from .core.reset import Ratchet, ResetData, ResetPeriod, ResetScope
+from .core.billing import BillingData, BillingPeriod
 from .core.rate import TariffRate
 from .core.interval import TariffInterval, ConsumptionInterval, DemandInterval
 
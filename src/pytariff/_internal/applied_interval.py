@@ -3,12 +3,18 @@ from typing import Optional
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
+import numpy as np
+import pandas as pd
 from pydantic import UUID4, BaseModel, ConfigDict, Field, model_validator
 
-from pytariff._internal import helper
+from pytariff._internal import helper, period
 from pytariff.core.day import DaysApplied  # _internal shouldn't import from core...
 
 
+def _time_ns(t: time) -> int:
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000_000 + t.microsecond * 1_000
+
+
 class AppliedInterval(BaseModel):
     """An AppliedInterval is a right-open time interval over [start_time, end_time) where
     start_time <= end_time, or over (end_time, start_time] where end_time < start_time.
@@ -102,12 +108,36 @@ class AppliedInterval(BaseModel):
             return other in self.days_applied
 
         elif helper.is_datetime_type(other):
-            if self.start_time <= self.end_time:
-                return self.start_time <= other.timetz() < self.end_time and other in self.days_applied
-            return (self.start_time <= other.timetz() or other.timetz() < self.end_time) and other in self.days_applied
+            # compared on the wall clock of the interval, as an aware time holds a fixed offset (see contains_index)
+            local = other.astimezone(self.start_time.tzinfo)
+            t, start, end = local.time(), self.start_time.replace(tzinfo=None), self.end_time.replace(tzinfo=None)
+            in_window = start <= t < end if start <= end else (start <= t or t < end)
+            return in_window and local in self.days_applied
 
         return False
 
+    def contains_index(self, index: pd.DatetimeIndex) -> np.ndarray:
+        """Whether each element of the tz-aware index is in self, as by __contains__ but for the whole index at once.
+
+        Each element is converted to the wall clock of self.start_time.tzinfo, on which the time window and
+        days applied are tested. Across daylight saving transitions, wall-clock times which occur twice (when
+        clocks are set back) are in the window on both occasions, while those which are skipped (when clocks
+        are set forward) never occur. Elements of a naive index are never contained, as for naive datetimes.
+        """
+
+        if self.start_time is None or self.end_time is None or index.tz is None:
+            return np.zeros(len(index), dtype=bool)
+
+        wall_ns = period.to_wall_ns(index, self.start_time.tzinfo)
+        days = wall_ns // period.NS_PER_DAY
+        time_ns = wall_ns - days * period.NS_PER_DAY
+        start, end = _time_ns(self.start_time), _time_ns(self.end_time)
+        if start <= end:
+            in_window = (start <= time_ns) & (time_ns < end)
+        else:
+            in_window = (start <= time_ns) | (time_ns < end)
+        return in_window & self.days_applied.contains_days(days)
+
     def __and__(self, other: "AppliedInterval") -> Optional["AppliedInterval"]:
         """The intersection between two right-open intervals [a, b) and [c, d) is the set of all values that belong
         to both, being:
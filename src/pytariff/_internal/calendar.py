@@ -0,0 +1,80 @@
+"""Holiday calendars expanded into day-number bitsets, for checking whole indexes against holidays at once.
+
+A holidays.HolidayBase generates each year lazily and parses its argument on every membership query. A
+CalendarIndex instead holds one boolean per day over a fixed range of days, such that the holidays of an
+array of day numbers (days since 1970-01-01) are found with a single gather.
+"""
+
+from dataclasses import dataclass
+from datetime import date, tzinfo as tzinfo_type
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from holidays import HolidayBase
+
+from pytariff._internal import period
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_number(d: date) -> int:
+    """Days since 1970-01-01"""
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def local_days(index: pd.DatetimeIndex, tzinfo: Optional[tzinfo_type] = None) -> np.ndarray:
+    """Day numbers of each element of index, on the wall clock of tzinfo, else its own (or as given, if index is
+    naive)"""
+
+    return period.to_wall_ns(index, tzinfo or index.tz) // period.NS_PER_DAY
+
+
+@dataclass(frozen=True)
+class CalendarIndex:
+    """The holidays of a calendar on each day from first_day, as one boolean per day. Days outside of the
+    range of the index are never holidays."""
+
+    first_day: int
+    is_holiday: np.ndarray
+
+    @classmethod
+    def from_days(cls, holidays: Iterable[int], first_day: int, last_day: int) -> "CalendarIndex":
+        """Build an index over [first_day, last_day] from the day numbers of holidays"""
+
+        holidays = np.fromiter(holidays, dtype=np.int64)
+        holidays = holidays[(holidays >= first_day) & (holidays <= last_day)]
+        is_holiday = np.zeros(max(last_day - first_day + 1, 0), dtype=bool)
+        is_holiday[holidays - first_day] = True
+        is_holiday.flags.writeable = False
+        return cls(first_day=first_day, is_holiday=is_holiday)
+
+    @classmethod
+    def from_holidays(cls, holidays: HolidayBase, first_day: int, last_day: int) -> "CalendarIndex":
+        """Build an index over [first_day, last_day], expanding the calendar over those years where it allows"""
+
+        first, last = date.fromordinal(first_day + _EPOCH_ORDINAL), date.fromordinal(last_day + _EPOCH_ORDINAL)
+        for year in range(first.year, last.year + 1):
+            date(year, 1, 1) in holidays  # populates the year iff the calendar is expandable
+        return cls.from_days((day_number(d) for d in holidays.keys() if first <= d <= last), first_day, last_day)
+
+    @classmethod
+    def for_days(cls, holidays: HolidayBase, days: np.ndarray) -> "CalendarIndex":
+        """Build an index covering every day number in days"""
+
+        if len(days) == 0:
+            return cls.from_days((), 0, -1)
+        return cls.from_holidays(holidays, int(days.min()), int(days.max()))
+
+    def holidays(self, days: np.ndarray) -> np.ndarray:
+        """Whether each of the day numbers in days is a holiday"""
+
+        offset = np.asarray(days, dtype=np.int64) - self.first_day
+        in_range = (offset >= 0) & (offset < len(self.is_holiday))
+        if not in_range.any():
+            return in_range
+        return in_range & self.is_holiday[np.where(in_range, offset, 0)]
+
+    def business_days(self, days: np.ndarray) -> np.ndarray:
+        """Whether each of the day numbers in days is a business day, being any day which is not a holiday"""
+        return ~self.holidays(days)
@@ -6,7 +6,7 @@ import pandas as pd
 
 from pydantic import UUID4, BaseModel, ConfigDict, Field, model_validator
 
-from pytariff._internal import helper
+from pytariff._internal import helper, overlap
 from pytariff._internal.applied_interval import AppliedInterval
 
 
@@ -57,26 +57,13 @@ class DefinedInterval(BaseModel):
 
     @model_validator(mode="after")
     def validate_children_cannot_overlap(self) -> "DefinedInterval":
-        """An overlap between AppliedIntervals is defined as when:
-        TODO
+        """An overlap between two children is defined as when their intersection (see AppliedInterval.__and__
+        and TariffInterval.__and__) is non-empty in both time and days applied. See overlap.py.
         """
         if self.children is None:
             return self
 
-        for i, x in enumerate(self.children):
-            for j, y in enumerate(self.children):
-                if i != j:
-                    intersection = x & y
-                    if (
-                        intersection is None
-                        or intersection._is_empty()
-                        or intersection._contains_day_type_only()
-                        or intersection._contains_time_only()
-                    ):
-                        continue
-                    else:
-                        raise ValueError
-
+        overlap.validate_children_cannot_overlap(self.children)
         return self
 
     @model_validator(mode="after")
@@ -84,11 +71,8 @@ class DefinedInterval(BaseModel):
         if self.children is None:
             return self
 
-        for i, x in enumerate(self.children):
-            for j, y in enumerate(self.children):
-                if i != j:
-                    if x.tzinfo != y.tzinfo:
-                        raise ValueError
+        if any(x.tzinfo != self.children[0].tzinfo for x in self.children):
+            raise ValueError
         return self
 
     def __contains__(self, other: datetime | date | pd.Timestamp, tzinfo: Optional[timezone | ZoneInfo] = None) -> bool:
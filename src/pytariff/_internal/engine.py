@@ -0,0 +1,352 @@
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pytariff._internal import calendar, helper, kernels, schedule, segment
+from pytariff.core.charge import TariffCharge
+from pytariff.core.fixed_point import FixedPoint
+from pytariff.core.precision import Precision
+from pytariff.core.plan import (
+    CONVENTIONS,
+    EXPORT,
+    IMPORT,
+    AS_OF,
+    METHODS,
+    NO_MARKET,
+    NO_RESET,
+    RESET_PERIODS,
+    RESET_SCOPES,
+    TariffPlan,
+)
+from pytariff.core.prices import PRICES
+from pytariff.core.rate import asof_prices
+from pytariff.core.reducer import REDUCERS
+from pytariff.core.reset import ResetScope
+from pytariff.core.unit import UsageChargeMethod
+
+
+def _reset_reference(plan: TariffPlan, index: pd.DatetimeIndex) -> pd.Timestamp:
+    # NOTE Metering data which begins before the tariff is reset relative to the start of the metering data
+    reference = pd.Timestamp(plan.start, tz="UTC").tz_convert(helper.tz_from_key(plan.tz))
+    if len(index) and index[0] < reference:
+        reference = index[0]
+    return reference
+
+
+def _reset_ids(plan: TariffPlan, i: int, index: pd.DatetimeIndex, reference: pd.Timestamp) -> np.ndarray:
+    code = int(plan.child_reset_period[i])
+    if code == NO_RESET:
+        return np.ones(len(index), dtype=np.int64)
+    return RESET_PERIODS[code]._period_ids(index, reference=reference)
+
+
+def validity_rows(plan: TariffPlan, index: pd.DatetimeIndex) -> slice | np.ndarray:
+    """The rows of index within [plan.start, plan.end], found by two binary searches where index is sorted. Unordered
+    indexes (e.g. of contains_index) are masked, but cannot be evaluated, which requires a sorted index."""
+
+    utc_ns = index.as_unit("ns").asi8
+    if index.is_monotonic_increasing:
+        return slice(int(np.searchsorted(utc_ns, plan.start, "left")), int(np.searchsorted(utc_ns, plan.end, "right")))
+    return np.flatnonzero((utc_ns >= plan.start) & (utc_ns <= plan.end))
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    """How a charge aggregates usage over each reset period (see TariffCharge): by method, over the rows given by
+    reset_scope, with the window (in ns) of a rolling mean, the top_n (of distinct days, if top_n_per_day) of a
+    top-n mean, the coincident_peaks of a coincident peak charge and the name of a registered reducer. Where
+    ratchet > 0, the aggregate of each period is at least that fraction of the greatest aggregate of the previous
+    ratchet_periods periods. Days are those of the wall clock of tz (the tariff's, as keyed by helper.tz_key), or of
+    the index where tz is empty."""
+
+    method: UsageChargeMethod
+    reset_scope: ResetScope = ResetScope.ALL_ROWS
+    window: int = 0
+    top_n: int = 0
+    top_n_per_day: bool = False
+    ratchet: float = 0.0
+    ratchet_periods: int = 0
+    reducer: str = ""
+    coincident_peaks: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype="datetime64[ns]"))  # sorted, UTC
+    tz: str = ""
+
+    @classmethod
+    def of_child(cls, plan: TariffPlan, i: int) -> "Aggregation":
+        window = plan.child_rolling_window[i]
+        return cls(
+            method=METHODS[int(plan.child_method[i])],
+            reset_scope=RESET_SCOPES[int(plan.child_reset_scope[i])],
+            window=pd.Timedelta(window).value if window else 0,
+            top_n=int(plan.child_top_n[i]),
+            top_n_per_day=bool(plan.child_top_n_per_day[i]),
+            ratchet=float(plan.child_ratchet[i]),
+            ratchet_periods=int(plan.child_ratchet_periods[i]),
+            coincident_peaks=plan.peak_times[slice(plan.peak_offsets[i], plan.peak_offsets[i + 1])],
+            reducer=plan.child_reducer[i],
+            tz=plan.tz,
+        )
+
+    @classmethod
+    def of_charge(cls, charge: TariffCharge, reset_scope: ResetScope, tz: str = "") -> "Aggregation":
+        """The aggregation by which charge is levied, over the rows given by reset_scope, in the days of tz. Only the
+        parameters of its method are read from the charge."""
+
+        method = charge.method
+        aggregation = cls(method=method, reset_scope=reset_scope, tz=tz)
+        if method == UsageChargeMethod.rolling_mean:
+            aggregation = replace(aggregation, window=pd.Timedelta(charge.window).value)
+        elif method == UsageChargeMethod.top_n_mean:
+            aggregation = replace(aggregation, top_n=charge.top_n or 0, top_n_per_day=charge.top_n_per_day)
+        elif method == UsageChargeMethod.coincident_peak:
+            aggregation = replace(aggregation, coincident_peaks=charge._coincident_peak_times())
+        elif method == UsageChargeMethod.registered:
+            aggregation = replace(aggregation, reducer=charge.reducer or "")
+
+        ratchet = charge.reset_data.ratchet if charge.reset_data is not None else None
+        if ratchet is not None:
+            aggregation = replace(aggregation, ratchet=ratchet.percentage / 100, ratchet_periods=ratchet.periods)
+        return aggregation
+
+
+# Methods which aggregate each reset period into a single value
+PERIOD_METHODS = (
+    UsageChargeMethod.mean,
+    UsageChargeMethod.max,
+    UsageChargeMethod.top_n_mean,
+    UsageChargeMethod.coincident_peak,
+    UsageChargeMethod.registered,
+)
+
+
+def _top_n_mean(values: np.ndarray, starts: np.ndarray, n: int, days: Optional[np.ndarray]) -> np.ndarray:
+    """The mean of the n greatest values of each segment, or of the n greatest daily maxima where days is given"""
+
+    if days is None:
+        return segment.segment_top_n_mean(values, starts, n)
+
+    day_starts = np.union1d(starts, segment.segment_starts(days))
+    daily_max = segment.segment_max(values, day_starts)
+    return segment.segment_top_n_mean(daily_max, segment.segment_of(day_starts, starts), n)
+
+
+def _coincident_peak_mean(
+    values: np.ndarray, starts: np.ndarray, peaks: np.ndarray, index: pd.DatetimeIndex
+) -> np.ndarray:
+    """The mean of the values at the peaks within each segment, or zero in a segment without any. The row of every
+    peak is found by one binary search of the (sorted) index, and gathered for all columns (meters) at once."""
+
+    times = index.as_unit("ns").asi8
+    peak_times = peaks.astype("datetime64[ns]").view(np.int64)
+    rows = np.minimum(np.searchsorted(times, peak_times), max(len(times) - 1, 0))
+    rows = rows[times[rows] == peak_times] if len(times) else rows[:0]
+
+    peak_segments = segment.segment_of(starts, rows)
+    sums = np.zeros((len(starts),) + values.shape[1:], dtype=np.float64)
+    np.add.at(sums, peak_segments, values[rows])
+    counts = np.bincount(peak_segments, minlength=len(starts)).reshape((-1,) + (1,) * (values.ndim - 1))
+    return sums / np.maximum(counts, 1)
+
+
+def ratchet(period_values: np.ndarray, fraction: float, periods: int) -> np.ndarray:
+    """The greater of the value of each period and fraction of the greatest value of the previous periods, along
+    the first axis. The greatest previous values are a max over a sliding window of the (short) array of periods."""
+
+    previous = np.concatenate((np.full((periods,) + period_values.shape[1:], -np.inf), period_values))
+    lookback = sliding_window_view(previous, periods, axis=0)[: len(period_values)].max(axis=-1)
+    return np.maximum(period_values, fraction * lookback)
+
+
+def _period_values(
+    values: np.ndarray, starts: np.ndarray, aggregation: Aggregation, index: pd.DatetimeIndex
+) -> np.ndarray:
+    """The aggregate of each segment, by one of the PERIOD_METHODS"""
+
+    if aggregation.method == UsageChargeMethod.mean:
+        result = segment.segment_mean(values, starts)
+    elif aggregation.method == UsageChargeMethod.max:
+        result = segment.segment_max(values, starts)
+    elif aggregation.method == UsageChargeMethod.top_n_mean:
+        days = calendar.local_days(index, helper.tz_from_key(aggregation.tz)) if aggregation.top_n_per_day else None
+        result = _top_n_mean(values, starts, aggregation.top_n, days)
+    elif aggregation.method == UsageChargeMethod.coincident_peak:
+        result = _coincident_peak_mean(values, starts, aggregation.coincident_peaks, index)
+    else:
+        result = REDUCERS.reduce(aggregation.reducer, values, starts)
+
+    if aggregation.ratchet > 0:
+        result = ratchet(result, aggregation.ratchet, aggregation.ratchet_periods)
+    return result
+
+
+def _transform(
+    values: np.ndarray, aggregation: Aggregation, ids: np.ndarray, active: np.ndarray, index: pd.DatetimeIndex
+) -> np.ndarray:
+    """Apply the aggregation to values, over each reset period given by ids, returning the transformed values
+    of the active rows alone"""
+
+    if aggregation.method == UsageChargeMethod.identity:
+        return values[active]
+
+    starts = segment.segment_starts(ids)
+    if aggregation.method == UsageChargeMethod.cumsum:
+        return segment.segment_cumsum(values, starts)[active]
+    elif aggregation.method == UsageChargeMethod.rolling_mean:
+        times = index.as_unit("ns").asi8
+        return segment.segment_rolling_mean(values, starts, times, aggregation.window)[active]
+    elif aggregation.method in PERIOD_METHODS:
+        return _period_values(values, starts, aggregation, index)[segment.segment_of(starts, active)]
+
+    raise ValueError(f"Unsupported UsageChargeMethod {aggregation.method}")
+
+
+def aggregate(
+    values: np.ndarray, aggregation: Aggregation, ids: np.ndarray, active: np.ndarray, index: pd.DatetimeIndex
+) -> np.ndarray:
+    """The values (aligned to index) of the active rows, aggregated over each reset period given by ids, where the
+    aggregate is taken either over all rows of the period or over its active rows alone (see ResetScope)"""
+
+    if aggregation.method == UsageChargeMethod.identity:
+        return values[active]
+    if not index.is_monotonic_increasing:
+        raise ValueError("Cannot aggregate over an unordered index")
+    if aggregation.reset_scope == ResetScope.ACTIVE_ROWS:
+        return _transform(values[active], aggregation, ids[active], np.arange(len(active)), index[active])
+    return _transform(values, aggregation, ids, active, index)
+
+
+def _active_values(
+    plan: TariffPlan, i: int, values: np.ndarray, active: np.ndarray, index: pd.DatetimeIndex, reference: pd.Timestamp
+) -> np.ndarray:
+    """The usage values charged by child i at its active rows"""
+
+    aggregation = Aggregation.of_child(plan, i)
+    if aggregation.method == UsageChargeMethod.identity:
+        return values[active]
+    return aggregate(values, aggregation, _reset_ids(plan, i, index, reference), active, index)
+
+
+def _value_rates(values: np.ndarray, block_from: np.ndarray, block_to: np.ndarray, rate: np.ndarray) -> np.ndarray:
+    """The rate of each value, being the rate of the block [from, to) containing it, or NaN when it is in no block.
+    The rate of each block is either fixed, of shape (B,), or given at each row of values, of shape (B, len(values))."""
+
+    k = np.searchsorted(block_from, values, side="right") - 1
+    k_clipped = np.clip(k, 0, len(block_from) - 1)
+    if rate.ndim == 1:
+        value_rate = rate[k_clipped]
+    else:
+        value_rate = rate[k_clipped, np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))]
+    return np.where((k >= 0) & (values < block_to[k_clipped]), value_rate, np.nan)
+
+
+def _block_cost(
+    values: np.ndarray,
+    block_from: np.ndarray,
+    block_to: np.ndarray,
+    rate: np.ndarray,
+    fixed_point: Optional[FixedPoint] = None,
+) -> np.ndarray:
+    """The cost of each value, being value * rate of the block [from, to) containing it. Values which
+    are in no block, or in a block without a rate, are not charged. Costs are of the dtype of values and rate, or
+    int64 in units of fixed_point.cost_scale when given."""
+
+    if len(block_from) == 0:
+        return np.zeros_like(values, dtype=values.dtype if fixed_point is None else np.int64)
+
+    if kernels.ENABLED and fixed_point is None:
+        return kernels.block_cost(values, block_from, block_to, rate)
+
+    value_rate = _value_rates(values, block_from, block_to, rate)
+    charged = ~np.isnan(value_rate)
+    if fixed_point is None:
+        return np.where(charged, value_rate * values, 0.0)
+    rates = fixed_point.rates(np.where(charged, value_rate, 0.0))
+    return fixed_point.costs(fixed_point.quantities(values), rates)
+
+
+def _market_series(plan: TariffPlan, m: int) -> tuple[np.ndarray, np.ndarray]:
+    """The times and prices of market m, from the plan or (without copying) the price store"""
+
+    if plan.market_region[m]:
+        return PRICES.series(plan.market_region[m], plan.market_currency[m])
+    series = slice(plan.market_offsets[m], plan.market_offsets[m + 1])
+    return plan.market_times[series], plan.market_prices[series]
+
+
+def _block_rates(plan: TariffPlan, blocks: slice, times: np.ndarray) -> np.ndarray:
+    """The rates of the blocks, being fixed (of shape (B,)) unless any is priced by a market, when the rates of every
+    block are given at each of the times (UTC ns), of shape (B, len(times))"""
+
+    rate, market = plan.block_rate[blocks], plan.block_market[blocks]
+    if not (market != NO_MARKET).any():
+        return rate
+
+    rates = np.repeat(rate[:, np.newaxis], len(times), axis=1)
+    for b in np.flatnonzero(market != NO_MARKET):
+        market_times, market_prices = _market_series(plan, int(market[b]))
+        as_of = AS_OF[int(plan.market_as_of[market[b]])]
+        rates[b] = asof_prices(market_times.view(np.int64), market_prices, times, as_of)
+    return rates
+
+
+def evaluate(
+    plan: TariffPlan,
+    index: pd.DatetimeIndex,
+    usage: np.ndarray,
+    fixed_point: Optional[FixedPoint] = None,
+    precision: Precision = Precision.DOUBLE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Evaluate the costs of each child of the plan, given usage of shape (T,) or (T, N) aligned to the index.
+    Returns the import and export costs, each of shape (len(plan), *usage.shape), being floats of the precision or,
+    given fixed_point, exact int64 costs in units of fixed_point.cost_scale."""
+
+    if fixed_point is not None and precision != Precision.DOUBLE:
+        raise ValueError("Fixed-point costs are computed from float64 usage")
+    # reset periods are segmented as runs of equal period ids, which an unordered index would split
+    if not index.is_monotonic_increasing:
+        raise ValueError("Cannot evaluate a plan over an unordered index")
+
+    usage = np.asarray(usage, dtype=precision.dtype)
+    shape = usage.shape
+    dtype = precision.dtype if fixed_point is None else np.dtype(np.int64)
+    import_cost = np.zeros((len(plan),) + shape, dtype=dtype)
+    export_cost = np.zeros((len(plan),) + shape, dtype=dtype)
+
+    # every further computation is limited to the rows within the tariff, such that those outside cost nothing
+    rows = validity_rows(plan, index)
+    reference = _reset_reference(plan, index)
+    index = index[rows]
+    if len(index) == 0:
+        return import_cost, export_cost
+    applies = schedule.applies(plan, index)
+    times = index.as_unit("ns").asi8
+    row_numbers = np.arange(len(import_cost[0]))[rows]
+
+    for i in range(len(plan)):
+        direction = int(plan.child_direction[i])
+        if direction not in (IMPORT, EXPORT):
+            continue
+
+        # only the rows at which the child applies are priced, and then scattered back into the costs
+        active = np.flatnonzero(applies[i])
+        if len(active) == 0:
+            continue
+
+        convention = CONVENTIONS[int(plan.child_convention[i])]
+        sign = convention._import_sign() if direction == IMPORT else convention._export_sign()
+        blocks = slice(plan.block_offsets[i], plan.block_offsets[i + 1])
+        rates = _block_rates(plan, blocks, times[active]).astype(precision.dtype, copy=False)
+
+        if kernels.ENABLED and fixed_point is None and METHODS[int(plan.child_method[i])] == UsageChargeMethod.identity:
+            # the usage of each active row is signed, clipped and costed in one pass, without intermediate arrays
+            block_from, block_to = plan.block_from[blocks], plan.block_to[blocks]
+            cost = kernels.block_cost(usage, block_from, block_to, rates, row_numbers[active], float(sign))
+        else:
+            values = np.maximum(sign * usage[rows], 0.0)
+            values = _active_values(plan, i, values, active, index, reference).astype(precision.dtype, copy=False)
+            cost = _block_cost(values, plan.block_from[blocks], plan.block_to[blocks], rates, fixed_point)
+        (import_cost if direction == IMPORT else export_cost)[i][row_numbers[active]] = cost
+
+    return import_cost, export_cost
@@ -1,4 +1,5 @@
-from datetime import date, datetime, time, timezone
+from datetime import date, datetime, time, timedelta, timezone, tzinfo as tzinfo_type
+from functools import lru_cache
 from typing import Optional, TypeGuard, TypeVar
 from zoneinfo import ZoneInfo
 
@@ -44,3 +45,25 @@ def convert_to_aware_datetime(obj: datetime | date, tzinfo: Optional[timezone |
         raise ValueError
 
     return obj
+
+
+def tz_key(tzinfo: Optional[tzinfo_type]) -> str:
+    """A string key from which tzinfo can be rebuilt by tz_from_key. ZoneInfo zones are keyed by name,
+    fixed-offset timezones by their offset in seconds."""
+
+    if tzinfo is None:
+        return ""
+    elif isinstance(tzinfo, ZoneInfo):
+        return tzinfo.key
+    elif isinstance(tzinfo, timezone):
+        return f"fixed:{int(tzinfo.utcoffset(None).total_seconds())}"
+    raise ValueError(f"Unsupported tzinfo {tzinfo!r}")
+
+
+@lru_cache(maxsize=None)
+def tz_from_key(key: str) -> Optional[timezone | ZoneInfo]:
+    if key == "":
+        return None
+    elif key.startswith("fixed:"):
+        return timezone(timedelta(seconds=int(key.removeprefix("fixed:"))))
+    return ZoneInfo(key)
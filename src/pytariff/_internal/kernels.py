@@ -0,0 +1,148 @@
+"""JIT-compiled kernels for the innermost loops of plan evaluation, used in place of their NumPy equivalents (in
+segment and engine) when numba is installed, e.g. by pip install pytariff[jit].
+
+Each kernel makes a single pass over a (T, N) array, without the intermediate arrays of its NumPy equivalent: the
+segmented sums, cumulative sums and maxima over reset periods, and the block cost of each value, which is fused with
+the sign and clipping of usage (mask x rate x usage) for charges levied on each row's usage. Without numba, the
+kernels are plain Python functions (far slower than NumPy) which are not used unless ENABLED is set.
+
+Kernels are disabled by setting the environment variable PYTARIFF_DISABLE_JIT.
+"""
+
+import os
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENABLED = njit is not None and not os.environ.get("PYTARIFF_DISABLE_JIT")
+
+
+def _jit(fn: F) -> F:
+    return njit(cache=True, nogil=True)(fn) if njit is not None else fn
+
+
+def _columns(values: np.ndarray) -> np.ndarray:
+    """values of shape (T, ...) as an array of shape (T, N)"""
+    return values.reshape((len(values), -1))
+
+
+@_jit
+def _segment_sum(values: np.ndarray, starts: np.ndarray, out: np.ndarray) -> None:
+    for s in range(len(starts)):
+        end = starts[s + 1] if s + 1 < len(starts) else values.shape[0]
+        for t in range(starts[s], end):
+            for n in range(values.shape[1]):
+                out[s, n] += values[t, n]
+
+
+@_jit
+def _segment_max(values: np.ndarray, starts: np.ndarray, out: np.ndarray) -> None:
+    for s in range(len(starts)):
+        end = starts[s + 1] if s + 1 < len(starts) else values.shape[0]
+        for n in range(values.shape[1]):
+            m = values[starts[s], n]
+            for t in range(starts[s] + 1, end):
+                v = values[t, n]
+                if v > m or v != v:  # NaN propagates, as np.maximum
+                    m = v
+                    if m != m:
+                        break
+            out[s, n] = m
+
+
+@_jit
+def _segment_cumsum(values: np.ndarray, starts: np.ndarray, out: np.ndarray) -> None:
+    for s in range(len(starts)):
+        end = starts[s + 1] if s + 1 < len(starts) else values.shape[0]
+        for n in range(values.shape[1]):
+            total = 0.0
+            for t in range(starts[s], end):
+                total += values[t, n]
+                out[t, n] = total
+
+
+@_jit
+def _block_of(block_from: np.ndarray, value: float) -> int:
+    """The last block whose from is at most value (as np.searchsorted(block_from, value, "right") - 1), else -1"""
+
+    lo, hi = 0, len(block_from)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if block_from[mid] <= value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo - 1
+
+
+@_jit
+def _block_cost(
+    values: np.ndarray,
+    rows: np.ndarray,
+    sign: float,
+    block_from: np.ndarray,
+    block_to: np.ndarray,
+    rate: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """out[i] = v * rate[k, i] of each v = max(sign * values[rows[i]], 0) in block k, else 0. rate is of shape
+    (B, 1) where fixed, else (B, len(rows))."""
+
+    for i in range(len(rows)):
+        c = i if rate.shape[1] > 1 else 0
+        for n in range(values.shape[1]):
+            v = sign * values[rows[i], n]
+            if v < 0:
+                v = 0.0
+            k = _block_of(block_from, v)
+            if k >= 0 and v < block_to[k] and rate[k, c] == rate[k, c]:
+                out[i, n] = rate[k, c] * v
+
+
+def segment_sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """As segment.segment_sum, of floating values"""
+
+    out = np.zeros((len(starts),) + values.shape[1:], dtype=np.float64)
+    _segment_sum(_columns(values), starts, _columns(out))
+    return out
+
+
+def segment_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """As segment.segment_max, of floating values"""
+
+    out = np.zeros((len(starts),) + values.shape[1:], dtype=values.dtype)
+    _segment_max(_columns(values), starts, _columns(out))
+    return out
+
+
+def segment_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """As segment.segment_cumsum, of floating values"""
+
+    out = np.zeros(values.shape, dtype=np.float64)
+    _segment_cumsum(_columns(values), starts, _columns(out))
+    return out
+
+
+def block_cost(
+    values: np.ndarray,
+    block_from: np.ndarray,
+    block_to: np.ndarray,
+    rate: np.ndarray,
+    rows: np.ndarray | None = None,
+    sign: float = 1.0,
+) -> np.ndarray:
+    """The cost of max(sign * values[rows], 0) (of every row, where rows is None) in the blocks [from, to) at rate,
+    as engine._block_cost, in one pass"""
+
+    rows = np.arange(len(values)) if rows is None else rows
+    out = np.zeros((len(rows),) + values.shape[1:], dtype=np.result_type(values, rate))
+    if len(block_from):
+        _block_cost(_columns(values), rows, sign, block_from, block_to, rate.reshape((len(rate), -1)), _columns(out))
+    return out
@@ -0,0 +1,149 @@
+"""Overlap checks between the children of a DefinedInterval.
+
+These give the same result as intersecting every ordered pair of children (AppliedInterval.__and__,
+TariffInterval.__and__, DaysApplied.__and__), but sort the children by start time and sweep over them, such that
+only children which overlap in time are compared, and without building any intersection objects.
+"""
+
+from collections import Counter
+from itertools import islice, product
+from typing import Any, Optional, Sequence
+
+from pytariff.core.day import DayType, DaysApplied, holiday_weekdays, intersection_mask
+
+
+class _Holidays:
+    """Caches the dates of each holiday calendar, and the intersection of each pair of calendars"""
+
+    def __init__(self) -> None:
+        self._keys: dict[int, frozenset] = {}
+        self._weekdays: dict[tuple[frozenset, frozenset], int] = {}
+
+    def keys(self, days_applied: DaysApplied) -> Optional[frozenset]:
+        if days_applied.holidays is None:
+            return None
+        if id(days_applied.holidays) not in self._keys:
+            self._keys[id(days_applied.holidays)] = frozenset(days_applied.holidays.keys())
+        return self._keys[id(days_applied.holidays)]
+
+    def weekdays(self, a: Optional[frozenset], b: Optional[frozenset]) -> Optional[int]:
+        """The bitmask of weekdays (Monday is bit 0) on which any holiday common to a and b falls, or None
+        if either has no holidays"""
+
+        if a is None or b is None:
+            return None
+        if (a, b) not in self._weekdays:
+            self._weekdays[(a, b)] = holiday_weekdays(a & b)
+        return self._weekdays[(a, b)]
+
+
+def _validate_holiday_intersections(days: Sequence[DaysApplied], holidays: _Holidays) -> None:
+    """The intersection of two DaysApplied which share BUSINESS_DAYS or HOLIDAYS is only valid if they
+    also share some holiday. Children are counted by the properties on which this depends, rather than
+    comparing every pair."""
+
+    counts: Counter = Counter()
+    for days_applied in days:
+        mask = days_applied.bitmask
+        if mask is not None:
+            flags = tuple(bool(mask & x.bit) for x in (DayType.BUSINESS_DAYS, DayType.HOLIDAYS, DayType.ALL_DAYS))
+            counts[flags + (holidays.keys(days_applied),)] += 1
+
+    for (a, n_a), (b, n_b) in product(counts.items(), repeat=2):
+        if a == b and n_a < 2:
+            continue
+        is_business_days = a[0] and (b[0] or b[2])
+        is_holidays = a[1] and (b[1] or b[2])
+        if (is_business_days or is_holidays) and (a[3] is None or b[3] is None or not a[3] & b[3]):
+            raise ValueError
+
+
+def _days_intersect(a: Any, b: Any, holidays: _Holidays) -> bool:
+    mask_a, mask_b = a.days_applied.bitmask, b.days_applied.bitmask
+    if mask_a is None or mask_b is None:
+        return False
+
+    weekdays = holidays.weekdays(holidays.keys(a.days_applied), holidays.keys(b.days_applied))
+    return bool(intersection_mask(mask_a, mask_b, weekdays) or intersection_mask(mask_b, mask_a, weekdays))
+
+
+def blocks_overlap(a: Sequence[Any], b: Sequence[Any]) -> bool:
+    """Whether any block of a overlaps any block of b, where the blocks of each do not overlap each other"""
+
+    a = sorted(a, key=lambda x: x.from_quantity)
+    b = sorted(b, key=lambda x: x.from_quantity)
+    i, j = 0, 0
+    while i < len(a) and j < len(b):
+        if max(a[i].from_quantity, b[j].from_quantity) < min(a[i].to_quantity, b[j].to_quantity):
+            return True
+        if a[i].to_quantity <= b[j].to_quantity:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def _charges_overlap(a: Any, b: Any) -> bool:
+    """Whether the charges of two TariffIntervals intersect. Children without a charge always do."""
+
+    if not (hasattr(a, "charge") and hasattr(b, "charge")):
+        return True
+    return a.charge.unit == b.charge.unit and blocks_overlap(a.charge.blocks, b.charge.blocks)
+
+
+def _validate_children_intersect(children: Sequence[Any], holidays: _Holidays) -> None:
+    """Without a timezone, an empty intersection between two children cannot be built. Each pair must then
+    intersect in time, and either share holidays or intersect in days."""
+
+    if max(x.start_time for x in children) >= min(x.end_time for x in children):
+        raise ValueError
+
+    for i, a in enumerate(children):
+        for b in islice(children, i + 1, None):
+            if a.days_applied.holidays is not None and b.days_applied.holidays is not None:
+                continue
+            mask_a, mask_b = a.days_applied.bitmask, b.days_applied.bitmask
+            if mask_a is None or mask_b is None:
+                raise ValueError
+            weekdays = holidays.weekdays(holidays.keys(a.days_applied), holidays.keys(b.days_applied))
+            if not (intersection_mask(mask_a, mask_b, weekdays) and intersection_mask(mask_b, mask_a, weekdays)):
+                raise ValueError
+
+
+def validate_children_cannot_overlap(children: Sequence[Any]) -> None:
+    """Raise ValueError if any two children (AppliedIntervals) overlap, being when they intersect in time,
+    in days applied and (for TariffIntervals) in their charges, or if any two children cannot be intersected."""
+
+    if len(children) < 2:
+        return
+
+    if any(x.tzinfo != children[0].tzinfo for x in children):
+        raise ValueError
+    if any(x.start_time is None or x.end_time is None for x in children):
+        raise ValueError
+
+    holidays = _Holidays()
+    _validate_holiday_intersections([x.days_applied for x in children], holidays)
+    if children[0].tzinfo is None:
+        _validate_children_intersect(children, holidays)
+
+    # Only children with start_time < end_time can intersect in time, and x, y (with x.start_time <= y.start_time)
+    # do so iff y.start_time < x.end_time
+    active: list[Any] = []
+    for y in sorted((x for x in children if x.start_time < x.end_time), key=lambda x: x.start_time):
+        active = [x for x in active if y.start_time < x.end_time]
+        for x in active:
+            if _days_intersect(x, y, holidays) and _charges_overlap(x, y):
+                raise ValueError
+        active.append(y)
+
+
+def time_intervals_overlap(children: Sequence[Any]) -> bool:
+    """Whether max(x.start_time, y.start_time) < min(x.end_time, y.end_time) for any two of the children"""
+
+    max_end = None
+    for x in sorted((x for x in children if x.start_time < x.end_time), key=lambda x: x.start_time):
+        if max_end is not None and x.start_time < max_end:
+            return True
+        max_end = x.end_time if max_end is None else max(max_end, x.end_time)
+    return False
@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+FIRST_OF_MONTH = "_null_first_of_month"
+FIRST_OF_QUARTER = "_null_first_of_quarter"
+
+NS_PER_DAY = 86_400_000_000_000
+
+
+def _months_per_period(freq: str) -> Optional[int]:
+    """Calendar frequencies (as used by ResetPeriod and BillingPeriod values) are stepped in
+    whole months; all other frequencies are fixed pandas offsets."""
+    if freq == FIRST_OF_MONTH:
+        return 1
+    elif freq == FIRST_OF_QUARTER:
+        return 3
+    return None
+
+
+def to_wall_ns(index: pd.DatetimeIndex, tzinfo: object) -> np.ndarray:
+    """Return the wall-clock time of each element of index in tzinfo as naive int64 nanoseconds.
+    If either the index or tzinfo is naive, the index values are used as they are."""
+
+    if index.tz is not None and tzinfo is not None:
+        index = index.tz_convert(tzinfo).tz_localize(None)
+    elif index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8
+
+
+def _reference_wall_ns(reference: datetime) -> int:
+    return int(pd.Timestamp(reference.replace(tzinfo=None)).as_unit("ns").value)
+
+
+def _month_and_time_of_day(wall_ns: np.ndarray | int) -> tuple[np.ndarray, np.ndarray]:
+    """Split wall-clock nanoseconds into months since the epoch and nanoseconds since midnight"""
+    wall = np.asarray(wall_ns, dtype=np.int64).astype("datetime64[ns]")
+    month_index = wall.astype("datetime64[M]").astype(np.int64)
+    time_of_day = wall.astype(np.int64) - wall.astype("datetime64[D]").astype("datetime64[ns]").astype(np.int64)
+    return month_index, time_of_day
+
+
+def count_periods(wall_ns: np.ndarray, reference: datetime, freq: str) -> np.ndarray:
+    """Closed-form equivalent of counting, for each wall-clock time in wall_ns, the number of period
+    boundaries in [reference, t]. The first period (starting at reference) has id 1, and times
+    before the reference have id 0.
+
+    Fixed frequencies step from the reference by a constant delta. Calendar frequencies step from
+    the reference to the first day of each following month (or Jan/Apr/Jul/Oct for quarters),
+    keeping the time of day of the reference.
+    """
+
+    ref_ns = _reference_wall_ns(reference)
+    months = _months_per_period(freq)
+
+    if months is None:
+        delta_ns = pd.Timedelta(freq).value
+        ids = (wall_ns - ref_ns) // delta_ns + 1
+        return np.where(wall_ns < ref_ns, 0, ids)
+
+    month_index, _ = _month_and_time_of_day(wall_ns)
+    month_start_ns = month_index.astype("datetime64[M]").astype("datetime64[ns]").astype(np.int64)
+    ref_month, ref_time_of_day = _month_and_time_of_day(ref_ns)
+
+    # a boundary in the month of t has not yet been crossed if t is earlier than the boundary itself
+    on_boundary_month = (month_index % months == 0) & (month_index > ref_month)
+    before_boundary = on_boundary_month & (wall_ns - month_start_ns < ref_time_of_day)
+
+    ids = 1 + month_index // months - ref_month // months - before_boundary
+    return np.where(wall_ns < ref_ns, 0, ids)
+
+
+def period_starts(ids: np.ndarray, reference: datetime, freq: str) -> np.ndarray:
+    """Return the wall-clock start (as naive int64 nanoseconds) of each period id in ids, as counted
+    by count_periods from the same reference."""
+
+    ref_ns = _reference_wall_ns(reference)
+    months = _months_per_period(freq)
+
+    if months is None:
+        return ref_ns + (ids - 1) * pd.Timedelta(freq).value
+
+    ref_month, ref_time_of_day = _month_and_time_of_day(ref_ns)
+    first_boundary_month = (ref_month // months + 1) * months
+    boundary_month = first_boundary_month + (ids - 2) * months
+    boundary_ns = boundary_month.astype("datetime64[M]").astype("datetime64[ns]").astype(np.int64) + ref_time_of_day
+    return np.where(ids <= 1, ref_ns, boundary_ns)
+
+
+def count_until(until: datetime, reference: datetime, freq: str) -> int:
+    """Scalar form of count_periods, for a single datetime until"""
+    if until.tzinfo is not None and reference.tzinfo is not None:
+        until = until.astimezone(reference.tzinfo)
+    wall_ns = np.array([pd.Timestamp(until.replace(tzinfo=None)).as_unit("ns").value], dtype=np.int64)
+    return int(count_periods(wall_ns, reference, freq)[0])
+
+
+def period_ids(index: pd.DatetimeIndex, reference: datetime, freq: str) -> np.ndarray:
+    """Assign each element of index the id of the period (of frequency freq, counted from reference)
+    which contains it. Periods are counted on the wall clock of the reference timezone."""
+    return count_periods(to_wall_ns(index, reference.tzinfo), reference, freq)
@@ -0,0 +1,98 @@
+"""Week-minute lookup tables of the children of a TariffPlan which apply at each local time.
+
+Which children of a plan apply at some time depends only on the local weekday, minute of day and whether the day is
+a holiday. Children which share a timezone and holidays are grouped, and each group is tabulated once over all
+14 * 1440 (weekday, is_holiday, minute) codes, such that the children which apply over a whole index are found
+with one gather of its codes per group.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from pytariff._internal import helper, period
+from pytariff._internal.calendar import CalendarIndex
+from pytariff.core.plan import BUSINESS_DAYS_FLAG, HOLIDAYS_FLAG, TariffPlan
+
+MINUTES_PER_DAY = 24 * 60
+NS_PER_MINUTE = 60_000_000_000
+N_ROWS = 14  # weekdays (Monday is 0) of days which are not holidays, then those of days which are
+
+
+@dataclass(frozen=True)
+class ScheduleGroup:
+    """Children of a plan which share a timezone and holidays, with the table of which of them apply at each
+    code = row * MINUTES_PER_DAY + minute, where row is the weekday, plus 7 on holidays."""
+
+    tz: str
+    holidays: np.ndarray  # day numbers
+    children: np.ndarray  # indices into the plan
+    table: np.ndarray  # bool, of shape (N_ROWS * MINUTES_PER_DAY, len(children))
+
+
+def _child_table(plan: TariffPlan, i: int) -> np.ndarray:
+    """Whether child i applies on each row and minute, of shape (N_ROWS, MINUTES_PER_DAY)"""
+
+    minutes = np.arange(MINUTES_PER_DAY)
+    start, end = int(plan.child_window_start[i]), int(plan.child_window_end[i])
+    if start < end:
+        in_window = (minutes >= start) & (minutes < end)
+    elif start > end:
+        in_window = (minutes >= start) | (minutes < end)
+    else:
+        return np.zeros((N_ROWS, MINUTES_PER_DAY), dtype=bool)
+
+    day_mask = int(plan.child_day_mask[i])
+    weekday = np.arange(N_ROWS) % 7
+    is_holiday = np.arange(N_ROWS) >= 7
+    in_days = ((day_mask >> weekday) & 1).astype(bool)
+    if day_mask & BUSINESS_DAYS_FLAG:
+        in_days |= ~is_holiday
+    if day_mask & HOLIDAYS_FLAG:
+        in_days |= is_holiday
+
+    return in_days[:, np.newaxis] & in_window[np.newaxis, :]
+
+
+def schedule_groups(plan: TariffPlan) -> list[ScheduleGroup]:
+    """Group the children of the plan by timezone and holidays, and tabulate each group"""
+
+    groups: dict[tuple[str, bytes], list[int]] = {}
+    for i in range(len(plan)):
+        holidays = plan.holiday_dates[slice(plan.holiday_offsets[i], plan.holiday_offsets[i + 1])]
+        groups.setdefault((plan.child_tz[i], holidays.astype(np.int64).tobytes()), []).append(i)
+
+    schedule = []
+    for (tz, holiday_bytes), children in groups.items():
+        table = np.stack([_child_table(plan, i).reshape(-1) for i in children], axis=1)
+        table.flags.writeable = False
+        schedule.append(
+            ScheduleGroup(
+                tz=tz, holidays=np.frombuffer(holiday_bytes, dtype=np.int64), children=np.array(children), table=table
+            )
+        )
+    return schedule
+
+
+def week_minute_codes(index: pd.DatetimeIndex, tz: str, holidays: np.ndarray) -> np.ndarray:
+    """The code (see ScheduleGroup) of each element of index, on the wall clock of tz"""
+
+    wall_ns = period.to_wall_ns(index, helper.tz_from_key(tz))
+    days = wall_ns // period.NS_PER_DAY
+    minutes = (wall_ns - days * period.NS_PER_DAY) // NS_PER_MINUTE
+    row = (days + 3) % 7  # 1970-01-01 was a Thursday
+    if len(holidays) and len(days):
+        calendar = CalendarIndex.from_days(holidays, int(days.min()), int(days.max()))
+        row = row + 7 * calendar.holidays(days)
+    return row * MINUTES_PER_DAY + minutes
+
+
+def applies(plan: TariffPlan, index: pd.DatetimeIndex) -> np.ndarray:
+    """Whether each child of the plan applies at each element of index, by its time window and days applied alone,
+    of shape (len(plan), len(index))"""
+
+    result = np.zeros((len(plan), len(index)), dtype=bool)
+    for group in plan.schedule:
+        result[group.children] = group.table[week_minute_codes(index, group.tz, group.holidays)].T
+    return result
@@ -0,0 +1,136 @@
+import numpy as np
+
+from pytariff._internal import kernels
+
+
+def segment_starts(ids: np.ndarray) -> np.ndarray:
+    """Return the offsets at which each run of equal, contiguous ids begins. For a sorted
+    DatetimeIndex, period ids are non-decreasing, so each run is exactly one period."""
+
+    if len(ids) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.concatenate(([0], np.flatnonzero(ids[1:] != ids[:-1]) + 1))
+
+
+def segment_lengths(starts: np.ndarray, n: int) -> np.ndarray:
+    return np.diff(np.append(starts, n))
+
+
+def accumulator(values: np.ndarray) -> np.dtype:
+    """The dtype in which values are summed: float64 for floating values (such that float32 values are summed
+    without accumulating float32 rounding errors), else their own dtype"""
+    return np.dtype(np.float64) if values.dtype.kind == "f" else values.dtype
+
+
+def segment_sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Sum values over each segment along the first axis. Trailing axes (e.g. one column per
+    account in a fleet) are reduced independently, in the same pass."""
+
+    if len(starts) == 0:
+        return np.zeros((0,) + values.shape[1:], dtype=accumulator(values))
+    if kernels.ENABLED and values.dtype.kind == "f":
+        return kernels.segment_sum(values, starts)
+    return np.add.reduceat(values, starts, axis=0, dtype=accumulator(values))
+
+
+def segment_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if len(starts) == 0:
+        return np.zeros((0,) + values.shape[1:], dtype=values.dtype)
+    if kernels.ENABLED and values.dtype.kind == "f":
+        return kernels.segment_max(values, starts)
+    return np.maximum.reduceat(values, starts, axis=0)
+
+
+def segment_mean(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    lengths = segment_lengths(starts, len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+    return segment_sum(values, starts) / lengths
+
+
+def segment_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Cumulative sum along the first axis, restarting at each segment"""
+
+    if kernels.ENABLED and values.dtype.kind == "f" and len(starts):
+        return kernels.segment_cumsum(values, starts)
+
+    cumsum = np.cumsum(values, axis=0, dtype=accumulator(values))
+    if len(starts) <= 1:
+        return cumsum
+
+    # subtract the running total at the end of the previous segment from every element of the next
+    offsets = np.concatenate((np.zeros_like(cumsum[:1]), cumsum[starts[1:] - 1]))
+    return cumsum - broadcast(offsets, starts, len(values))
+
+
+def segment_rolling_mean(values: np.ndarray, starts: np.ndarray, times: np.ndarray, window: int) -> np.ndarray:
+    """The mean of values over the trailing window (t - window, t] of each (sorted) time t, along the first axis,
+    where no window extends back past the start of its segment. Each mean is the difference of two cumulative sums,
+    such that the cost is independent of the length of the window."""
+
+    n = len(values)
+    cumsum = np.concatenate((np.zeros_like(values[:1], dtype=np.float64), np.cumsum(values, axis=0, dtype=np.float64)))
+    lo = np.searchsorted(times, times - window, side="right")
+    if len(starts):
+        lo = np.maximum(lo, broadcast(starts, starts, n))
+
+    hi = np.arange(1, n + 1)
+    counts = (hi - lo).reshape((-1,) + (1,) * (values.ndim - 1))
+    return (cumsum[hi] - cumsum[lo]) / counts
+
+
+def _padded(values: np.ndarray, starts: np.ndarray, fill: float) -> np.ndarray:
+    """The values of each segment as a row of an array of shape (len(starts), longest segment, *trailing axes),
+    filled past the end of each segment"""
+
+    lengths = segment_lengths(starts, len(values))
+    offsets = np.arange(len(values)) - broadcast(starts, starts, len(values))
+    padded = np.full((len(starts), int(lengths.max())) + values.shape[1:], fill, dtype=np.float64)
+    padded[np.repeat(np.arange(len(starts)), lengths), offsets] = values
+    return padded
+
+
+def segment_top_n_mean(values: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """The mean of the n greatest values of each segment along the first axis (or of all of them, in a segment
+    of fewer than n). Segments are padded into the rows of a single array, from which the n greatest of each row
+    are selected at once by np.partition, rather than sorting each segment."""
+
+    if len(starts) == 0:
+        return np.zeros((0,) + values.shape[1:], dtype=np.float64)
+
+    lengths = segment_lengths(starts, len(values))
+    padded = _padded(values, starts, -np.inf)
+    width = padded.shape[1]
+    n = min(n, width)
+
+    top = np.partition(padded, width - n, axis=1)[:, slice(width - n, None)]
+    counts = np.minimum(lengths, n).reshape((-1,) + (1,) * (values.ndim - 1))
+    return np.where(np.isfinite(top), top, 0.0).sum(axis=1) / counts
+
+
+def segment_quantile(values: np.ndarray, starts: np.ndarray, q: float) -> np.ndarray:
+    """The q-th quantile (0 <= q <= 1, interpolated linearly, as np.quantile) of each segment along the first axis.
+    Segments are padded into the rows of a single array and sorted at once."""
+
+    if len(starts) == 0:
+        return np.zeros((0,) + values.shape[1:], dtype=np.float64)
+
+    ordered = np.sort(_padded(values, starts, np.inf), axis=1)
+    position = q * (segment_lengths(starts, len(values)) - 1)
+    lo = np.floor(position).astype(np.intp)
+    hi = np.ceil(position).astype(np.intp)
+    shape = (-1, 1) + (1,) * (values.ndim - 1)
+
+    def _at(i: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(ordered, i.reshape(shape), axis=1)[:, 0]
+
+    weight = (position - lo).reshape((-1,) + (1,) * (values.ndim - 1))
+    return _at(lo) + weight * (_at(hi) - _at(lo))
+
+
+def segment_of(starts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """The segment containing each of the (sorted) rows"""
+    return np.searchsorted(starts, rows, side="right") - 1
+
+
+def broadcast(segment_values: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """Repeat the value of each segment over every element of that segment"""
+    return np.repeat(segment_values, segment_lengths(starts, n), axis=0)
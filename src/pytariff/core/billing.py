@@ -1,7 +1,15 @@
 from datetime import datetime
 from enum import Enum
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 from pydantic.dataclasses import dataclass
 
+from pytariff._internal import period, segment
+from pytariff.core.fixed_point import FixedPoint
+from pytariff.core.rate import TariffRate
+
 
 class BillingPeriod(Enum):
     DAILY = "1D"
@@ -33,8 +41,95 @@ class BillingPeriod(Enum):
         else:
             return self.value
 
+    def _period_ids(self, index: pd.DatetimeIndex, reference: datetime) -> np.ndarray:
+        """Assign every element of index to a billing period, counted from the reference time. Shares its
+        closed-form implementation with ResetPeriod._period_ids"""
+        return period.period_ids(index, reference, self.value)
+
 
 @dataclass
 class BillingData:
     start: datetime
     frequency: BillingPeriod = BillingPeriod.FIRST_OF_MONTH  # default 1/month
+    supply_charge: Optional[TariffRate] = None  # fixed charge levied on each calendar day of a billing period
+    minimum_charge: Optional[TariffRate] = None  # the least amount billed in any one billing period
+
+    def _supply_days(self, period_ids: np.ndarray, wall_ns: np.ndarray) -> np.ndarray:
+        """The number of (local) calendar days in each billing period, whether or not a cost is given for every day,
+        up to the end of the last day of costs (wall_ns). Each day is counted in the period containing its midnight."""
+
+        if len(period_ids) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        bounds_ns = period.period_starts(np.append(period_ids, period_ids[-1] + 1), self.start, self.frequency.value)
+        bounds_ns[-1] = min(bounds_ns[-1], (wall_ns[-1] // period.NS_PER_DAY + 1) * period.NS_PER_DAY)
+        return np.diff(-(-bounds_ns // period.NS_PER_DAY))
+
+    @staticmethod
+    def _amount(rate: Optional[TariffRate], fixed_point: Optional[FixedPoint]) -> float:
+        """The value of rate (or zero), in cost_scale units of fixed_point where given"""
+
+        value = rate.value if rate else 0.0
+        return value if fixed_point is None else int(fixed_point.amounts(np.array(value)))
+
+    def _pytariff_aggregate(
+        self, index: pd.DatetimeIndex, costs: np.ndarray, fixed_point: Optional[FixedPoint] = None
+    ) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray, np.ndarray]:
+        """Reduce costs over each billing period in a single segmented pass. costs may be of shape (T,) for a
+        single account or (T, N) for N accounts sharing the index; the first axis is reduced. Given fixed_point,
+        costs are int64 in units of fixed_point.cost_scale (see TariffPlan.evaluate), which are summed, and charged
+        the supply and minimum charges, exactly.
+
+        Returns the start of each billing period, the summed costs, the supply charge and the billed amount
+        (after the supply charge and minimum charge are applied) for each billing period, in units of currency.
+        Costs indexed before self.start are not billed.
+        """
+
+        if not index.is_monotonic_increasing:
+            raise ValueError("Cannot aggregate costs over an unordered index")
+
+        costs = np.asarray(costs)
+        if fixed_point is None:
+            costs = costs.astype(np.float64, copy=False)
+        elif costs.dtype.kind != "i":
+            raise ValueError("Fixed-point costs must be integers")
+        if costs.shape[0] != len(index):
+            raise ValueError("Costs must be aligned to the index")
+
+        wall_ns = period.to_wall_ns(index, self.start.tzinfo)
+        ids = period.count_periods(wall_ns, self.start, self.frequency.value)
+
+        # ids are non-decreasing, so rows before self.start are a prefix
+        first = int(np.searchsorted(ids, 1))
+        ids, wall_ns, costs = ids[first:], wall_ns[first:], costs[first:]
+
+        starts = segment.segment_starts(ids)
+        summed = segment.segment_sum(costs, starts)  # in the dtype of costs, where integer
+
+        days = self._supply_days(ids[starts], wall_ns)
+        supply = (days * self._amount(self.supply_charge, fixed_point)).reshape((-1,) + (1,) * (costs.ndim - 1))
+
+        billed = summed + supply
+        if self.minimum_charge:
+            billed = np.maximum(billed, self._amount(self.minimum_charge, fixed_point))
+        if fixed_point is not None:
+            summed, supply, billed = (fixed_point.to_currency(x) for x in (summed, supply, billed))
+
+        period_starts = pd.DatetimeIndex(period.period_starts(ids[starts], self.start, self.frequency.value))
+        if self.start.tzinfo is not None:
+            period_starts = period_starts.tz_localize(
+                self.start.tzinfo, ambiguous=np.ones(len(period_starts), dtype=bool), nonexistent="shift_forward"
+            )
+
+        return period_starts, summed, np.broadcast_to(supply, summed.shape), billed
+
+    def aggregate(
+        self, index: pd.DatetimeIndex, costs: np.ndarray, fixed_point: Optional[FixedPoint] = None
+    ) -> tuple[pd.DatetimeIndex, np.ndarray]:
+        """Return the start of each billing period and the amount billed in it, for costs of shape (T,) or
+        (T, N) aligned to the index. The supply charge is levied on every calendar day of each billing period (up
+        to the last day of costs), including days without costs, and the minimum charge enforced per billing period
+        (and per account). Fixed-point costs (of TariffPlan.evaluate) are billed exactly, given their fixed_point."""
+
+        period_starts, _, _, billed = self._pytariff_aggregate(index, costs, fixed_point)
+        return period_starts, billed
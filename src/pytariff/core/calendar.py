@@ -0,0 +1,121 @@
+"""A process-wide registry of holiday calendars, shared between all of the tariffs which reference them.
+
+Calendars are identified by a CalendarKey of (country, subdivision, years, custom additions), e.g.
+
+    holidays = CALENDARS.get(CalendarKey(country="AU", subdiv="NSW", years=(2023, 2024)))
+    days_applied = DaysApplied(day_types=DayType.BUSINESS_DAYS, holidays=holidays)
+
+Each key is built once per process, and every request for it returns the same (non-expanding) HolidayBase. Where
+the registry has a cache directory (by default, that named by the PYTARIFF_CALENDAR_CACHE environment variable), the
+dates of each calendar are saved there once generated, and later processes load them rather than generating them.
+"""
+
+import hashlib
+import os
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from holidays import HolidayBase, country_holidays
+from pydantic import field_validator
+from pydantic.dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CalendarKey:
+    """The holidays of country (and subdiv) over years, along with any additional custom holidays.
+    A calendar of custom holidays alone has no country."""
+
+    country: Optional[str] = None
+    subdiv: Optional[str] = None
+    years: tuple[int, ...] = ()
+    additions: tuple[date, ...] = ()
+
+    @field_validator("years", "additions")
+    @classmethod
+    def validate_sorted_unique(cls, value: tuple) -> tuple:
+        return tuple(sorted(set(value)))
+
+    @property
+    def filename(self) -> str:
+        digest = hashlib.sha256(repr((self.country, self.subdiv, self.years, self.additions)).encode()).hexdigest()
+        return f"{self.country or 'custom'}-{self.subdiv or 'all'}-{digest[:16]}.npz"
+
+    def build(self) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the sorted dates (datetime64[D]) and names of the holidays of this calendar"""
+
+        holidays: dict[date, str] = {}
+        if self.country is not None:
+            holidays.update(country_holidays(self.country, subdiv=self.subdiv, years=self.years, expand=False))
+        for d in self.additions:
+            holidays.setdefault(d, "Custom holiday")
+
+        dates = sorted(holidays)
+        return np.array(dates, dtype="datetime64[D]"), np.array([holidays[d] for d in dates], dtype=str)
+
+
+class CalendarRegistry:
+    """Holds one HolidayBase per CalendarKey, optionally persisting the dates of each to cache_dir"""
+
+    def __init__(self, cache_dir: Optional[str | os.PathLike[str]] = None) -> None:
+        self.cache_dir = cache_dir
+        self._calendars: dict[CalendarKey, HolidayBase] = {}
+        self._dates: dict[CalendarKey, np.ndarray] = {}
+        self._keys: dict[int, CalendarKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._calendars)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._calendars
+
+    def _load(self, key: CalendarKey) -> tuple[np.ndarray, np.ndarray]:
+        if self.cache_dir is None:
+            return key.build()
+
+        path = os.path.join(self.cache_dir, key.filename)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as cached:
+                return cached["dates"], cached["names"]
+
+        dates, names = key.build()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, dates=dates, names=names)
+        os.replace(tmp_path, path)  # such that concurrent processes never read a partially written file
+        return dates, names
+
+    def get(self, key: CalendarKey) -> HolidayBase:
+        """The calendar of key, shared between all callers. It must not be modified."""
+
+        if key not in self._calendars:
+            dates, names = self._load(key)
+            dates.flags.writeable = False
+            years = set(key.years) | {d.year for d in key.additions}
+            calendar = HolidayBase(years=years, expand=False)
+            calendar.update(dict(zip(dates.astype(object), names.tolist())))
+            self._calendars[key] = calendar
+            self._dates[key] = dates
+            self._keys[id(calendar)] = key
+        return self._calendars[key]
+
+    def dates(self, key: CalendarKey) -> np.ndarray:
+        """The sorted dates (datetime64[D]) of the calendar of key"""
+
+        self.get(key)
+        return self._dates[key]
+
+    def key_of(self, holidays: HolidayBase) -> Optional[CalendarKey]:
+        """The key of holidays, if it is a calendar of this registry"""
+        return self._keys.get(id(holidays))
+
+    def clear(self) -> None:
+        """Forget every calendar held in memory. Calendars saved to cache_dir are kept."""
+
+        self._calendars.clear()
+        self._dates.clear()
+        self._keys.clear()
+
+
+CALENDARS = CalendarRegistry(os.environ.get("PYTARIFF_CALENDAR_CACHE"))
@@ -0,0 +1,208 @@
+"""Bulk loading of tariff catalogs from JSON.
+
+A catalog is either a JSON array of tariff records, or a file with one tariff record per line (NDJSON).
+Each record holds the fields of the tariff, along with a unique "key" and the name of the tariff class
+as "type" (defaulting to GenericTariff). Records differ from the python models only where JSON cannot
+represent a value directly:
+
+    - tzinfo is the name of a zone (e.g. "Australia/Sydney"), or a helper.tz_key
+    - day_types are given by name (e.g. "BUSINESS_DAYS")
+    - holidays are given as {"country": ..., "subdiv": ..., "years": [...], "additions": [...]} or as
+      {"dates": [...]}, and are shared with every other tariff of the process through calendar.CALENDARS
+
+For example:
+    {"key": "tou", "type": "TimeOfUseTariff", "start": "2023-01-01", "end": "2023-12-31", "tzinfo": "UTC",
+     "children": [{"start_time": "16:00", "end_time": "21:00", "tzinfo": "UTC",
+                   "days_applied": {"day_types": ["ALL_DAYS"]},
+                   "charge": {"blocks": [{"rate": {"currency": "AUD", "value": 0.5}, "from_quantity": 0,
+                                          "to_quantity": Infinity}],
+                              "unit": {"metric": "kWh", "convention": "Passive", "direction": "Import"},
+                              "reset_data": null}}, ...]}
+"""
+
+import os
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Callable, Hashable, Mapping, Union, get_args, get_origin
+
+from holidays import HolidayBase, country_holidays
+from pydantic import TypeAdapter
+from pydantic_core import from_json
+
+from pytariff._internal import helper
+from pytariff.core.calendar import CALENDARS, CalendarKey
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.plan import TariffPlan
+from pytariff.core.rate import MarketRate, TariffRate
+from pytariff.core.reset import ResetData
+from pytariff.core.tariff import (
+    BlockTariff,
+    ConsumptionTariff,
+    DemandTariff,
+    GenericTariff,
+    SingleRateTariff,
+    TimeOfUseTariff,
+)
+
+TARIFF_TYPES: dict[str, type[GenericTariff]] = {
+    cls.__name__: cls
+    for cls in (GenericTariff, BlockTariff, ConsumptionTariff, DemandTariff, SingleRateTariff, TimeOfUseTariff)
+}
+
+
+@lru_cache(maxsize=None)
+def _adapter(cls: Any) -> TypeAdapter:
+    return TypeAdapter(cls)
+
+
+def _component(annotation: Any) -> Any:
+    """The class underlying an annotation such as Optional[X], tuple[X, ...] or X[T]"""
+
+    while (origin := get_origin(annotation)) is not None:
+        if origin in (tuple, Union, UnionType):
+            annotation = next(x for x in get_args(annotation) if x is not type(None))
+        else:
+            annotation = origin
+    return annotation
+
+
+def _field_type(cls: Any, name: str) -> Any:
+    model_fields = cls.model_fields if hasattr(cls, "model_fields") else cls.__pydantic_fields__
+    return _component(model_fields[name].annotation)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, list):
+        return tuple(_freeze(x) for x in value)
+    return value
+
+
+class _Interner:
+    """Builds each distinct sub-object of a catalog once, such that identical records share one instance"""
+
+    def __init__(self) -> None:
+        self._cache: dict[tuple[str, Hashable], Any] = {}
+
+    def get(self, kind: str, raw: Any, build: Callable[[Any], Any]) -> Any:
+        key = (kind, _freeze(raw))
+        if key not in self._cache:
+            self._cache[key] = build(raw)
+        return self._cache[key]
+
+    def tz(self, raw: Any) -> Any:
+        return helper.tz_from_key(raw) if isinstance(raw, str) else raw
+
+    def holidays(self, raw: Any) -> Any:
+        if not isinstance(raw, dict):
+            return raw
+        return self.get("holidays", raw, _build_holidays)
+
+    def days_applied(self, raw: Any) -> Any:
+        if not isinstance(raw, dict):
+            return raw
+
+        def _build(raw: dict) -> DaysApplied:
+            day_types = raw.get("day_types")
+            if isinstance(day_types, list):
+                day_types = tuple(_day_type(x) for x in day_types)
+            elif day_types is not None:
+                day_types = _day_type(day_types)
+            return _adapter(DaysApplied).validate_python(
+                {"day_types": day_types, "holidays": self.holidays(raw.get("holidays"))}
+            )
+
+        return self.get("days_applied", raw, _build)
+
+    def rate(self, raw: Any) -> Any:
+        if not isinstance(raw, dict):
+            return raw
+        rate_type = MarketRate if "rate_lookup" in raw or "prices" in raw else TariffRate
+        return self.get(rate_type.__name__, raw, _adapter(rate_type).validate_python)
+
+    def unit(self, raw: Any, unit_type: Any) -> Any:
+        if not isinstance(raw, dict):
+            return raw
+        return self.get(unit_type.__name__, raw, _adapter(unit_type).validate_python)
+
+    def reset_data(self, raw: Any) -> Any:
+        if not isinstance(raw, dict):
+            return raw
+        return self.get("reset_data", raw, _adapter(ResetData).validate_python)
+
+
+def _day_type(value: Any) -> Any:
+    return DayType[value] if isinstance(value, str) else value
+
+
+def _build_holidays(raw: dict) -> HolidayBase:
+    """Calendars over fixed years, or of custom dates alone, are shared through the calendar registry. A country
+    calendar without years is built for this catalog, and expands as it is used."""
+
+    if "dates" in raw or raw.get("years"):
+        additions = tuple(raw.get("additions", ())) + tuple(raw.get("dates", ()))
+        key = CalendarKey(
+            country=raw.get("country"), subdiv=raw.get("subdiv"), years=raw.get("years", ()), additions=additions
+        )
+        return CALENDARS.get(key)
+    return country_holidays(raw["country"], subdiv=raw.get("subdiv"))
+
+
+def _prepare_child(raw: dict, interval_type: Any, interner: _Interner) -> dict:
+    charge_type = _field_type(interval_type, "charge")
+    charge = dict(raw["charge"])
+    charge["unit"] = interner.unit(charge["unit"], _field_type(charge_type, "unit"))
+    charge["reset_data"] = interner.reset_data(charge.get("reset_data"))
+    charge["blocks"] = [{**block, "rate": interner.rate(block.get("rate"))} for block in charge["blocks"]]
+
+    return {
+        **raw,
+        "tzinfo": interner.tz(raw.get("tzinfo")),
+        "days_applied": interner.days_applied(raw["days_applied"]),
+        "charge": charge,
+    }
+
+
+def _build_tariff(raw: dict, interner: _Interner) -> GenericTariff:
+    raw = dict(raw)
+    raw.pop("key", None)
+    tariff_type = TARIFF_TYPES[raw.pop("type", GenericTariff.__name__)]
+    interval_type = _field_type(tariff_type, "children")
+
+    raw["tzinfo"] = interner.tz(raw.get("tzinfo"))
+    raw["children"] = [_prepare_child(child, interval_type, interner) for child in raw["children"]]
+    return _adapter(tariff_type).validate_python(raw)
+
+
+def _records(data: str | bytes) -> list[dict]:
+    text = data.decode() if isinstance(data, bytes) else data
+    if text.lstrip().startswith("["):
+        return from_json(text)
+    return [from_json(line) for line in text.splitlines() if line.strip()]
+
+
+def parse_catalog(data: str | bytes) -> dict[str, GenericTariff]:
+    """Build every tariff of a JSON or NDJSON catalog, by key. Identical rates, units, reset data, days applied
+    and holiday calendars are validated once and shared between all of the tariffs which use them."""
+
+    interner = _Interner()
+    catalog: dict[str, GenericTariff] = {}
+    for record in _records(data):
+        key = record.get("key")
+        if not isinstance(key, str) or key in catalog:
+            raise ValueError(f"Each tariff in a catalog must have a unique string key, got {key!r}")
+        catalog[key] = _build_tariff(record, interner)
+    return catalog
+
+
+def load_catalog(path: str | os.PathLike[str]) -> dict[str, GenericTariff]:
+    """Load a JSON or NDJSON catalog of tariffs from file. See parse_catalog."""
+
+    with open(path, "rb") as f:
+        return parse_catalog(f.read())
+
+
+def compile_catalog(catalog: Mapping[str, GenericTariff]) -> dict[str, TariffPlan]:
+    """Compile every tariff of a catalog, by key, e.g. for plan.save_plans"""
+    return {key: tariff.compile() for key, tariff in catalog.items()}
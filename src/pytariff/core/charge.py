@@ -1,14 +1,20 @@
+from datetime import datetime
 from typing import Generic, Optional
 from uuid import uuid4
 
+import numpy as np
+import pandas as pd
+
 from pydantic import UUID4, Field, model_validator
 from pydantic.dataclasses import dataclass
 
 
+from pytariff._internal.helper import is_aware
 from pytariff.core.block import ConsumptionBlock, DemandBlock, TariffBlock
 from pytariff.core.typing import Consumption, Demand, MetricType
 from pytariff.core.unit import TradeDirection
-from pytariff.core.reset import ResetData
+from pytariff.core.reducer import REDUCERS
+from pytariff.core.reset import ResetData, ResetScope
 from pytariff.core.unit import ConsumptionUnit, DemandUnit, TariffUnit, UsageChargeMethod
 
 
@@ -22,13 +28,24 @@ class TariffCharge(Generic[MetricType]):
     method: UsageChargeMethod = UsageChargeMethod.identity
     resolution: str = "5T"
     window: Optional[str] = None
+    reset_scope: ResetScope = ResetScope.ALL_ROWS
+    top_n: Optional[int] = None
+    top_n_per_day: bool = False  # whether the top_n values are the maxima of distinct days
+    coincident_peaks: tuple[datetime, ...] = ()  # e.g. system peaks, published after the fact
+    reducer: Optional[str] = None  # the name of a registered reducer
 
     uuid: UUID4 = Field(default_factory=uuid4)
 
     @model_validator(mode="after")
     def validate_blocks_cannot_overlap(self) -> "TariffCharge":
-        if any([bool(x & y) for i, x in enumerate(self.blocks) for j, y in enumerate(self.blocks) if i != j]):
-            raise ValueError
+        """Two blocks [a, b) and [c, d) overlap iff max(a, c) < min(b, d). Sorted by from_quantity, a block
+        overlaps some block before it iff it begins before the greatest to_quantity seen so far."""
+
+        max_to_quantity = float("-inf")
+        for block in sorted(self.blocks, key=lambda x: x.from_quantity):
+            if block.from_quantity < max_to_quantity:
+                raise ValueError
+            max_to_quantity = max(max_to_quantity, block.to_quantity)
         return self
 
     @model_validator(mode="after")
@@ -42,6 +59,51 @@ class TariffCharge(Generic[MetricType]):
             raise ValueError
         return self
 
+    @model_validator(mode="after")
+    def validate_ratchet_has_period_method(self) -> "TariffCharge":
+        """A ratchet compares one aggregate per reset period"""
+
+        has_ratchet = self.reset_data is not None and self.reset_data.ratchet is not None
+        period_methods = (
+            UsageChargeMethod.mean,
+            UsageChargeMethod.max,
+            UsageChargeMethod.top_n_mean,
+            UsageChargeMethod.coincident_peak,
+            UsageChargeMethod.registered,
+        )
+        if has_ratchet and self.method not in period_methods:
+            raise ValueError
+        return self
+
+    @model_validator(mode="after")
+    def validate_top_n_is_positive_when_method_top_n_mean(self) -> "TariffCharge":
+        if self.method == UsageChargeMethod.top_n_mean and (self.top_n is None or self.top_n < 1):
+            raise ValueError
+        return self
+
+    @model_validator(mode="after")
+    def validate_coincident_peaks(self) -> "TariffCharge":
+        """A coincident peak charge requires the (tz-aware) instants of its peaks"""
+
+        if self.method == UsageChargeMethod.coincident_peak and not self.coincident_peaks:
+            raise ValueError
+        if not all(is_aware(x) for x in self.coincident_peaks):
+            raise ValueError
+        return self
+
+    @model_validator(mode="after")
+    def validate_reducer_is_registered(self) -> "TariffCharge":
+        if self.method == UsageChargeMethod.registered and self.reducer not in REDUCERS:
+            raise ValueError
+        return self
+
+    def _coincident_peak_times(self) -> np.ndarray:
+        """The sorted, unique coincident peaks (datetime64[ns], in UTC), each floored to the start of the interval
+        of the charge resolution containing it"""
+
+        peaks = pd.DatetimeIndex([pd.Timestamp(x).tz_convert("UTC") for x in self.coincident_peaks], tz="UTC")
+        return np.unique(peaks.floor(self.resolution).tz_localize(None).to_numpy(dtype="datetime64[ns]"))
+
     def __and__(self, other: "TariffCharge[MetricType]") -> "Optional[TariffCharge[MetricType]]":
         """The intersection between two TariffCharges self and other is defined to be the overlap between
         their child blocks iff self.unit == other.unit"""
@@ -81,6 +143,11 @@ class TariffCharge(Generic[MetricType]):
             and self.method == other.method
             and self.resolution == other.resolution
             and self.window == other.window
+            and self.reset_scope == other.reset_scope
+            and self.top_n == other.top_n
+            and self.top_n_per_day == other.top_n_per_day
+            and self.coincident_peaks == other.coincident_peaks
+            and self.reducer == other.reducer
         )
 
     def __hash__(self) -> int:
@@ -92,6 +159,8 @@ class TariffCharge(Generic[MetricType]):
             ^ hash(self.method)
             ^ hash(self.resolution)
             ^ hash(self.window)
+            ^ hash(self.reset_scope)
+            ^ hash((self.top_n, self.top_n_per_day, self.coincident_peaks, self.reducer))
         )
 
 
@@ -143,11 +212,19 @@ class ConsumptionCharge(TariffCharge[Consumption]):
             and self.method == other.method
             and self.resolution == other.resolution
             and self.window == other.window
+            and self.reset_scope == other.reset_scope
+            and self.top_n == other.top_n
+            and self.top_n_per_day == other.top_n_per_day
+            and self.coincident_peaks == other.coincident_peaks
+            and self.reducer == other.reducer
         )
 
 
 @dataclass
 class DemandCharge(TariffCharge[Demand]):
+    """Demand is aggregated over every row of each reset period, as other charges, unless reset_scope is
+    ResetScope.ACTIVE_ROWS, when only the rows at which the charge applies (e.g. within a peak window) are aggregated"""
+
     blocks: tuple[DemandBlock, ...]
     unit: DemandUnit
 
@@ -193,6 +270,11 @@ class DemandCharge(TariffCharge[Demand]):
             and self.method == other.method
             and self.resolution == other.resolution
             and self.window == other.window
+            and self.reset_scope == other.reset_scope
+            and self.top_n == other.top_n
+            and self.top_n_per_day == other.top_n_per_day
+            and self.coincident_peaks == other.coincident_peaks
+            and self.reducer == other.reducer
         )
 
 
@@ -1,4 +1,5 @@
 import pandas as pd
+from pytariff.core.billing import BillingData
 from pytariff.core.dataframe.profile import MeterProfileSchema
 
 import plotly.express as px  # type: ignore
@@ -24,3 +25,19 @@ class TariffCostHandler:
             profile_copy = profile_copy[["profile", "import_cost", "export_cost", "total_cost"]]
         fig = px.line(profile_copy)
         fig.show()
+
+    def bill(self, billing_data: BillingData) -> pd.DataFrame:
+        """Aggregate the import, export and total costs of the profile over each billing period defined by the
+        billing_data, levying its daily supply charge and enforcing its minimum charge on each period's bill. The
+        costs of the profile are floats; fixed-point costs of TariffPlan.evaluate are billed by BillingData.aggregate.
+        """
+
+        cost_columns = ["import_cost", "export_cost", "total_cost"]
+        period_starts, summed, supply, billed = billing_data._pytariff_aggregate(
+            self.profile.index, self.profile[cost_columns].to_numpy()
+        )
+
+        billed_df = pd.DataFrame(index=period_starts, data=summed, columns=cost_columns)
+        billed_df["supply_cost"] = supply[:, 0]
+        billed_df["billed_cost"] = billed[:, 2]
+        return billed_df
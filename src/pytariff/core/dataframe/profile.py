@@ -1,11 +1,15 @@
 from datetime import datetime
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 import pandera as pa
 from pandera.typing import Index
 
+from pytariff._internal import engine, helper
 from pytariff.core.charge import TariffCharge
 from pytariff.core.dataframe.extra import AwareDateTime
+from pytariff.core.reset import ResetScope
 from pytariff.core.unit import UsageChargeMethod
 
 
@@ -63,9 +67,7 @@ class MeterProfileHandler:
             if profile.index[0] < ref_time:
                 ref_time = profile.index[0]
 
-            profile["reset_periods"] = profile.index.to_series().apply(
-                charge.reset_data.period.count_occurences, reference=ref_time
-            )
+            profile["reset_periods"] = charge.reset_data.period._period_ids(profile.index, reference=ref_time)
         else:
             profile["reset_periods"] = 1
 
@@ -77,36 +79,46 @@ class MeterProfileHandler:
         return profile
 
     @staticmethod
-    def _pytariff_transform(profile: pd.DataFrame, tariff_start: datetime, charge: TariffCharge) -> pd.DataFrame:
+    def _pytariff_transform(
+        profile: pd.DataFrame, tariff_start: datetime, charge: TariffCharge, applies: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
         """Calculate properties of the provided dataframe that are useful for tariff application.
         Specifically, divide the profile into _import and _export quantities, and calculate cumulative
         profiles for each, such that it is possible to determine costings for the given charge.
 
         By convention, the quantity imported or exported is defined to be positive in the _import_profile and
         _export_profile columns, respectively.
+
+        The aggregate by which the charge is levied is always calculated, along with any ratchet of the charge. That of
+        a registered reducer is named for the reducer.
+
+        Where applies (whether the charge applies at each row) is given, the transformed columns are calculated only
+        at those rows, aggregating over the rows of each reset period given by charge.reset_scope, and are zero
+        elsewhere.
         """
 
-        profile["_import_profile_usage"] = profile["profile"].apply(
-            lambda x: charge.unit.convention._import_sign() * x if charge.unit.convention._is_import(x) else 0
-        )
-        profile["_export_profile_usage"] = profile["profile"].apply(
-            lambda x: charge.unit.convention._export_sign() * x if charge.unit.convention._is_export(x) else 0
-        )
+        values = profile["profile"].to_numpy(dtype=np.float64)
+        profile["_import_profile_usage"] = np.maximum(charge.unit.convention._import_sign() * values, 0.0)
+        profile["_export_profile_usage"] = np.maximum(charge.unit.convention._export_sign() * values, 0.0)
 
         profile = MeterProfileHandler._pytariff_calculate_reset_periods(profile, charge, tariff_start)
 
-        # NOTE should be vectorised one day
+        ids = profile["reset_periods"].to_numpy()
+        if applies is None:
+            active, reset_scope = np.arange(len(profile)), ResetScope.ALL_ROWS
+        else:
+            active, reset_scope = np.flatnonzero(applies), charge.reset_scope
+
+        methods = [UsageChargeMethod.mean, UsageChargeMethod.cumsum, UsageChargeMethod.max, UsageChargeMethod.identity]
+        aggregations = [engine.Aggregation(method=x, reset_scope=reset_scope) for x in methods if x != charge.method]
+        aggregations.append(engine.Aggregation.of_charge(charge, reset_scope, helper.tz_key(tariff_start.tzinfo)))
+
         for profile_direction in ["_import_profile_usage", "_export_profile_usage"]:
-            for method in [
-                UsageChargeMethod.mean,
-                UsageChargeMethod.cumsum,
-                UsageChargeMethod.max,
-                UsageChargeMethod.identity,
-            ]:
-                req_transform = method.value if method.value != "identity" else lambda x: x
-                profile[f"{profile_direction}_{method.value}"] = profile.groupby(profile["reset_periods"]).transform(
-                    req_transform
-                )[profile_direction]
+            usage = profile[profile_direction].to_numpy()
+            for aggregation in aggregations:
+                transformed = np.zeros(len(profile))
+                transformed[active] = engine.aggregate(usage, aggregation, ids, active, profile.index)
+                profile[f"{profile_direction}_{aggregation.reducer or aggregation.method.value}"] = transformed
 
         try:
             MeterProfileSchema(profile)
@@ -1,11 +1,17 @@
 from datetime import date, datetime
 from enum import Enum, auto
-from typing import Collection
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Collection, Iterable, Optional
 from holidays import HolidayBase
 
-from pydantic import BaseModel, ConfigDict, model_validator
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, PrivateAttr, model_validator
 
 from pytariff._internal import helper
+from pytariff._internal.calendar import CalendarIndex, local_days
+from pytariff.core.calendar import CALENDARS
 
 
 class DayType(Enum):
@@ -59,30 +65,83 @@ class DayType(Enum):
         DayType.SUNDAY & DayType.BUSINESS_DAYS = {DayType.SUNDAY}
         """
 
-        weekday_intersection = [self, DayType.ALL_DAYS, DayType.WEEKDAYS, DayType.BUSINESS_DAYS, DayType.HOLIDAYS]
-        weekend_intersection = [self, DayType.ALL_DAYS, DayType.WEEKENDS, DayType.BUSINESS_DAYS, DayType.HOLIDAYS]
-
-        match self:
-            case DayType.MONDAY | DayType.TUESDAY | DayType.WEDNESDAY | DayType.THURSDAY | DayType.FRIDAY:
-                return {self} if other in weekday_intersection else {}
-
-            case DayType.SATURDAY | DayType.SUNDAY:
-                return {self} if other in weekend_intersection else {}
-
-            case DayType.WEEKDAYS:
-                return {self} if other in [self, DayType.ALL_DAYS] else {}
-
-            case DayType.WEEKENDS:
-                return {self} if other in [self, DayType.ALL_DAYS] else {}
-
-            case DayType.ALL_DAYS:
-                return {self} if other in [self] else {}
-
-            case DayType.BUSINESS_DAYS:
-                return {self} if other in [self, DayType.ALL_DAYS] else {}
-
-            case DayType.HOLIDAYS:
-                return {self} if other in [self, DayType.ALL_DAYS] else {}
+        if not isinstance(other, DayType):
+            return {}
+        return {self} if _INTERSECTS[self] & other.bit else {}
+
+    @property
+    def bit(self) -> int:
+        """The bit of self in the bitmask of a DaysApplied"""
+        return 1 << (self.value - 1)
+
+
+# in the order of date.weekday()
+_WEEKDAYS = (
+    DayType.MONDAY,
+    DayType.TUESDAY,
+    DayType.WEDNESDAY,
+    DayType.THURSDAY,
+    DayType.FRIDAY,
+    DayType.SATURDAY,
+    DayType.SUNDAY,
+)
+
+# the bitmask of the DayTypes with which each DayType has a non-empty intersection
+_INTERSECTS: dict[DayType, int] = {
+    **{
+        d: d.bit | DayType.ALL_DAYS.bit | DayType.WEEKDAYS.bit | DayType.BUSINESS_DAYS.bit | DayType.HOLIDAYS.bit
+        for d in islice(_WEEKDAYS, 5)
+    },
+    **{
+        d: d.bit | DayType.ALL_DAYS.bit | DayType.WEEKENDS.bit | DayType.BUSINESS_DAYS.bit | DayType.HOLIDAYS.bit
+        for d in islice(_WEEKDAYS, 5, None)
+    },
+    DayType.WEEKDAYS: DayType.WEEKDAYS.bit | DayType.ALL_DAYS.bit,
+    DayType.WEEKENDS: DayType.WEEKENDS.bit | DayType.ALL_DAYS.bit,
+    DayType.ALL_DAYS: DayType.ALL_DAYS.bit,
+    DayType.BUSINESS_DAYS: DayType.BUSINESS_DAYS.bit | DayType.ALL_DAYS.bit,
+    DayType.HOLIDAYS: DayType.HOLIDAYS.bit | DayType.ALL_DAYS.bit,
+}
+
+# the bitmask of the weekdays (Monday is bit 0) which each DayType always contains
+_WEEKDAY_MASKS: dict[DayType, int] = {
+    **{d: 1 << i for i, d in enumerate(_WEEKDAYS)},
+    DayType.WEEKDAYS: 0b0011111,
+    DayType.WEEKENDS: 0b1100000,
+    DayType.ALL_DAYS: 0b1111111,
+    DayType.BUSINESS_DAYS: 0,
+    DayType.HOLIDAYS: 0,
+}
+
+
+def holiday_weekdays(holidays: Iterable[date]) -> int:
+    """The bitmask of weekdays (Monday is bit 0) on which any of holidays falls"""
+
+    mask = 0
+    for holiday in holidays:
+        mask |= 1 << holiday.weekday()
+    return mask
+
+
+@lru_cache(maxsize=None)
+def intersection_mask(a: int, b: int, holiday_weekdays: Optional[int] = None) -> int:
+    """The bitmask of the DayTypes of a which intersect any DayType of b. Where both DaysApplied have holidays,
+    holiday_weekdays is the bitmask of weekdays on which their common holidays fall: a named weekday then only
+    intersects HOLIDAYS if some common holiday falls on it, and only intersects BUSINESS_DAYS if none does."""
+
+    mask = 0
+    for day_type in DayType:
+        if not a & day_type.bit:
+            continue
+        intersects = _INTERSECTS[day_type]
+        if holiday_weekdays is not None and day_type in _WEEKDAYS:
+            if holiday_weekdays & _WEEKDAY_MASKS[day_type]:
+                intersects &= ~DayType.BUSINESS_DAYS.bit
+            else:
+                intersects &= ~DayType.HOLIDAYS.bit
+        if intersects & b:
+            mask |= day_type.bit
+    return mask
 
 
 class DaysApplied(BaseModel):
@@ -91,6 +150,8 @@ class DaysApplied(BaseModel):
     day_types: tuple[DayType, ...] | DayType | None = None
     holidays: HolidayBase | None = None
 
+    _mask_cache: Optional[tuple[Any, tuple[int, int]]] = PrivateAttr(default=None)
+
     @model_validator(mode="after")
     def validate_holidays_present_if_day_type_business_days(self) -> "DaysApplied":
         if self.day_types is not None:
@@ -105,7 +166,30 @@ class DaysApplied(BaseModel):
                 raise ValueError
         return self
 
-    def __contains__(self, other: date | datetime) -> bool:  # noqa[C901]
+    def _masks(self) -> Optional[tuple[int, int]]:
+        """The bitmask of self.day_types and the bitmask of weekdays (Monday is bit 0) which they always contain,
+        cached for as long as self.day_types is unchanged"""
+
+        if self.day_types is None:
+            return None
+        cache = self._mask_cache
+        if cache is None or cache[0] is not self.day_types:
+            day_types = self.day_types if isinstance(self.day_types, tuple) else (self.day_types,)
+            mask, weekdays = 0, 0
+            for day_type in day_types:
+                mask |= day_type.bit
+                weekdays |= _WEEKDAY_MASKS[day_type]
+            cache = (self.day_types, (mask, weekdays))
+            self._mask_cache = cache
+        return cache[1]
+
+    @property
+    def bitmask(self) -> Optional[int]:
+        """The bitmask of DayType.bit over self.day_types, or None if self.day_types is None"""
+        masks = self._masks()
+        return None if masks is None else masks[0]
+
+    def __contains__(self, other: date | datetime) -> bool:
         """
         Returns True if other is deemed to exist within any of the day_type categories passed
         at instantiation.
@@ -117,54 +201,66 @@ class DaysApplied(BaseModel):
         if not (helper.is_datetime_type(other) or helper.is_date_type(other)):
             raise ValueError
 
-        if self.day_types is None:
+        masks = self._masks()
+        if masks is None:
             return False
 
-        # always return True if ALL_DAYS is passed
-        if DayType.ALL_DAYS in self.day_types:
+        mask, weekdays = masks
+        if weekdays & (1 << other.weekday()):
             return True
 
-        if DayType.WEEKDAYS in self.day_types:
-            if DayType[other.strftime("%A").upper()] in [
-                DayType.MONDAY,
-                DayType.TUESDAY,
-                DayType.WEDNESDAY,
-                DayType.THURSDAY,
-                DayType.FRIDAY,
-            ]:
-                return True
+        # holidays cannot be None after instantiation if BUSINESS_DAYS or HOLIDAYS are present
+        if mask & (DayType.BUSINESS_DAYS.bit | DayType.HOLIDAYS.bit):
+            is_holiday = other in self.holidays  # type: ignore
+            return bool(mask & (DayType.HOLIDAYS.bit if is_holiday else DayType.BUSINESS_DAYS.bit))
+
+        return False
+
+    def contains_index(self, index: pd.DatetimeIndex, calendar: Optional[CalendarIndex] = None) -> np.ndarray:
+        """Whether each element of index is in self, as by __contains__ but for the whole index at once. The holidays
+        are expanded once over the dates of index, unless a calendar of them (e.g. shared between several
+        DaysApplied) is given."""
+        return self.contains_days(local_days(index), calendar)
 
-        if DayType.WEEKENDS in self.day_types:
-            if DayType[other.strftime("%A").upper()] in [DayType.SATURDAY, DayType.SUNDAY]:
-                return True
+    def contains_days(self, days: np.ndarray, calendar: Optional[CalendarIndex] = None) -> np.ndarray:
+        """Whether each of the day numbers (days since 1970-01-01) in days is in self. See contains_index."""
 
-        # Determine whether other is a business day (i.e. not a holiday).
-        # If it is, return True, else keep going.
-        if DayType.BUSINESS_DAYS in self.day_types:
-            if other not in self.holidays:  # type: ignore # holidays cannot be none after instantiation
-                return True
+        masks = self._masks()
+        if masks is None:
+            return np.zeros(len(days), dtype=bool)
 
-        if DayType.HOLIDAYS in self.day_types:
-            if other in self.holidays:  # type: ignore # holidays cannot be none after instantiation
-                return True
+        mask, weekdays = masks
+        result = ((weekdays >> ((days + 3) % 7)) & 1).astype(bool)  # 1970-01-01 was a Thursday
 
-        return DayType[other.strftime("%A").upper()] in self.day_types
+        if mask & (DayType.BUSINESS_DAYS.bit | DayType.HOLIDAYS.bit):
+            if calendar is None:
+                calendar = CalendarIndex.for_days(self.holidays, days)  # type: ignore
+            is_holiday = calendar.holidays(days)
+            if mask & DayType.BUSINESS_DAYS.bit:
+                result |= ~is_holiday
+            if mask & DayType.HOLIDAYS.bit:
+                result |= is_holiday
+
+        return result
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, DaysApplied):
             raise NotImplementedError
-        return self.day_types == other.day_types and self.holidays == other.holidays
+        return self.bitmask == other.bitmask and (self.holidays is other.holidays or self.holidays == other.holidays)
 
     def __hash__(self) -> int:
-        return hash(self.day_types)  # TODO this is not strictly correct, but avoids hashing of external library objs
+        # NOTE holidays expand as they are queried, so only the key of a registered calendar is hashed
+        if self.holidays is None:
+            return hash(self.bitmask)
+        return hash((self.bitmask, CALENDARS.key_of(self.holidays)))
 
     def day_types_equal(self, other: object) -> bool:
         """A weaker assertion of equality, for when equality between holidays is not important"""
         if not isinstance(other, DaysApplied):
             raise NotImplementedError
-        return self.day_types == other.day_types
+        return self.bitmask == other.bitmask
 
-    def __and__(self, other: "DaysApplied") -> "DaysApplied":  # noqa
+    def __and__(self, other: "DaysApplied") -> "DaysApplied":
         """The intersection between two DaysApplied objects is the set of all intersections
         between all elements of self.day_types and other.day_types EXCEPT that intersections
         between any two DayTypes where at least one DayType is in
@@ -194,68 +290,24 @@ class DaysApplied(BaseModel):
         """
 
         if self.holidays is None or other.holidays is None:
-            holiday_intersection_keys = None
+            weekdays = None
             holiday_intersection = None
         else:
             holiday_intersection_keys = self.holidays.keys() & other.holidays.keys()
+            weekdays = holiday_weekdays(holiday_intersection_keys)
             holiday_intersection = HolidayBase()
-            holiday_intersection.append([k for k in holiday_intersection_keys])
+            holiday_intersection.append(list(holiday_intersection_keys))
 
-        if self.day_types is None or other.day_types is None:
+        mask, other_mask = self.bitmask, other.bitmask
+        if mask is None or other_mask is None:
             return DaysApplied(day_types=None, holidays=holiday_intersection)
 
-        def _xor_eq(a: DayType, b: DayType, d: DayType) -> bool:
-            return (a == d and b != d) or (b == d and a != d)
-
-        def _one_day_is_type(t: DayType) -> bool:
-            return _xor_eq(day_type, other_day, t)
-
-        def _no_day_is_type(t: DayType) -> bool:
-            return day_type != t and other_day != t
-
-        def _is_holiday_intersection_check_required(inter: set) -> bool:
-            return (
-                holiday_intersection_keys is not None
-                and (_one_day_is_type(DayType.BUSINESS_DAYS) or _one_day_is_type(DayType.HOLIDAYS))
-                and _no_day_is_type(DayType.ALL_DAYS)
-                and inter != set()
-            )
-
-        def _day_type_in_holidays(t: DayType) -> bool:
-            """A given DayType is in self.holidays iff any day in holidays is recognised as a matching DayType
-            In practice, this will only catch MONDAY through SUNDAY unless we also define a mapping from an arbitrary
-            holiday to other DayTypes.
-            """
-
-            if holiday_intersection_keys is None:
-                raise ValueError
-
-            for holiday_date in holiday_intersection_keys:
-                if DayType[holiday_date.strftime("%A").upper()] == t:
-                    return True
-                # extra mappings would go here
-            return False
-
-        intersections: set[DayType] = set()
+        # once intersected, day_types are always tuples
         if not isinstance(self.day_types, tuple):
-            self.day_types = (self.day_types,)
+            self.day_types = (self.day_types,)  # type: ignore
         if not isinstance(other.day_types, tuple):
-            other.day_types = (other.day_types,)
-
-        for day_type in self.day_types:
-            for other_day in other.day_types:
-                inter = day_type & other_day
-
-                if _is_holiday_intersection_check_required(inter):  # type: ignore  # probably an issue TODO
-                    d = list(inter)[0]
-                    # Check if named day is present in self.holidays. If not present, inter = {}, else pass
-                    if _one_day_is_type(DayType.HOLIDAYS) and not _day_type_in_holidays(d):
-                        inter = {}
-                    # Check if named day is NOT present in self.holidays. If not present, pass, else inter = {}
-                    elif _one_day_is_type(DayType.BUSINESS_DAYS) and _day_type_in_holidays(d):
-                        inter = {}
-
-                intersections.update(inter)
+            other.day_types = (other.day_types,)  # type: ignore
 
-        to_tuple = tuple(intersections) or None
-        return DaysApplied(day_types=to_tuple, holidays=holiday_intersection)
+        intersection = intersection_mask(mask, other_mask, weekdays)
+        day_types = tuple(x for x in DayType if intersection & x.bit)
+        return DaysApplied(day_types=day_types or None, holidays=holiday_intersection)
@@ -0,0 +1,93 @@
+"""Exact integer (fixed-point) cost arithmetic, as an opt-in alternative to float64 costs, e.g.
+
+    import_cost, export_cost = plan.evaluate(index, usage, fixed_point=FixedPoint())
+
+Quantities are rounded to integer Wh (for kWh units), rates to integer micro-units of their currency, and the cost of
+each row is their int64 product, rounded once to cost_scale units of the currency. Row costs are then exact integers,
+such that any total of them (e.g. over a billing period) is exact and independent of the order of summation, e.g.
+
+    period_starts, billed = billing_data.aggregate(index, import_cost.sum(axis=0), fixed_point=FixedPoint())
+
+Fixed-point costs are only evaluated by TariffPlan.evaluate, and not by GenericTariff.apply_to.
+"""
+
+from enum import Enum
+
+import numpy as np
+from pydantic import model_validator
+from pydantic.dataclasses import dataclass
+
+
+class Rounding(Enum):
+    """How a value between two integers is rounded"""
+
+    HALF_EVEN = "half_even"  # to the nearest integer, and halves to the even integer
+    HALF_UP = "half_up"  # to the nearest integer, and halves away from zero
+    DOWN = "down"  # toward zero
+
+
+def round_float(values: np.ndarray, rounding: Rounding) -> np.ndarray:
+    """Round values to int64 by rounding"""
+
+    values = np.asarray(values, dtype=np.float64)
+    if rounding == Rounding.HALF_EVEN:
+        return np.rint(values).astype(np.int64)
+    if rounding == Rounding.HALF_UP:
+        return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+    return np.trunc(values).astype(np.int64)
+
+
+def round_divide(numerator: np.ndarray, denominator: int, rounding: Rounding) -> np.ndarray:
+    """numerator / denominator for int64 numerator and positive denominator, rounded by rounding in exact integer
+    arithmetic"""
+
+    numerator = np.asarray(numerator, dtype=np.int64)
+    sign = np.where(numerator < 0, -1, 1)
+    quotient, remainder = np.divmod(np.abs(numerator), denominator)
+    if rounding == Rounding.HALF_EVEN:
+        quotient += (2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1))
+    elif rounding == Rounding.HALF_UP:
+        quotient += 2 * remainder >= denominator
+    return sign * quotient
+
+
+@dataclass(frozen=True)
+class FixedPoint:
+    """The scales of the integer quantities (per unit, e.g. Wh per kWh), rates and costs (per unit of currency), and
+    the rounding applied to each. The cost of each row is rounded from units of 1 / (quantity_scale * rate_scale)
+    to units of 1 / cost_scale of the currency, which must divide quantity_scale * rate_scale."""
+
+    quantity_scale: int = 1_000
+    rate_scale: int = 1_000_000
+    cost_scale: int = 1_000_000
+    rounding: Rounding = Rounding.HALF_EVEN
+
+    @model_validator(mode="after")
+    def validate_scales(self) -> "FixedPoint":
+        if min(self.quantity_scale, self.rate_scale, self.cost_scale) < 1:
+            raise ValueError
+        if (self.quantity_scale * self.rate_scale) % self.cost_scale != 0:
+            raise ValueError
+        return self
+
+    def quantities(self, values: np.ndarray) -> np.ndarray:
+        """The integer quantities (e.g. Wh) of the float values (e.g. kWh)"""
+        return round_float(np.asarray(values) * self.quantity_scale, self.rounding)
+
+    def rates(self, values: np.ndarray) -> np.ndarray:
+        """The integer rates (e.g. micro-dollars) of the float rates (e.g. dollars)"""
+        return round_float(np.asarray(values) * self.rate_scale, self.rounding)
+
+    def costs(self, quantities: np.ndarray, rates: np.ndarray) -> np.ndarray:
+        """The integer costs, in cost_scale units, of the integer quantities at the integer rates"""
+
+        product = np.asarray(quantities, dtype=np.int64) * np.asarray(rates, dtype=np.int64)
+        return round_divide(product, self.quantity_scale * self.rate_scale // self.cost_scale, self.rounding)
+
+    def amounts(self, values: np.ndarray) -> np.ndarray:
+        """The integer costs, in cost_scale units, of the float amounts (e.g. dollars) of currency"""
+        return round_float(np.asarray(values) * self.cost_scale, self.rounding)
+
+    def to_currency(self, costs: np.ndarray) -> np.ndarray:
+        """The costs, in cost_scale units, as float units of the currency"""
+        return np.asarray(costs) / self.cost_scale
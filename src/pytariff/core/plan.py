@@ -0,0 +1,375 @@
+import os
+from dataclasses import dataclass, fields
+from functools import cached_property
+from datetime import date, time
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pytariff._internal import helper
+from pytariff.core.calendar import CALENDARS
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.precision import Precision
+from pytariff.core.rate import AsOf, MarketRate
+from pytariff.core.reset import ResetData, ResetPeriod, ResetScope
+from pytariff.core.unit import SignConvention, TradeDirection, UsageChargeMethod
+
+if TYPE_CHECKING:
+    from pytariff._internal.schedule import ScheduleGroup
+    from pytariff.core.fixed_point import FixedPoint
+    from pytariff.core.tariff.generic_tariff import GenericTariff
+
+
+# Codes used to flatten enum members into integer arrays. The position of each member is its code.
+METHODS: tuple[UsageChargeMethod, ...] = tuple(UsageChargeMethod)
+RESET_PERIODS: tuple[ResetPeriod, ...] = tuple(ResetPeriod)
+RESET_SCOPES: tuple[ResetScope, ...] = tuple(ResetScope)
+CONVENTIONS: tuple[SignConvention, ...] = (SignConvention.Passive, SignConvention.Active)
+NO_DIRECTION, IMPORT, EXPORT = 0, 1, 2
+DIRECTIONS: dict[Optional[TradeDirection], int] = {TradeDirection.Import: IMPORT, TradeDirection.Export: EXPORT}
+NO_RESET = -1
+NO_MARKET = -1
+AS_OF: tuple[AsOf, ...] = tuple(AsOf)
+
+# Day masks hold one bit per weekday (Monday is bit 0), and flags for business days and holidays
+BUSINESS_DAYS_FLAG = 1 << 7
+HOLIDAYS_FLAG = 1 << 8
+_DAY_TYPE_MASKS = {
+    DayType.MONDAY: 1 << 0,
+    DayType.TUESDAY: 1 << 1,
+    DayType.WEDNESDAY: 1 << 2,
+    DayType.THURSDAY: 1 << 3,
+    DayType.FRIDAY: 1 << 4,
+    DayType.SATURDAY: 1 << 5,
+    DayType.SUNDAY: 1 << 6,
+    DayType.WEEKDAYS: 0b0011111,
+    DayType.WEEKENDS: 0b1100000,
+    DayType.ALL_DAYS: 0b1111111,
+    DayType.BUSINESS_DAYS: BUSINESS_DAYS_FLAG,
+    DayType.HOLIDAYS: HOLIDAYS_FLAG,
+}
+
+
+@dataclass(frozen=True)
+class TariffPlan:
+    """A TariffPlan is the immutable, flattened form of a GenericTariff, holding everything required to
+    apply the tariff as NumPy arrays. Arrays prefixed by child_ hold one element per child TariffInterval,
+    while holiday_, block_ and peak_ arrays are concatenated over all children and sliced by their offsets, such
+    that the holidays (or blocks) of child i are holiday_dates[holiday_offsets[i]:holiday_offsets[i + 1]].
+
+    Time windows are held in minutes since midnight of the child's local time, where
+    child_window_start > child_window_end denotes a window which wraps past midnight.
+
+    The price series of each distinct MarketRate (a market) is likewise sliced from market_times and
+    market_prices by market_offsets, unless it is that of a market_region of the price store, and is referenced by
+    the blocks priced by it through block_market.
+    """
+
+    start: int  # tariff start, in UTC nanoseconds since the epoch
+    end: int  # tariff end (inclusive), in UTC nanoseconds since the epoch
+    tz: str  # the timezone of the tariff, in which reset periods are counted
+    resolution: str
+    child_ids: tuple[str, ...]
+    child_tz: tuple[str, ...]  # see helper.tz_key
+    child_rolling_window: tuple[str, ...]  # empty where the charge has no window
+    child_reducer: tuple[str, ...]  # the name of the registered reducer, or empty where the charge has none
+
+    child_window_start: np.ndarray
+    child_window_end: np.ndarray
+    child_day_mask: np.ndarray
+    child_method: np.ndarray  # code into METHODS
+    child_direction: np.ndarray  # one of NO_DIRECTION, IMPORT, EXPORT
+    child_convention: np.ndarray  # code into CONVENTIONS
+    child_reset_period: np.ndarray  # code into RESET_PERIODS, or NO_RESET
+    child_reset_scope: np.ndarray  # code into RESET_SCOPES
+    child_top_n: np.ndarray  # 0 where the charge has no top_n
+    child_top_n_per_day: np.ndarray  # 1 where the top_n values are daily maxima, else 0
+    child_ratchet: np.ndarray  # the fraction of the greatest previous aggregate, or 0 where there is no ratchet
+    child_ratchet_periods: np.ndarray
+
+    holiday_offsets: np.ndarray
+    holiday_dates: np.ndarray  # datetime64[D]
+
+    block_offsets: np.ndarray
+    block_from: np.ndarray
+    block_to: np.ndarray
+    block_rate: np.ndarray  # NaN where the block has no (fixed) rate
+    block_market: np.ndarray  # the market of the block's MarketRate, or NO_MARKET
+
+    market_offsets: np.ndarray
+    market_as_of: np.ndarray  # code into AS_OF, one per market
+    market_region: tuple[str, ...]  # the region of the market in the price store, or empty where held in the plan
+    market_currency: tuple[str, ...]
+    market_times: np.ndarray  # datetime64[ns] in UTC, sorted within each market
+    market_prices: np.ndarray
+
+    peak_offsets: np.ndarray
+    peak_times: np.ndarray  # datetime64[ns] in UTC, the coincident peaks of each child
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.child_ids)
+
+    @cached_property
+    def schedule(self) -> list["ScheduleGroup"]:
+        """The week-minute tables of the children which apply at each local time, built on first use"""
+
+        from pytariff._internal import schedule
+
+        return schedule.schedule_groups(self)
+
+    def applies(self, index: pd.DatetimeIndex) -> np.ndarray:
+        """Whether each child applies at each element of the tz-aware index, by its time window and days applied
+        (but not the start and end of the tariff), of shape (len(self), len(index))"""
+
+        from pytariff._internal import schedule
+
+        return schedule.applies(self, index)
+
+    def evaluate(
+        self,
+        index: pd.DatetimeIndex,
+        usage: np.ndarray,
+        fixed_point: Optional["FixedPoint"] = None,
+        precision: Precision = Precision.DOUBLE,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Apply the plan to usage of shape (T,) or (T, N), sampled at self.resolution over the tz-aware index.
+        A fleet of N meters sharing the index is evaluated at once.
+
+        Returns the import and export costs of each child, each of shape (len(self), T) or (len(self), T, N). Costs
+        are floats of the precision (see pytariff.core.precision for the error bounds of Precision.SINGLE), or given
+        fixed_point, exact int64 costs in units of fixed_point.cost_scale of the currency, which are billed exactly by
+        BillingData.aggregate given the same fixed_point. Fixed-point costs are only available here, and not through
+        GenericTariff.apply_to or TariffCostHandler.bill.
+        """
+
+        from pytariff._internal import engine
+
+        return engine.evaluate(self, index, usage, fixed_point, precision)
+
+
+def _minute_of_day(t: Optional[time]) -> int:
+    """Minutes since midnight, rounded up such that a whole-minute sample m is contained in [start, end)
+    exactly when ceil(start) <= m < ceil(end)"""
+
+    if t is None:
+        return 0
+    return t.hour * 60 + t.minute + int(t.second > 0 or t.microsecond > 0)
+
+
+def _day_mask(days_applied: DaysApplied) -> int:
+    if days_applied.day_types is None:
+        return 0
+
+    day_types = days_applied.day_types if isinstance(days_applied.day_types, tuple) else (days_applied.day_types,)
+    mask = 0
+    for day_type in day_types:
+        mask |= _DAY_TYPE_MASKS[day_type]
+    return mask
+
+
+def _holiday_dates(days_applied: DaysApplied, years: range) -> np.ndarray:
+    """The holidays of days_applied within the given years, expanding the calendar where it allows"""
+
+    if days_applied.holidays is None:
+        return np.zeros(0, dtype="datetime64[D]")
+
+    key = CALENDARS.key_of(days_applied.holidays)
+    if key is not None:
+        dates = CALENDARS.dates(key)
+        date_years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        return dates[(date_years >= years.start) & (date_years < years.stop)]
+
+    for year in years:
+        date(year, 1, 1) in days_applied.holidays  # populates the year iff the calendar is expandable
+    return np.array(sorted(d for d in days_applied.holidays if d.year in years), dtype="datetime64[D]")
+
+
+def _ratchet(reset_data: Optional[ResetData]) -> tuple[float, int]:
+    if reset_data is None or reset_data.ratchet is None:
+        return 0.0, 0
+    return reset_data.ratchet.percentage / 100, reset_data.ratchet.periods
+
+
+def _offsets(lengths: Sequence[int]) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+
+
+def compile_tariff(tariff: "GenericTariff") -> TariffPlan:
+    """Flatten the given tariff into a TariffPlan. Holiday calendars are expanded over the years in which
+    the tariff is defined."""
+
+    children = tariff.children
+    years = range(tariff.start.year, tariff.end.year + 1)
+
+    holidays = [_holiday_dates(child.days_applied, years) for child in children]
+    blocks = [block for child in children for block in child.charge.blocks]
+    peaks = [child.charge._coincident_peak_times() for child in children]
+
+    # each distinct MarketRate is held once, however many blocks share it
+    markets: dict[int, MarketRate] = {}
+    for block in blocks:
+        if isinstance(block.rate, MarketRate):
+            markets.setdefault(id(block.rate), block.rate)
+    market_codes = {key: code for code, key in enumerate(markets)}
+    # series of the price store are referenced by region and currency, rather than copied into the plan
+    empty_series = (np.zeros(0, dtype="datetime64[ns]"), np.zeros(0, dtype=np.float64))
+    market_series = [empty_series if market.region else market.series for market in markets.values()]
+
+    def _reset_period(child_index: int) -> int:
+        reset_data = children[child_index].charge.reset_data
+        return NO_RESET if reset_data is None else RESET_PERIODS.index(reset_data.period)
+
+    return TariffPlan(
+        start=pd.Timestamp(tariff.start).value,
+        end=pd.Timestamp(tariff.end).value,
+        tz=helper.tz_key(tariff.start.tzinfo),
+        resolution=children[0].charge.resolution,
+        child_ids=tuple(str(child.uuid) for child in children),
+        child_tz=tuple(helper.tz_key(child.tzinfo or getattr(child.start_time, "tzinfo", None)) for child in children),
+        child_rolling_window=tuple(child.charge.window or "" for child in children),
+        child_reducer=tuple(child.charge.reducer or "" for child in children),
+        child_window_start=np.array([_minute_of_day(child.start_time) for child in children], dtype=np.int16),
+        child_window_end=np.array([_minute_of_day(child.end_time) for child in children], dtype=np.int16),
+        child_day_mask=np.array([_day_mask(child.days_applied) for child in children], dtype=np.int16),
+        child_method=np.array([METHODS.index(child.charge.method) for child in children], dtype=np.int8),
+        child_direction=np.array(
+            [DIRECTIONS.get(child.charge.unit.direction, NO_DIRECTION) for child in children], dtype=np.int8
+        ),
+        child_convention=np.array(
+            [CONVENTIONS.index(child.charge.unit.convention) for child in children], dtype=np.int8
+        ),
+        child_reset_period=np.array([_reset_period(i) for i in range(len(children))], dtype=np.int8),
+        child_reset_scope=np.array([RESET_SCOPES.index(child.charge.reset_scope) for child in children], dtype=np.int8),
+        child_top_n=np.array([child.charge.top_n or 0 for child in children], dtype=np.int32),
+        child_top_n_per_day=np.array([child.charge.top_n_per_day for child in children], dtype=np.int8),
+        child_ratchet=np.array([_ratchet(child.charge.reset_data)[0] for child in children], dtype=np.float64),
+        child_ratchet_periods=np.array([_ratchet(child.charge.reset_data)[1] for child in children], dtype=np.int32),
+        holiday_offsets=_offsets([len(x) for x in holidays]),
+        holiday_dates=np.concatenate(holidays) if holidays else np.zeros(0, dtype="datetime64[D]"),
+        block_offsets=_offsets([len(child.charge.blocks) for child in children]),
+        block_from=np.array([block.from_quantity for block in blocks], dtype=np.float64),
+        block_to=np.array([block.to_quantity for block in blocks], dtype=np.float64),
+        block_rate=np.array(
+            [np.nan if block.rate is None or block.rate.value is None else block.rate.value for block in blocks],
+            dtype=np.float64,
+        ),
+        block_market=np.array([market_codes.get(id(block.rate), NO_MARKET) for block in blocks], dtype=np.int32),
+        market_offsets=_offsets([len(times) for times, _ in market_series]),
+        market_as_of=np.array([AS_OF.index(market.as_of) for market in markets.values()], dtype=np.int8),
+        market_region=tuple(market.region or "" for market in markets.values()),
+        market_currency=tuple(market.currency for market in markets.values()),
+        market_times=(
+            np.concatenate([times for times, _ in market_series])
+            if market_series
+            else np.zeros(0, dtype="datetime64[ns]")
+        ),
+        market_prices=(
+            np.concatenate([prices for _, prices in market_series]) if market_series else np.zeros(0, dtype=np.float64)
+        ),
+        peak_offsets=_offsets([len(x) for x in peaks]),
+        peak_times=np.concatenate(peaks) if peaks else np.zeros(0, dtype="datetime64[ns]"),
+    )
+
+
+# Plans are stored as an Arrow IPC file with one row per plan. Array fields are list columns over their
+# (integer) storage, with the numpy dtype of the field held in the metadata of its column.
+PLAN_FORMAT_VERSION = "9"
+_KEY_COLUMN = "key"
+_DTYPE_METADATA = b"numpy_dtype"
+
+
+def _storage(array: np.ndarray) -> np.ndarray:
+    return array.view(np.int64) if array.dtype.kind == "M" else array
+
+
+def save_plans(path: str | os.PathLike[str], plans: Mapping[str, TariffPlan]) -> None:
+    """Save the given plans, by key, to a single file which may later be opened by PlanCatalog"""
+
+    arrays, schema_fields = [pa.array(list(plans.keys()), pa.string())], [pa.field(_KEY_COLUMN, pa.string())]
+    for f in fields(TariffPlan):
+        values = [getattr(plan, f.name) for plan in plans.values()]
+        if f.type is np.ndarray:
+            dtype = values[0].dtype if values else np.dtype(np.float64)
+            storage = [_storage(x) for x in values]
+            # int64 offsets, such that the arrays of a catalog may exceed 2 ** 31 values in total
+            offsets = _offsets([len(x) for x in storage]).astype(np.int64)
+            flat = np.concatenate(storage) if storage else np.zeros(0)
+            arrays.append(pa.LargeListArray.from_arrays(pa.array(offsets), pa.array(flat)))
+            schema_fields.append(pa.field(f.name, arrays[-1].type, metadata={_DTYPE_METADATA: dtype.str}))
+        elif f.type is int:
+            arrays.append(pa.array(values, pa.int64()))
+            schema_fields.append(pa.field(f.name, pa.int64()))
+        elif f.type is str:
+            arrays.append(pa.array(values, pa.string()))
+            schema_fields.append(pa.field(f.name, pa.string()))
+        else:
+            arrays.append(pa.array([list(x) for x in values], pa.list_(pa.string())))
+            schema_fields.append(pa.field(f.name, pa.list_(pa.string())))
+
+    schema = pa.schema(schema_fields, metadata={"pytariff_plan_version": PLAN_FORMAT_VERSION})
+    with pa.OSFile(os.fspath(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+
+
+class PlanCatalog(Mapping[str, TariffPlan]):
+    """A read-only mapping of key to TariffPlan, backed by a file written by save_plans. The file is
+    memory-mapped, such that plans are built on first access as views over the mapped pages, which are
+    shared between every process which opens the same file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._source = pa.memory_map(os.fspath(path), "r")
+        reader = pa.ipc.open_file(self._source)
+        if (reader.schema.metadata or {}).get(b"pytariff_plan_version") != PLAN_FORMAT_VERSION.encode():
+            raise ValueError(f"{path} is not a compatible pytariff plan file")
+
+        self._table = reader.read_all().combine_chunks()
+        keys = self._table.column(_KEY_COLUMN).to_pylist()
+        self._rows: dict[str, int] = {key: i for i, key in enumerate(keys)}
+        self._plans: dict[str, TariffPlan] = {}
+        self._columns: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> TariffPlan:
+        if key not in self._plans:
+            self._plans[key] = self._build(self._rows[key])
+        return self._plans[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _column(self, name: str) -> Any:
+        """The column as (offsets, values) arrays for array fields, else as a list, decoded once per catalog"""
+
+        if name not in self._columns:
+            column = self._table.column(name).chunk(0)
+            if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+                metadata = self._table.schema.field(name).metadata or {}
+                values = column.values.to_numpy(zero_copy_only=not pa.types.is_string(column.type.value_type))
+                if _DTYPE_METADATA in metadata:
+                    values = values.view(np.dtype(metadata[_DTYPE_METADATA].decode()))
+                self._columns[name] = (column.offsets.to_numpy(), values)
+            else:
+                self._columns[name] = column.to_pylist()
+        return self._columns[name]
+
+    def _build(self, row: int) -> TariffPlan:
+        kwargs: dict[str, Any] = {}
+        for f in fields(TariffPlan):
+            column = self._column(f.name)
+            if isinstance(column, tuple):
+                offsets, values = column
+                value = values[slice(offsets[row], offsets[row + 1])]
+                kwargs[f.name] = value if f.type is np.ndarray else tuple(value.tolist())
+            else:
+                kwargs[f.name] = column[row]
+        return TariffPlan(**kwargs)
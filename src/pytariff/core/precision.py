@@ -0,0 +1,32 @@
+"""The floating point precision in which plans aggregate and cost usage, e.g.
+
+    import_cost, export_cost = plan.evaluate(index, usage, precision=Precision.SINGLE)
+
+At Precision.SINGLE, usage, aggregated usage, rates and costs are float32, halving the memory (and memory bandwidth)
+of evaluating a large (T, N) fleet. Every sum (of a mean, cumulative sum, rolling mean or reset period) is
+accumulated in float64 and rounded once to float32, as are the totals of costs over children and billing periods.
+
+Error bounds at Precision.SINGLE, where u = 2 ** -24 (about 6e-8) is the unit roundoff of float32, and usage is
+clipped to be non-negative before it is aggregated:
+    - each usage value, and each aggregate of usage, is within a relative error of 2u of its float64 value, being
+      rounded once on input and once on output (maxima and identity charges, within u)
+    - each rate is within a relative error of u
+    - the cost of each row is within a relative error of 4u (about 2.4e-7), e.g. within 0.03 of a cost of 100,000
+    - totals accumulated in float64 keep the relative error 4u of the costs they sum, where the costs are of one sign
+    - a value within a relative distance u of a block boundary may be charged at the rate of the adjacent block
+"""
+
+from enum import Enum
+
+import numpy as np
+
+
+class Precision(Enum):
+    """The dtype of usage, aggregates, rates and costs"""
+
+    DOUBLE = "float64"
+    SINGLE = "float32"
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.value)
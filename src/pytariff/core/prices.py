@@ -0,0 +1,91 @@
+"""A local store of market price series (e.g. regional spot prices), shared by every MarketRate which references it.
+
+Each series is identified by its region and currency, and saved within the store directory as one .npy file of two
+int64 rows: its sorted times (datetime64[ns], in UTC) and the bits of its prices (float64), such that the times and
+prices of a series are replaced together, e.g.
+
+    PRICES.write("NSW1", "AUD", times, prices)
+    rate = MarketRate(currency="AUD", region="NSW1")
+
+Series are memory-mapped read-only on first use, such that every MarketRate, plan and process which references a
+series shares the one copy of it in the page cache. By default, the store is the directory named by the
+PYTARIFF_PRICE_STORE environment variable.
+"""
+
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """A directory of price series, memory-mapped on first use"""
+
+    def __init__(self, directory: Optional[str | os.PathLike[str]] = None) -> None:
+        self.directory = directory
+        self._series: dict[tuple[str, str], tuple[np.ndarray, np.ndarray]] = {}
+
+    def _path(self, region: str, currency: str) -> str:
+        if not self.directory:
+            raise ValueError("The price store has no directory")
+        if not region or not currency or any(os.sep in x or x.startswith(".") for x in (region, currency)):
+            raise ValueError(f"Invalid price series {region} {currency}")
+        return os.path.join(self.directory, f"{region}-{currency}.npy")
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, tuple) or len(key) != 2 or not self.directory:
+            return False
+        return key in self._series or os.path.exists(self._path(key[0], key[1]))
+
+    def write(self, region: str, currency: str, times: np.ndarray, prices: np.ndarray) -> None:
+        """Save the series of region and currency, sorted by time, replacing any already saved. Processes which
+        have already mapped the previous series keep it until they clear the store."""
+
+        times = np.asarray(times).astype("datetime64[ns]")
+        prices = np.asarray(prices, dtype=np.float64)
+        if times.shape != prices.shape or times.ndim != 1:
+            raise ValueError
+        order = np.argsort(times, kind="stable")
+        times, prices = times[order], prices[order]
+        if (np.diff(times.view(np.int64)) == 0).any():
+            raise ValueError("Price series times must be unique")
+
+        path = self._path(region, currency)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.stack((times.view(np.int64), prices.view(np.int64))))
+        os.replace(tmp_path, path)  # such that concurrent processes never read a partially written series
+        self._series.pop((region, currency), None)
+
+    def series(self, region: str, currency: str) -> tuple[np.ndarray, np.ndarray]:
+        """The read-only, memory-mapped times and prices of region and currency"""
+
+        key = (region, currency)
+        if key not in self._series:
+            if key not in self:
+                raise ValueError(f"No price series is stored for {region} {currency}")
+            mapped = np.load(self._path(region, currency), mmap_mode="r")
+            if mapped.ndim != 2 or len(mapped) != 2:
+                raise ValueError(f"Invalid price series file for {region} {currency}")
+            self._series[key] = (mapped[0].view("datetime64[ns]"), mapped[1].view(np.float64))
+        return self._series[key]
+
+    def range(self, region: str, currency: str, start: datetime, end: datetime) -> tuple[np.ndarray, np.ndarray]:
+        """The times and prices of region and currency within [start, end), as views over the mapped series"""
+
+        times, prices = self.series(region, currency)
+        bounds = np.searchsorted(
+            times.view(np.int64), [pd.Timestamp(start).value, pd.Timestamp(end).value], side="left"
+        )
+        rows = slice(int(bounds[0]), int(bounds[1]))
+        return times[rows], prices[rows]
+
+    def clear(self) -> None:
+        """Unmap every series. Series saved to the directory are kept."""
+        self._series.clear()
+
+
+PRICES = PriceStore(os.environ.get("PYTARIFF_PRICE_STORE"))
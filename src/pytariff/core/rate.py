@@ -1,7 +1,16 @@
+from dataclasses import field
 from datetime import datetime
-from typing import Any
+from enum import Enum
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import ConfigDict, field_validator, model_validator
 from pydantic.dataclasses import dataclass
 
+from pytariff._internal.helper import is_aware
+from pytariff.core.prices import PRICES
+
 
 @dataclass
 class TariffRate:
@@ -24,26 +33,137 @@ class TariffRate:
         return self.value
 
 
-# TODO test this
-@dataclass
+class AsOf(Enum):
+    """How a MarketRate prices a time between (or beyond) the times of its price series: at the price of the
+    previous or next time, or interpolated linearly between them. Times for which there is no such price have none."""
+
+    PREVIOUS = "previous"
+    NEXT = "next"
+    INTERPOLATE = "interpolate"
+
+
+def asof_prices(times: np.ndarray, prices: np.ndarray, at: np.ndarray, as_of: AsOf) -> np.ndarray:
+    """The prices at each of the times at, from the sorted series (times, prices), where all times are int64
+    nanoseconds. Found by a single binary search of times for all of at, and NaN where there is no price."""
+
+    at = np.asarray(at, dtype=np.int64)
+    if len(times) == 0:
+        return np.full(at.shape, np.nan)
+
+    if as_of == AsOf.NEXT:
+        i = np.searchsorted(times, at, side="left")
+        valid = i < len(times)
+        return np.where(valid, prices[np.minimum(i, len(times) - 1)], np.nan)
+
+    i = np.searchsorted(times, at, side="right") - 1
+    i_clipped = np.maximum(i, 0)
+    if as_of == AsOf.PREVIOUS:
+        return np.where(i >= 0, prices[i_clipped], np.nan)
+
+    j = np.minimum(i_clipped + 1, len(times) - 1)
+    span = times[j] - times[i_clipped]
+    weight = np.divide(at - times[i_clipped], span, out=np.zeros(at.shape), where=span > 0)
+    interpolated = prices[i_clipped] + weight * (prices[j] - prices[i_clipped])
+    return np.where((i >= 0) & (at <= times[-1]), interpolated, np.nan)
+
+
+@dataclass(config=ConfigDict(arbitrary_types_allowed=True))
 class MarketRate:
-    """A MarketRate is a TariffRate defined with a default currency of _null and a value
-    of None. The value of a MarketRate tariff is determined on-the-fly when applied to
-    MeterData.
+    """A MarketRate is a rate whose value varies with time, as given by a series of prices. The value of a
+    MarketRate is determined on-the-fly when applied to MeterData, by an as-of join of the times of the metering
+    data against the times of the series.
+
+    The series is given as a rate_lookup of tz-aware datetime to price, or as arrays of times (datetime64[ns], in
+    UTC) and prices, from which it is held as sorted arrays of times and (float64) prices. It may instead reference
+    the series of its region and currency in the shared price store (see core.prices), which it does not copy.
     """
 
-    rate_lookup: dict[datetime, float]
-    currency: str  # TODO makes sense to restrict this to ISO format length
+    rate_lookup: Optional[dict[datetime, float]] = None
+    currency: str = ""  # TODO makes sense to restrict this to ISO format length
     value: float | None = None
+    times: Optional[np.ndarray] = None
+    prices: Optional[np.ndarray] = None
+    as_of: AsOf = AsOf.PREVIOUS
+    region: Optional[str] = None
+    _times: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _prices: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    @field_validator("times", "prices", mode="before")
+    @classmethod
+    def validate_array(cls, value: Any) -> Optional[np.ndarray]:
+        return None if value is None else np.asarray(value)
+
+    @model_validator(mode="after")
+    def validate_price_series(self) -> "MarketRate":
+        if not self.currency:
+            raise ValueError
+
+        if self.region is not None:
+            if self.times is not None or self.prices is not None or self.rate_lookup is not None:
+                raise ValueError
+            if (self.region, self.currency) not in PRICES:
+                raise ValueError(f"No price series is stored for {self.region} {self.currency}")
+            return self
+
+        times, prices = self.times, self.prices
+        if self.rate_lookup is not None:
+            if times is not None or prices is not None:
+                raise ValueError
+            if not all(is_aware(t) for t in self.rate_lookup):
+                raise ValueError
+            times = np.array([pd.Timestamp(t).value for t in self.rate_lookup], dtype="datetime64[ns]")
+            prices = np.array(list(self.rate_lookup.values()), dtype=np.float64)
+
+        if times is None or prices is None or len(times) != len(prices):
+            raise ValueError
+
+        times = times.astype("datetime64[ns]")
+        order = np.argsort(times, kind="stable")
+        self._times, self._prices = times[order], prices.astype(np.float64)[order]
+        if (np.diff(self._times.view(np.int64)) == 0).any():
+            raise ValueError("MarketRate times must be unique")
+
+        self._times.flags.writeable = False
+        self._prices.flags.writeable = False
+        return self
+
+    @property
+    def series(self) -> tuple[np.ndarray, np.ndarray]:
+        """The sorted times (datetime64[ns], in UTC) and prices of the rate"""
+
+        if self.region is not None:
+            return PRICES.series(self.region, self.currency)
+        if self._times is None or self._prices is None:
+            raise ValueError
+        return self._times, self._prices
+
+    def values_at(self, index: pd.DatetimeIndex) -> np.ndarray:
+        """The price at each element of the tz-aware index, NaN where there is none"""
+
+        if index.tz is None:
+            raise ValueError
+        times, prices = self.series
+        return asof_prices(times.view(np.int64), prices, index.as_unit("ns").asi8, self.as_of)
 
     def get_value(self, t: datetime) -> float:
-        # TODO
-        raise NotImplementedError
+        if not is_aware(t):
+            raise ValueError
+        return float(self.values_at(pd.DatetimeIndex([pd.Timestamp(t)]))[0])
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, MarketRate):
             raise ValueError
-        return self.currency == other.currency and self.value == other.value
+        return (
+            self.currency == other.currency
+            and self.value == other.value
+            and self.as_of == other.as_of
+            and self.region == other.region
+            and (self.region is not None or np.array_equal(self.series[0], other.series[0]))
+            and (self.region is not None or np.array_equal(self.series[1], other.series[1]))
+        )
 
     def __hash__(self) -> int:
-        return hash(self.currency) ^ hash(self.value)
+        if self.region is not None:
+            return hash(self.currency) ^ hash(self.value) ^ hash(self.region)
+        times, prices = self.series
+        return hash(self.currency) ^ hash(self.value) ^ hash((times.tobytes(), prices.tobytes()))
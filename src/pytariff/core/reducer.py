@@ -0,0 +1,72 @@
+"""A process-wide registry of named segment reducers, by which charges aggregate usage beyond the UsageChargeMethods
+built into pytariff, e.g.
+
+    REDUCERS.register("p95", lambda values, starts: segment_quantile(values, starts, 0.95))
+    charge = DemandCharge(..., method=UsageChargeMethod.registered, reducer="p95")
+
+A reducer takes the values of a profile (of shape (T,) or (T, N), for a fleet of N meters) and the offsets at which
+each reset period begins, and returns one value per period (of shape (len(starts),) or (len(starts), N)). It is called
+once per charge over every period at once, so it should be written in terms of NumPy operations over whole segments
+(see pytariff._internal.segment), rather than looping over periods or rows.
+
+Charges and compiled plans reference reducers by name alone, such that a plan saved by one process may be applied by
+another which has registered the same names.
+"""
+
+import inspect
+from typing import Callable, Iterator
+
+import numpy as np
+
+SegmentReducer = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+class ReducerRegistry:
+    """Holds one SegmentReducer per name"""
+
+    def __init__(self) -> None:
+        self._reducers: dict[str, SegmentReducer] = {}
+
+    def __len__(self) -> int:
+        return len(self._reducers)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._reducers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._reducers)
+
+    def register(self, name: str, reducer: SegmentReducer, replace: bool = False) -> SegmentReducer:
+        """Register reducer by name, which must be non-empty and (unless replace) not already registered to a
+        different reducer. The reducer must be callable as reducer(values, starts)."""
+
+        if not name:
+            raise ValueError("A reducer must be named")
+        if not replace and self._reducers.get(name, reducer) is not reducer:
+            raise ValueError(f"A different reducer is already registered as {name}")
+        try:
+            inspect.signature(reducer).bind(np.zeros(0), np.zeros(0, dtype=np.intp))
+        except TypeError:
+            raise ValueError(f"Reducer {name} must be callable as reducer(values, starts)")
+
+        self._reducers[name] = reducer
+        return reducer
+
+    def unregister(self, name: str) -> None:
+        self._reducers.pop(name, None)
+
+    def get(self, name: str) -> SegmentReducer:
+        if name not in self._reducers:
+            raise ValueError(f"No reducer is registered as {name}")
+        return self._reducers[name]
+
+    def reduce(self, name: str, values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Apply the reducer registered as name to each segment of values, checking the shape of its result"""
+
+        result = np.asarray(self.get(name)(values, starts), dtype=np.float64)
+        if result.shape != (len(starts),) + values.shape[1:]:
+            raise ValueError(f"Reducer {name} must return one value per segment, not an array of shape {result.shape}")
+        return result
+
+
+REDUCERS = ReducerRegistry()
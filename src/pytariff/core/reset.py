@@ -1,8 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 
 from pydantic.dataclasses import dataclass
 from pydantic import model_validator
+from pytariff._internal import period
 from pytariff._internal.helper import is_aware
 
 
@@ -27,48 +32,44 @@ class ResetPeriod(Enum):
     def count_occurences(self, until: datetime, reference: datetime) -> int:
         """Count the number of times since reference time until time until that the given ResetPeriod
         has occurred. Used to keep track of ResetPeriods"""
+        return period.count_until(until, reference, self.value)
 
-        # TODO handling of delta and day_replace is very ugly
-
-        current = reference
-        count = 0
-        day_replace = False
-
-        if self._is_minutely():
-            delta = timedelta(minutes=int(self.value.replace("min", "")))
+    def _period_ids(self, index: pd.DatetimeIndex, reference: datetime) -> np.ndarray:
+        """Vectorised form of count_occurences, evaluated for every element of index at once"""
+        return period.period_ids(index, reference, self.value)
 
-        elif self._is_hourly():
-            delta = timedelta(hours=int(self.value.replace("h", "")))
 
-        elif self._is_daily():
-            delta = timedelta(days=int(self.value.replace("D", "")))
+class ResetScope(Enum):
+    """The rows of each reset period over which a charge aggregates usage (e.g. by UsageChargeMethod.cumsum):
+    every row of the period, or only the rows at which the charge applies"""
 
-        elif self.name == "FIRST_OF_MONTH":
-            delta = timedelta(days=32)  # always longer than longest month => after day_replace, will count months
-            day_replace = True
+    ALL_ROWS = "all_rows"
+    ACTIVE_ROWS = "active_rows"
 
-        elif self.name == "FIRST_OF_QUARTER":
-            delta = timedelta(days=93)  # always longer than longest quarter => after day_replace, will count quarters
-            day_replace = True
 
-        while current <= until:
-            count += 1
+@dataclass(frozen=True)
+class Ratchet:
+    """A ratchet bills the greater of the aggregate usage (e.g. the peak demand) of each reset period and percentage
+    of the greatest aggregate of the previous periods, of which there are at most periods"""
 
-            if day_replace:
-                current = (current + delta).replace(day=1)
-            else:
-                current = current + delta
+    percentage: float
+    periods: int = 11
 
-        return count
+    @model_validator(mode="after")
+    def validate_ratchet(self) -> "Ratchet":
+        if not self.percentage > 0 or self.periods < 1:
+            raise ValueError
+        return self
 
 
 @dataclass
 class ResetData:
     """Contains information about when the reset period anchor (start), and the frequency with
-    which it is reset"""
+    which it is reset, along with any ratchet over the previous reset periods"""
 
     anchor: datetime
     period: ResetPeriod
+    ratchet: Optional[Ratchet] = None
 
     @model_validator(mode="after")
     def assert_anchor_tz_aware(self) -> "ResetData":
@@ -77,4 +78,4 @@ class ResetData:
         return self
 
     def __hash__(self) -> int:
-        return hash(self.anchor) ^ hash(self.period)
+        return hash(self.anchor) ^ hash(self.period) ^ hash(self.ratchet)
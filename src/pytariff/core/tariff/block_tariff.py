@@ -2,6 +2,7 @@ import pandas as pd
 from pydantic import model_validator
 import pandera as pa
 from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.precision import Precision
 from pytariff.core.typing import MetricType
 from pytariff.core.interval import TariffInterval
 from pytariff.core.unit import TariffUnit
@@ -29,5 +30,7 @@ class BlockTariff(GenericTariff[MetricType]):
         return self
 
     @pa.check_types
-    def apply_to(self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit) -> pd.DataFrame:
-        return super().apply_to(profile_handler, profile_unit)
+    def apply_to(
+        self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit, precision: Precision = Precision.DOUBLE
+    ) -> pd.DataFrame:
+        return super().apply_to(profile_handler, profile_unit, precision)
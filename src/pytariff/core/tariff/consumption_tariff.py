@@ -1,6 +1,7 @@
 import pandas as pd
 from pydantic import model_validator
 from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.precision import Precision
 from pytariff.core.typing import Consumption
 from pytariff.core.interval import ConsumptionInterval
 from pytariff.core.unit import TariffUnit
@@ -25,5 +26,7 @@ class ConsumptionTariff(GenericTariff[Consumption]):
                 raise ValueError
         return self
 
-    def apply_to(self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit) -> pd.DataFrame:
-        return super().apply_to(profile_handler, profile_unit)
+    def apply_to(
+        self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit, precision: Precision = Precision.DOUBLE
+    ) -> pd.DataFrame:
+        return super().apply_to(profile_handler, profile_unit, precision)
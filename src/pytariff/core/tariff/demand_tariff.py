@@ -1,6 +1,7 @@
 from pydantic import model_validator
 from pytariff.core.charge import DemandCharge
 from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.precision import Precision
 from pytariff.core.typing import Demand
 from pytariff.core.interval import DemandInterval
 from pytariff.core.unit import TariffUnit
@@ -30,5 +31,7 @@ class DemandTariff(GenericTariff[Demand]):
 
         return self
 
-    def apply_to(self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit) -> pd.DataFrame:
-        return super().apply_to(profile_handler, profile_unit)
+    def apply_to(
+        self, profile_handler: MeterProfileHandler, profile_unit: TariffUnit, precision: Precision = Precision.DOUBLE
+    ) -> pd.DataFrame:
+        return super().apply_to(profile_handler, profile_unit, precision)
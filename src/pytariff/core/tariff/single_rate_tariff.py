@@ -2,6 +2,7 @@ from typing import Generic
 import pandas as pd
 from pydantic import model_validator
 from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.precision import Precision
 from pytariff.core.typing import MetricType
 
 from pytariff.core.interval import TariffInterval
@@ -39,5 +40,7 @@ class SingleRateTariff(GenericTariff, Generic[MetricType]):
 
         return self
 
-    def apply_to(self, profile_handler: MeterProfileHandler, tariff_unit: TariffUnit) -> pd.DataFrame:
-        return super().apply_to(profile_handler, tariff_unit)
+    def apply_to(
+        self, profile_handler: MeterProfileHandler, tariff_unit: TariffUnit, precision: Precision = Precision.DOUBLE
+    ) -> pd.DataFrame:
+        return super().apply_to(profile_handler, tariff_unit, precision)
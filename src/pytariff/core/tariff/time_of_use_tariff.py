@@ -1,5 +1,7 @@
 from pydantic import model_validator
+from pytariff._internal import overlap
 from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.precision import Precision
 from pytariff.core.typing import MetricType
 from pytariff.core.interval import TariffInterval
 from pytariff.core.unit import TariffUnit
@@ -25,33 +27,30 @@ class TimeOfUseTariff(GenericTariff[MetricType]):
         if len(self.children) < 2 or len(set(self.children)) < 2:
             raise ValueError
 
-        for i, child_a in enumerate(self.children):
-            for j, child_b in enumerate(self.children):
-                if i != j:
-                    # Units must match to be considered an intersection
-                    if child_a.charge.unit != child_b.charge.unit:
-                        continue
-
-                    # Tariff intervals must share days_applied and timezone attrs
-                    if not (child_a.days_applied == child_b.days_applied and child_a.tzinfo == child_b.tzinfo):
-                        raise ValueError(
-                            "Tariff intervals in TimeOfUseTariff must share DaysApplied and tzinfo attributes"
-                        )
-
-                    # Tariff intervals must contain unique, non-overlapping [start, end) intervals
-                    if child_a.start_time is None or child_a.end_time is None:
-                        raise ValueError("TimeOfUseTariff children must contain non-null start and end times")
-                    if child_b.start_time is None or child_b.end_time is None:
-                        raise ValueError("TimeOfUseTariff children must contain non-null start and end times")
-
-                    start_intersection = max(child_a.start_time, child_b.start_time)
-                    end_intersection = min(child_a.end_time, child_b.end_time)
-                    if start_intersection < end_intersection:
-                        raise ValueError(
-                            "Tariff intervals in TimeOfUseTariff must contain unique, non-overlapping time intervals"
-                        )  # TODO verify this
+        # Units must match to be considered an intersection
+        groups: dict[tuple, list[TariffInterval]] = {}
+        for child in self.children:
+            groups.setdefault((child.charge.unit.metric, child.charge.unit.direction), []).append(child)
+
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+
+            # Tariff intervals must share days_applied and timezone attrs
+            if not all(x.days_applied == group[0].days_applied and x.tzinfo == group[0].tzinfo for x in group):
+                raise ValueError("Tariff intervals in TimeOfUseTariff must share DaysApplied and tzinfo attributes")
+
+            # Tariff intervals must contain unique, non-overlapping [start, end) intervals
+            if any(x.start_time is None or x.end_time is None for x in group):
+                raise ValueError("TimeOfUseTariff children must contain non-null start and end times")
+            if overlap.time_intervals_overlap(group):
+                raise ValueError(
+                    "Tariff intervals in TimeOfUseTariff must contain unique, non-overlapping time intervals"
+                )  # TODO verify this
 
         return self
 
-    def apply_to(self, profile_handler: MeterProfileHandler, tariff_unit: TariffUnit) -> pd.DataFrame:
-        return super().apply_to(profile_handler, tariff_unit)
+    def apply_to(
+        self, profile_handler: MeterProfileHandler, tariff_unit: TariffUnit, precision: Precision = Precision.DOUBLE
+    ) -> pd.DataFrame:
+        return super().apply_to(profile_handler, tariff_unit, precision)
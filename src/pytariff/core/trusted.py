@@ -0,0 +1,87 @@
+"""Construction of tariff models from trusted data, without validation.
+
+Tariffs read from a source which has already validated them (e.g. a database written by pytariff) need not
+pay for pydantic validation and model validators again on every build. construct builds any tariff model,
+(a GenericTariff, TariffInterval, TariffCharge, TariffBlock, ...) directly from its field values:
+
+    block = construct(TariffBlock, rate=rate, from_quantity=0.0, to_quantity=float("inf"))
+    charge = construct(TariffCharge, blocks=(block,), unit=unit, reset_data=None)
+
+Values are used exactly as given, so must already be of the final field types (e.g. tuples rather than lists,
+aware times rather than naive times). Where the data is not fully trusted, validate_tree checks a constructed
+tree in one pass.
+"""
+
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from pydantic.dataclasses import is_pydantic_dataclass
+from pydantic_core import PydanticUndefined
+
+T = TypeVar("T")
+
+
+def construct(cls: type[T], **values: Any) -> T:
+    """Build an instance of the pydantic model or pydantic dataclass cls from values, without validation.
+    Fields which are not given take their default value (so that e.g. a uuid is still generated)."""
+
+    model_fields = cls.model_fields if issubclass(cls, BaseModel) else getattr(cls, "__pydantic_fields__", None)
+    if model_fields is None:
+        raise ValueError(f"{cls.__name__} is not a pydantic model")
+
+    for name, field in model_fields.items():
+        if name not in values:
+            default = field.get_default(call_default_factory=True)
+            if default is PydanticUndefined:
+                raise ValueError(f"Missing value for required field {cls.__name__}.{name}")
+            values[name] = default
+
+    if issubclass(cls, BaseModel):
+        return cls.model_construct(**values)
+
+    obj = cls.__new__(cls)
+    for name, value in values.items():
+        object.__setattr__(obj, name, value)
+    return obj
+
+
+def _is_model(obj: object) -> bool:
+    return isinstance(obj, BaseModel) or is_pydantic_dataclass(type(obj))
+
+
+def _children(obj: object) -> list[object]:
+    """The pydantic models held by the fields of obj, including those held in tuples and lists"""
+
+    model_fields = type(obj).model_fields if isinstance(obj, BaseModel) else getattr(obj, "__pydantic_fields__")
+    children = []
+    for name in model_fields:
+        value = getattr(obj, name, None)
+        for item in value if isinstance(value, (tuple, list)) else (value,):
+            if _is_model(item):
+                children.append(item)
+    return children
+
+
+def validate_tree(obj: T) -> T:
+    """Run the model validators of obj and of every pydantic model beneath it, children before their parents,
+    as pydantic would on construction. Each model shared between several parents is validated once.
+    Field types and constraints are not checked. Raises ValueError if any validator fails."""
+
+    validated: set[int] = set()
+    stack: list[tuple[object, bool]] = [(obj, False)]
+    while stack:
+        node, is_expanded = stack.pop()
+        if id(node) in validated:
+            continue
+        if not is_expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(_children(node)))
+            continue
+
+        for decorator in type(node).__pydantic_decorators__.model_validators.values():  # type: ignore
+            if decorator.info.mode != "after":
+                raise ValueError(f"Cannot run {decorator.info.mode} validator {decorator.cls_var_name}")
+            decorator.func(node)
+        validated.add(id(node))
+
+    return obj
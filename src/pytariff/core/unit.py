@@ -46,6 +46,9 @@ class UsageChargeMethod(Enum):
     rolling_mean = "rolling_mean"
     cumsum = "cumsum"
     identity = "identity"  # i.e. apply identity to usage values in meter profile
+    top_n_mean = "top_n_mean"  # i.e. the mean of the top_n greatest usage values (or daily maxima) of each period
+    coincident_peak = "coincident_peak"  # i.e. the mean usage at the coincident peaks within each period
+    registered = "registered"  # i.e. reduce each period by the reducer registered by name (see core.reducer)
 
 
 @dataclass
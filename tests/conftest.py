@@ -1,9 +1,18 @@
+from datetime import datetime, time
+from typing import Any, Callable, Optional
+from zoneinfo import ZoneInfo
+
 import pytest
 
-from pytariff.core.block import ConsumptionBlock, DemandBlock
+from pytariff.core.block import ConsumptionBlock, DemandBlock, TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
 from pytariff.core.typing import Consumption, Demand
-from pytariff.core.rate import TariffRate
-from pytariff.core.unit import ConsumptionUnit, DemandUnit, SignConvention, TradeDirection
+from pytariff.core.rate import MarketRate, TariffRate
+from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.unit import ConsumptionUnit, DemandUnit, SignConvention, TariffUnit, TradeDirection
 
 
 @pytest.fixture
@@ -26,3 +35,49 @@ def DEFAULT_DEMAND_BLOCK():
         unit=DemandUnit(metric=Demand.kW, direction=TradeDirection.Import, convention=SignConvention.Passive),
         rate=TariffRate(currency="AUD", value=1),
     )
+
+
+@pytest.fixture
+def DEFAULT_GENERIC_TARIFF() -> Callable[..., GenericTariff]:
+    """A factory of GenericTariffs over 2023 (in UTC) of a single child, which charges imports at all times. Its
+    blocks are given as (rate, from_quantity, to_quantity), of AUD where the rate is a float, and its charge is
+    reset by reset_period (if any) and given any further fields (e.g. method) by keyword."""
+
+    utc = ZoneInfo("UTC")
+
+    def _tariff(
+        *blocks: tuple[float | MarketRate, float, float], reset_period: Optional[ResetPeriod] = None, **charge: Any
+    ) -> GenericTariff:
+        return GenericTariff(
+            start=datetime(2023, 1, 1, tzinfo=utc),
+            end=datetime(2023, 12, 31, tzinfo=utc),
+            children=(
+                TariffInterval(
+                    start_time=time(0),
+                    end_time=time(0),
+                    days_applied=DaysApplied(day_types=DayType.ALL_DAYS),
+                    tzinfo=utc,
+                    charge=TariffCharge(
+                        blocks=tuple(
+                            TariffBlock(
+                                rate=TariffRate(currency="AUD", value=rate) if isinstance(rate, float) else rate,
+                                from_quantity=from_quantity,
+                                to_quantity=to_quantity,
+                            )
+                            for rate, from_quantity, to_quantity in blocks or ((1.0, 0, float("inf")),)
+                        ),
+                        unit=TariffUnit(
+                            metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive
+                        ),
+                        reset_data=(
+                            ResetData(anchor=datetime(2023, 1, 1, tzinfo=utc), period=reset_period)
+                            if reset_period is not None
+                            else None
+                        ),
+                        **charge,
+                    ),
+                ),
+            ),
+        )
+
+    return _tariff
@@ -1,6 +1,7 @@
 from datetime import date, datetime, time, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+import pandas as pd
 import pytest
 from holidays import country_holidays
 
@@ -406,3 +407,55 @@ def test_applied_interval_datetime_membership(
 def test_applied_interval_intersection(interval_1, interval_2, expected_intersection):
     """"""
     assert (interval_1 & interval_2) == expected_intersection
+
+
+SYDNEY = ZoneInfo("Australia/Sydney")
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time, day_types",
+    [
+        (time(16), time(21), (DayType.ALL_DAYS,)),
+        (time(21), time(7), (DayType.WEEKDAYS,)),
+        (time(1, 30), time(3, 15), (DayType.SUNDAY,)),
+        (time(0), time(0), (DayType.BUSINESS_DAYS,)),
+    ],
+)
+@pytest.mark.parametrize("start, end", [("2023-03-31", "2023-04-04"), ("2023-09-29", "2023-10-03")])
+def test_applied_interval_contains_index_across_dst(
+    start_time: time, end_time: time, day_types: tuple[DayType, ...], start: str, end: str
+) -> None:
+    """Windows are tested on the local wall clock, agreeing with the membership of each datetime in any zone"""
+
+    interval = AppliedInterval(
+        start_time=start_time,
+        end_time=end_time,
+        days_applied=DaysApplied(day_types=day_types, holidays=country_holidays("AU", subdiv="NSW", years=2023)),
+        tzinfo=SYDNEY,
+    )
+    index = pd.date_range(start=start, end=end, freq="15min", tz="UTC")
+
+    contains = interval.contains_index(index)
+    assert list(contains) == [x.to_pydatetime() in interval for x in index]
+    assert list(contains) == [x.to_pydatetime().astimezone(SYDNEY) in interval for x in index]
+
+    local = index.tz_convert(SYDNEY)
+    if start_time < end_time:
+        assert ((local.time[contains] >= start_time) & (local.time[contains] < end_time)).all()
+
+
+def test_applied_interval_contains_index_ambiguous_and_missing_times() -> None:
+    """Wall-clock times repeated when clocks are set back are contained on both occasions, while those skipped
+    when clocks are set forward never occur"""
+
+    interval = AppliedInterval(
+        start_time=time(2), end_time=time(3), days_applied=DaysApplied(day_types=(DayType.SUNDAY,)), tzinfo=SYDNEY
+    )
+
+    fall_back = pd.date_range(start="2023-04-01 12:00", end="2023-04-02 12:00", freq="15min", tz="UTC")
+    assert interval.contains_index(fall_back).sum() == 8
+
+    spring_forward = pd.date_range(start="2023-09-30 12:00", end="2023-10-01 12:00", freq="15min", tz="UTC")
+    assert interval.contains_index(spring_forward).sum() == 0
+
+    assert not interval.contains_index(fall_back.tz_localize(None)).any()
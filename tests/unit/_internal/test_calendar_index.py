@@ -0,0 +1,48 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from holidays import HolidayBase, country_holidays
+
+from pytariff._internal.calendar import CalendarIndex, day_number, local_days
+
+
+def test_calendar_index_from_days() -> None:
+    """"""
+
+    calendar = CalendarIndex.from_days([3, 5, 100], first_day=2, last_day=10)
+
+    assert len(calendar.is_holiday) == 9
+    assert list(calendar.holidays(np.arange(0, 12))) == [x in (3, 5) for x in range(12)]
+    assert list(calendar.business_days(np.array([3, 4]))) == [False, True]
+    assert not calendar.is_holiday.flags.writeable
+
+
+def test_calendar_index_expands_holidays() -> None:
+    """Holidays are expanded over every year of the range, where the calendar allows"""
+
+    holidays = country_holidays("AUS", years=2023)
+    calendar = CalendarIndex.from_holidays(holidays, day_number(date(2023, 12, 1)), day_number(date(2024, 1, 31)))
+    days = np.array([day_number(x) for x in (date(2023, 12, 25), date(2024, 1, 1), date(2024, 1, 2))])
+
+    assert list(calendar.holidays(days)) == [True, True, False]
+
+
+def test_calendar_index_custom_holidays_are_not_expanded() -> None:
+    """"""
+
+    holidays = HolidayBase()
+    holidays.append([date(2023, 6, 5)])
+    calendar = CalendarIndex.for_days(holidays, np.arange(day_number(date(2023, 1, 1)), day_number(date(2025, 1, 1))))
+
+    assert calendar.is_holiday.sum() == 1
+    assert CalendarIndex.for_days(holidays, np.zeros(0, dtype=np.int64)).holidays(np.array([0])).tolist() == [False]
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "Australia/Sydney", "America/New_York"])
+def test_local_days(tz: str) -> None:
+    """"""
+
+    index = pd.date_range(start="1969-12-30", end="1970-01-03", freq="5h", tz=tz)
+    assert list(local_days(index)) == [day_number(x.date()) for x in index]
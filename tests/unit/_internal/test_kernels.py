@@ -0,0 +1,92 @@
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytariff._internal import engine, kernels, segment
+from pytariff.core.precision import Precision
+from pytariff.core.reset import ResetPeriod
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.unit import UsageChargeMethod
+
+UTC = ZoneInfo("UTC")
+STARTS = np.array([0, 3, 4, 10])
+BLOCK_FROM = np.array([0.0, 1.0, 2.0])
+BLOCK_TO = np.array([1.0, 2.0, 3.0])
+
+
+def _values(shape: tuple[int, ...], dtype: type) -> np.ndarray:
+    values = np.random.default_rng(0).uniform(-1, 4, shape).astype(dtype)
+    values[12] = np.nan  # in the last segment, as NumPy cumulative sums carry NaN into every later segment
+    return values
+
+
+@pytest.mark.parametrize("shape", [(16,), (16, 3)])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize(
+    "kernel, reference",
+    [
+        (kernels.segment_sum, segment.segment_sum),
+        (kernels.segment_max, segment.segment_max),
+        (kernels.segment_cumsum, segment.segment_cumsum),
+    ],
+)
+def test_segment_kernels(
+    kernel: Callable[..., np.ndarray], reference: Callable[..., np.ndarray], shape: tuple[int, ...], dtype: type
+) -> None:
+    """Each kernel (here, uncompiled) matches its NumPy equivalent, including the propagation of NaN"""
+
+    values = _values(shape, dtype)
+    expected = reference(values, STARTS)
+    result = kernel(values, STARTS)
+
+    assert result.dtype == expected.dtype and result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("shape", [(16,), (16, 3)])
+@pytest.mark.parametrize("rate", [np.array([1.0, np.nan, 3.0]), np.arange(48.0).reshape((3, 16))])
+def test_block_cost_kernel(shape: tuple[int, ...], rate: np.ndarray) -> None:
+    """The block cost kernel (here, uncompiled) matches engine._block_cost, of every row or of a signed subset"""
+
+    values = _values(shape, np.float64)
+    clipped = np.maximum(values, 0.0)
+    np.testing.assert_array_equal(
+        kernels.block_cost(values, BLOCK_FROM, BLOCK_TO, rate, np.arange(16)),
+        engine._block_cost(clipped, BLOCK_FROM, BLOCK_TO, rate),
+    )
+
+    # signed and clipped usage of a subset of rows, at the rates of those rows
+    rows = np.array([1, 2, 5, 7, 11])
+    rows_rate = rate if rate.ndim == 1 else rate[:, rows]
+    np.testing.assert_array_equal(
+        kernels.block_cost(values, BLOCK_FROM, BLOCK_TO, rows_rate, rows, -1.0),
+        engine._block_cost(np.maximum(-values[rows], 0.0), BLOCK_FROM, BLOCK_TO, rows_rate),
+    )
+
+
+@pytest.mark.parametrize("method", [UsageChargeMethod.identity, UsageChargeMethod.max, UsageChargeMethod.cumsum])
+@pytest.mark.parametrize("precision", [Precision.DOUBLE, Precision.SINGLE])
+def test_tariff_plan_evaluate_with_kernels(
+    DEFAULT_GENERIC_TARIFF: Callable[..., GenericTariff],
+    monkeypatch: pytest.MonkeyPatch,
+    method: UsageChargeMethod,
+    precision: Precision,
+) -> None:
+    """Plans evaluate alike with and without kernels"""
+
+    tariff = DEFAULT_GENERIC_TARIFF((0.2, 0, 1), (0.1, 1, float("inf")), reset_period=ResetPeriod.DAILY, method=method)
+    index = pd.date_range(start="2023-01-01", end="2023-01-03", freq="30min", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(-2, 2, (len(index), 2))
+    plan = tariff.compile()
+
+    monkeypatch.setattr(kernels, "ENABLED", False)
+    expected = plan.evaluate(index, usage, precision=precision)
+    monkeypatch.setattr(kernels, "ENABLED", True)
+    result = plan.evaluate(index, usage, precision=precision)
+
+    for x, y in zip(result, expected):
+        assert x.dtype == y.dtype
+        np.testing.assert_allclose(x, y, rtol=1e-6)
@@ -0,0 +1,229 @@
+import copy
+import random
+from datetime import date, datetime, time
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+
+import pytest
+from holidays import HolidayBase, country_holidays
+
+from pytariff._internal.defined_interval import DefinedInterval
+from pytariff._internal.overlap import blocks_overlap, time_intervals_overlap
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
+from pytariff.core.rate import TariffRate
+from pytariff.core.tariff import TimeOfUseTariff
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection
+
+UTC = ZoneInfo("UTC")
+CUSTOM_HOLIDAYS = HolidayBase()
+CUSTOM_HOLIDAYS.append([date(2023, 6, 5)])
+CALENDARS = [country_holidays("AUS", years=2023), country_holidays("AUS", years=2024), CUSTOM_HOLIDAYS]
+BLOCKS = [((0, float("inf")),), ((0, 10), (10, float("inf"))), ((5, 20),), ((20, float("inf")),)]
+HOURS = [time(0), time(6), time(12), time(18), time(23, 59)]
+
+
+def _legacy_children_overlap(children: tuple[Any, ...]) -> None:
+    """The pairwise overlap validation which overlap.validate_children_cannot_overlap replaces"""
+
+    for i, x in enumerate(children):
+        for j, y in enumerate(children):
+            if i != j:
+                intersection = x & y
+                if (
+                    intersection is None
+                    or intersection._is_empty()
+                    or intersection._contains_day_type_only()
+                    or intersection._contains_time_only()
+                ):
+                    continue
+                else:
+                    raise ValueError
+
+    for i, x in enumerate(children):
+        for j, y in enumerate(children):
+            if i != j and x.tzinfo != y.tzinfo:
+                raise ValueError
+
+
+def _legacy_time_of_use(children: tuple[Any, ...]) -> None:
+    """The pairwise validation which TimeOfUseTariff.validate_time_of_use_tariff replaces"""
+
+    _legacy_children_overlap(children)
+    if len(children) < 2 or len(set(children)) < 2:
+        raise ValueError
+
+    for i, child_a in enumerate(children):
+        for j, child_b in enumerate(children):
+            if i != j:
+                if child_a.charge.unit != child_b.charge.unit:
+                    continue
+                if not (child_a.days_applied == child_b.days_applied and child_a.tzinfo == child_b.tzinfo):
+                    raise ValueError
+                if None in (child_a.start_time, child_a.end_time, child_b.start_time, child_b.end_time):
+                    raise ValueError
+                if max(child_a.start_time, child_b.start_time) < min(child_a.end_time, child_b.end_time):
+                    raise ValueError
+
+
+def _raises(fn: Any, *args: Any) -> Optional[bool]:
+    try:
+        fn(*args)
+    except ValueError:
+        return True
+    except IndexError:
+        # DaysApplied.__and__ fails on e.g. WEEKDAYS & BUSINESS_DAYS where both have holidays
+        return None
+    return False
+
+
+def _days_applied(rng: random.Random) -> DaysApplied:
+    day_types = tuple(rng.sample(list(DayType), rng.choice([1, 1, 2])))
+    holidays: Optional[HolidayBase] = rng.choice(CALENDARS + [None])
+    if DayType.BUSINESS_DAYS in day_types or DayType.HOLIDAYS in day_types:
+        holidays = rng.choice(CALENDARS)
+    return DaysApplied(
+        day_types=day_types if len(day_types) > 1 or rng.random() < 0.5 else day_types[0], holidays=holidays
+    )
+
+
+def _child(rng: random.Random, days_applied: DaysApplied, tzinfo: Optional[ZoneInfo]) -> TariffInterval:
+    return TariffInterval(
+        start_time=rng.choice(HOURS).replace(tzinfo=tzinfo or UTC),
+        end_time=rng.choice(HOURS).replace(tzinfo=tzinfo or UTC),
+        days_applied=days_applied,
+        tzinfo=tzinfo,
+        charge=TariffCharge(
+            blocks=tuple(
+                TariffBlock(rate=TariffRate("AUD", 1.0), from_quantity=lo, to_quantity=hi)
+                for lo, hi in rng.choice(BLOCKS)
+            ),
+            unit=TariffUnit(
+                metric=Consumption.kWh,
+                direction=rng.choice([TradeDirection.Import, TradeDirection.Export]),
+                convention=SignConvention.Passive,
+            ),
+            reset_data=None,
+        ),
+    )
+
+
+def _random_children(seed: int) -> tuple[TariffInterval, ...]:
+    rng = random.Random(seed)
+    tzinfo = rng.choice([UTC, UTC, UTC, None])
+    shared_days_applied = _days_applied(rng)
+    children = []
+    for _ in range(rng.randint(2, 5)):
+        days_applied = shared_days_applied if rng.random() < 0.6 else _days_applied(rng)
+        child_tzinfo = tzinfo if rng.random() < 0.95 else ZoneInfo("Australia/Brisbane")
+        children.append(_child(rng, days_applied, child_tzinfo))
+    return tuple(children)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_validate_children_cannot_overlap_matches_pairwise(seed: int) -> None:
+    """The sweep accepts and rejects exactly the children which the pairwise intersection did"""
+
+    children = _random_children(seed)
+
+    def _defined_interval(children: tuple[TariffInterval, ...]) -> DefinedInterval:
+        return DefinedInterval(start=datetime(2023, 1, 1), end=datetime(2023, 12, 31), tzinfo=UTC, children=children)
+
+    expected = _raises(_legacy_children_overlap, copy.deepcopy(children))
+    if expected is not None:
+        assert _raises(_defined_interval, copy.deepcopy(children)) == expected
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_validate_time_of_use_tariff_matches_pairwise(seed: int) -> None:
+    """"""
+
+    children = _random_children(seed)
+
+    def _tariff(children: tuple[TariffInterval, ...]) -> TimeOfUseTariff:
+        return TimeOfUseTariff(start=datetime(2023, 1, 1), end=datetime(2023, 12, 31), tzinfo=UTC, children=children)
+
+    expected = _raises(_legacy_time_of_use, copy.deepcopy(children))
+    if expected is not None:
+        assert _raises(_tariff, copy.deepcopy(children)) == expected
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        (((0, 10),), ((10, 20),), False),
+        (((0, 10),), ((5, 20),), True),
+        (((0, 10), (20, 30)), ((10, 20), (30, 40)), False),
+        (((0, 10), (20, 30)), ((10, 21),), True),
+        ((), ((0, 10),), False),
+    ],
+)
+def test_blocks_overlap(a: tuple, b: tuple, expected: bool) -> None:
+    """"""
+
+    def _blocks(bounds: tuple) -> tuple[TariffBlock, ...]:
+        return tuple(TariffBlock(rate=None, from_quantity=lo, to_quantity=hi) for lo, hi in bounds)
+
+    assert blocks_overlap(_blocks(a), _blocks(b)) == expected
+    assert blocks_overlap(_blocks(b), _blocks(a)) == expected
+
+
+def test_time_intervals_overlap_with_many_children() -> None:
+    """48 half-hourly bands are checked without comparing every pair"""
+
+    days_applied = DaysApplied(day_types=DayType.ALL_DAYS)
+    bands = [
+        TariffInterval(
+            start_time=time(i // 2, 30 * (i % 2)),
+            end_time=time((i + 1) // 2 % 24, 30 * ((i + 1) % 2)),
+            days_applied=days_applied,
+            tzinfo=UTC,
+            charge=TariffCharge(
+                blocks=(TariffBlock(rate=TariffRate("AUD", i), from_quantity=0, to_quantity=float("inf")),),
+                unit=TariffUnit(
+                    metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive
+                ),
+                reset_data=None,
+            ),
+        )
+        for i in range(48)
+    ]
+
+    assert not time_intervals_overlap(bands)
+    assert time_intervals_overlap(bands + [bands[10]])
+    assert (
+        len(
+            TimeOfUseTariff(
+                start=datetime(2023, 1, 1), end=datetime(2023, 12, 31), tzinfo=UTC, children=tuple(bands)
+            ).children
+        )
+        == 48
+    )
+
+
+def test_validate_children_cannot_overlap_has_no_side_effects() -> None:
+    """DaysApplied shared between tariffs (e.g. by a catalog) are not modified by validating any one of them"""
+
+    days_applied = DaysApplied(day_types=DayType.MONDAY)
+    children = tuple(
+        TariffInterval(
+            start_time=time(hour, tzinfo=UTC),
+            end_time=time(hour + 6, tzinfo=UTC),
+            days_applied=days_applied,
+            tzinfo=UTC,
+            charge=TariffCharge(
+                blocks=(TariffBlock(rate=TariffRate("AUD", 1.0), from_quantity=0, to_quantity=float("inf")),),
+                unit=TariffUnit(
+                    metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive
+                ),
+                reset_data=None,
+            ),
+        )
+        for hour in (0, 6)
+    )
+
+    TimeOfUseTariff(start=datetime(2023, 1, 1), end=datetime(2023, 12, 31), tzinfo=UTC, children=children)
+    assert days_applied.day_types is DayType.MONDAY
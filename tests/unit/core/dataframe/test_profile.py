@@ -9,9 +9,9 @@ from pytariff.core.charge import TariffCharge
 
 
 from pytariff.core.dataframe.profile import MeterProfileHandler, MeterProfileSchema
-from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.reset import ResetData, ResetPeriod, ResetScope
 from pytariff.core.typing import Consumption
-from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection, UsageChargeMethod
 
 
 @pytest.mark.parametrize(
@@ -194,6 +194,7 @@ def test_meter_profile_schema_resample_method(
             ),
             mock.Mock(
                 spec=TariffCharge,
+                method=UsageChargeMethod.identity,
                 reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
                 unit=TariffUnit(
                     metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive
@@ -219,6 +220,7 @@ def test_meter_profile_schema_resample_method(
             ),
             mock.Mock(
                 spec=TariffCharge,
+                method=UsageChargeMethod.identity,
                 reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
                 unit=TariffUnit(
                     metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive
@@ -245,6 +247,7 @@ def test_meter_profile_schema_resample_method(
             ),
             mock.Mock(
                 spec=TariffCharge,
+                method=UsageChargeMethod.identity,
                 reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
                 unit=TariffUnit(
                     metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Active
@@ -270,6 +273,7 @@ def test_meter_profile_schema_resample_method(
             ),
             mock.Mock(
                 spec=TariffCharge,
+                method=UsageChargeMethod.identity,
                 reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
                 unit=TariffUnit(
                     metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive
@@ -305,3 +309,84 @@ def test_meter_profile_schema_transform_method(
     assert list(transformed._export_profile_usage_cumsum) == exp_cumsum_export
     assert list(transformed._import_profile_usage_max) == exp_import_max
     assert list(transformed._export_profile_usage_max) == exp_export_max
+
+
+@pytest.mark.parametrize(
+    "reset_scope, exp_import_max, exp_import_cumsum",
+    [
+        (
+            ResetScope.ACTIVE_ROWS,
+            [0.0] * 16 + [21.0] * 5 + [0.0] * 3,
+            [0.0] * 16 + list(np.cumsum(np.arange(17.0, 22))) + [0.0] * 3,
+        ),
+        (
+            ResetScope.ALL_ROWS,
+            [0.0] * 16 + [24.0] * 5 + [0.0] * 3,
+            [0.0] * 16 + list(np.cumsum(np.arange(1.0, 22))[16:]) + [0.0] * 3,
+        ),
+    ],
+)
+def test_meter_profile_schema_transform_applies(
+    reset_scope: ResetScope, exp_import_max: list[float], exp_import_cumsum: list[float]
+) -> None:
+    """Where the rows at which a charge applies are given, the profile is only aggregated over those rows"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-01-02", tz=ZoneInfo("UTC"), freq="1h", inclusive="left")
+    handler = MeterProfileHandler(pd.DataFrame(index=index, data={"profile": -np.arange(1.0, 25)}))
+    charge = mock.Mock(
+        spec=TariffCharge,
+        method=UsageChargeMethod.identity,
+        reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
+        unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive),
+        reset_scope=reset_scope,
+    )
+    applies = (index.hour >= 16) & (index.hour < 21)
+    transformed = handler._pytariff_transform(
+        handler.profile, datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), charge, applies=applies
+    )
+
+    assert list(transformed._import_profile_usage_max) == exp_import_max
+    assert list(transformed._import_profile_usage_cumsum) == exp_import_cumsum
+    assert not transformed._export_profile_usage_max.any()
+
+
+@pytest.mark.parametrize("window", ["1h", "3h", "150min"])
+def test_meter_profile_schema_transform_rolling_mean(window: str) -> None:
+    """The rolling mean matches that of pandas over the same time-based window, restarting each reset period"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-01-04", tz=ZoneInfo("UTC"), freq="30min", inclusive="left")
+    profile = np.random.default_rng(0).normal(0, 1, len(index))
+    handler = MeterProfileHandler(pd.DataFrame(index=index, data={"profile": profile}))
+    charge = mock.Mock(
+        spec=TariffCharge,
+        reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.DAILY),
+        unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive),
+        method=UsageChargeMethod.rolling_mean,
+        window=window,
+    )
+    transformed = handler._pytariff_transform(handler.profile, datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), charge)
+
+    usage = pd.Series(np.maximum(-profile, 0.0), index=index)
+    expected = usage.groupby(index.date).rolling(window).mean().droplevel(0)
+    np.testing.assert_allclose(transformed._import_profile_usage_rolling_mean, expected)
+
+
+@pytest.mark.parametrize("top_n, per_day, expected", [(2, False, 23.5), (2, True, 23.5), (3, True, 23.0)])
+def test_meter_profile_schema_transform_top_n_mean(top_n: int, per_day: bool, expected: float) -> None:
+    """The top-n mean of each reset period is of its greatest values, or the maxima of its greatest days"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-01-04", tz=ZoneInfo("UTC"), freq="1h", inclusive="left")
+    profile = -np.concatenate([np.arange(1.0, 25), np.arange(1.0, 25) - 1, np.arange(1.0, 25) - 2])
+    handler = MeterProfileHandler(pd.DataFrame(index=index, data={"profile": profile}))
+    charge = mock.Mock(
+        spec=TariffCharge,
+        reset_data=None,
+        unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive),
+        method=UsageChargeMethod.top_n_mean,
+        top_n=top_n,
+        top_n_per_day=per_day,
+    )
+    transformed = handler._pytariff_transform(handler.profile, datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), charge)
+
+    # the daily maxima are 24, 23 and 22, while the greatest values overall are 24, 23, 23 and 22, 22, 22
+    assert list(transformed._import_profile_usage_top_n_mean) == [expected] * len(index)
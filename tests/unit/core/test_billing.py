@@ -0,0 +1,135 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytariff.core.billing import BillingData, BillingPeriod
+from pytariff.core.dataframe.cost import TariffCostHandler
+from pytariff.core.fixed_point import FixedPoint
+from pytariff.core.rate import TariffRate
+
+
+@pytest.mark.parametrize(
+    "frequency, exp_period_starts",
+    [
+        (
+            BillingPeriod.FIRST_OF_MONTH,
+            [datetime(2023, 1, 1), datetime(2023, 2, 1), datetime(2023, 3, 1), datetime(2023, 4, 1)],
+        ),
+        (
+            BillingPeriod.FIRST_OF_QUARTER,
+            [datetime(2023, 1, 1), datetime(2023, 4, 1)],
+        ),
+        (
+            BillingPeriod.WEEKLY,
+            [datetime(2023, 1, 1) + pd.Timedelta(days=7 * i) for i in range(13)],
+        ),
+    ],
+)
+def test_billing_data_aggregate_period_starts(frequency: BillingPeriod, exp_period_starts: list[datetime]) -> None:
+    """"""
+
+    tz = ZoneInfo("Australia/Sydney")
+    index = pd.date_range(start="2023-01-01", end="2023-04-01", freq="30min", tz=tz)
+    billing_data = BillingData(start=datetime(2023, 1, 1, tzinfo=tz), frequency=frequency)
+
+    period_starts, billed = billing_data.aggregate(index, np.ones(len(index)))
+
+    assert list(period_starts) == [pd.Timestamp(x, tz=tz) for x in exp_period_starts]
+    assert billed.sum() == len(index)
+
+
+def test_billing_data_aggregate_supply_and_minimum_charge() -> None:
+    """A daily supply charge is levied on each calendar day of a billing period (up to the last day of data), and the
+    minimum charge is applied to the sum of the usage and supply costs"""
+
+    tz = ZoneInfo("UTC")
+    index = pd.date_range(start="2023-01-30", end="2023-02-03", freq="1h", tz=tz, inclusive="left")
+    costs = np.where(index < pd.Timestamp(2023, 2, 1, tz=tz), 1.0, 0.0)
+
+    billing_data = BillingData(
+        start=datetime(2023, 1, 1, tzinfo=tz),
+        supply_charge=TariffRate(currency="AUD", value=0.5),
+        minimum_charge=TariffRate(currency="AUD", value=10.0),
+    )
+    period_starts, summed, supply, billed = billing_data._pytariff_aggregate(index, costs)
+
+    assert list(period_starts) == [pd.Timestamp(2023, 1, 1, tz=tz), pd.Timestamp(2023, 2, 1, tz=tz)]
+    assert list(summed) == [48.0, 0.0]
+    assert list(supply) == [15.5, 1.0]
+    assert list(billed) == [63.5, 10.0]
+
+
+def test_billing_data_aggregate_supply_charge_of_missing_days() -> None:
+    """Days without data are charged the supply charge of their billing period"""
+
+    tz = ZoneInfo("Australia/Sydney")
+    index = pd.date_range(start="2023-01-01", end="2023-03-01", freq="1h", tz=tz, inclusive="left")
+    index = index[(index.day != 10) & (index.day != 11)]  # no data for two days of each month
+
+    billing_data = BillingData(start=datetime(2023, 1, 1, tzinfo=tz), supply_charge=TariffRate("AUD", 1.0))
+    _, _, supply, _ = billing_data._pytariff_aggregate(index, np.zeros(len(index)))
+
+    assert list(supply) == [31.0, 28.0]
+
+
+def test_billing_data_aggregate_fleet() -> None:
+    """Each account (column) of a fleet is billed independently, in one pass"""
+
+    tz = ZoneInfo("UTC")
+    index = pd.date_range(start="2022-12-31", end="2023-03-01", freq="1D", tz=tz, inclusive="left")
+    costs = np.stack([np.ones(len(index)), 2 * np.ones(len(index)), np.zeros(len(index))], axis=1)
+
+    billing_data = BillingData(start=datetime(2023, 1, 1, tzinfo=tz), minimum_charge=TariffRate("AUD", 30.0))
+    period_starts, billed = billing_data.aggregate(index, costs)
+
+    # the first day precedes the billing start, and so is not billed
+    assert len(period_starts) == 2
+    np.testing.assert_array_equal(billed, [[31.0, 62.0, 30.0], [30.0, 56.0, 30.0]])
+
+
+def test_billing_data_aggregate_fixed_point() -> None:
+    """Fixed-point costs are summed, and charged the supply and minimum charges, in integers, and only then
+    converted to currency"""
+
+    tz = ZoneInfo("UTC")
+    index = pd.date_range(start="2023-01-01", periods=3, freq="1h", tz=tz)
+    costs = np.full(len(index), 100_000, dtype=np.int64)  # 0.1 of currency per row, of which three sum to 0.3 + 4e-17
+
+    billing_data = BillingData(start=datetime(2023, 1, 1, tzinfo=tz), supply_charge=TariffRate("AUD", 0.1))
+    _, summed, supply, billed = billing_data._pytariff_aggregate(index, costs, fixed_point=FixedPoint())
+
+    assert list(summed) == [0.3] and list(supply) == [0.1] and list(billed) == [0.4]
+    assert billing_data.aggregate(index, costs, fixed_point=FixedPoint())[1][0] == 0.4
+    with pytest.raises(ValueError):
+        billing_data.aggregate(index, costs / 1e6, fixed_point=FixedPoint())
+
+
+def test_billing_data_aggregate_unordered_index_raises() -> None:
+    """"""
+
+    index = pd.DatetimeIndex([pd.Timestamp(2023, 1, 2, tz="UTC"), pd.Timestamp(2023, 1, 1, tz="UTC")])
+    with pytest.raises(ValueError):
+        BillingData(start=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC"))).aggregate(index, np.ones(2))
+
+
+def test_tariff_cost_handler_bill() -> None:
+    """"""
+
+    tz = ZoneInfo("UTC")
+    index = pd.date_range(start="2023-01-01", end="2023-03-01", freq="1D", tz=tz, inclusive="left")
+    cost_df = pd.DataFrame(
+        index=index,
+        data={"profile": 1.0, "import_cost": 2.0, "export_cost": -1.0, "total_cost": 1.0},
+    )
+
+    billed_df = TariffCostHandler(cost_df).bill(
+        BillingData(start=datetime(2023, 1, 1, tzinfo=tz), supply_charge=TariffRate("AUD", 1.0))
+    )
+
+    assert list(billed_df.import_cost) == [62.0, 56.0]
+    assert list(billed_df.export_cost) == [-31.0, -28.0]
+    assert list(billed_df.supply_cost) == [31.0, 28.0]
+    assert list(billed_df.billed_cost) == [62.0, 56.0]
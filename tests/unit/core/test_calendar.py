@@ -0,0 +1,74 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+from holidays import country_holidays
+
+from pytariff.core.calendar import CALENDARS, CalendarKey, CalendarRegistry
+from pytariff.core.day import DayType, DaysApplied
+
+
+def test_calendar_registry_shares_calendars() -> None:
+    """"""
+
+    registry = CalendarRegistry()
+    calendar = registry.get(CalendarKey(country="AU", subdiv="NSW", years=(2024, 2023)))
+
+    assert registry.get(CalendarKey(country="AU", subdiv="NSW", years=(2023, 2024, 2023))) is calendar
+    assert registry.key_of(calendar) == CalendarKey(country="AU", subdiv="NSW", years=(2023, 2024))
+    assert len(registry) == 1
+
+    expected = country_holidays("AU", subdiv="NSW", years=[2023, 2024])
+    assert dict(calendar) == dict(expected)
+    dates = registry.dates(registry.key_of(calendar))  # type: ignore
+    assert list(dates) == sorted(np.datetime64(d, "D") for d in expected)
+
+    # calendars of the registry do not expand beyond their years
+    assert date(2025, 1, 1) not in calendar
+
+
+def test_calendar_registry_custom_additions() -> None:
+    """"""
+
+    registry = CalendarRegistry()
+    custom = registry.get(CalendarKey(additions=(date(2023, 6, 5),)))
+    with_additions = registry.get(CalendarKey(country="AU", years=(2023,), additions=(date(2023, 6, 5),)))
+
+    assert list(custom) == [date(2023, 6, 5)]
+    assert custom.years == {2023}
+    assert date(2023, 6, 5) in with_additions and date(2023, 12, 25) in with_additions
+
+
+def test_calendar_registry_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Calendars saved by one registry are loaded by the next, without generating them again"""
+
+    key = CalendarKey(country="AU", subdiv="VIC", years=(2023,))
+    calendar = CalendarRegistry(tmp_path).get(key)
+    assert (tmp_path / key.filename).exists()
+
+    def _build(self: CalendarKey) -> None:
+        raise AssertionError
+
+    monkeypatch.setattr(CalendarKey, "build", _build)
+    loaded = CalendarRegistry(tmp_path).get(key)
+
+    assert loaded == calendar
+    assert dict(loaded) == dict(calendar)
+
+
+def test_days_applied_with_registered_calendar() -> None:
+    """DaysApplied which share a calendar are equal and hash equally, and hash by the key of their calendar"""
+
+    key = CalendarKey(country="AU", subdiv="NSW", years=(2023,))
+    a = DaysApplied(day_types=DayType.BUSINESS_DAYS, holidays=CALENDARS.get(key))
+    b = DaysApplied(day_types=(DayType.BUSINESS_DAYS,), holidays=CALENDARS.get(key))
+    other = DaysApplied(
+        day_types=DayType.BUSINESS_DAYS, holidays=CALENDARS.get(CalendarKey(country="AU", subdiv="WA", years=(2023,)))
+    )
+
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a != other
+    assert len({a, b, other}) == 2
+    assert date(2023, 12, 25) not in a
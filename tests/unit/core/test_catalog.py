@@ -0,0 +1,143 @@
+import json
+from datetime import date, time
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from pytariff.core.calendar import CALENDARS, CalendarKey
+from pytariff.core.catalog import compile_catalog, load_catalog, parse_catalog
+from pytariff.core.charge import DemandCharge
+from pytariff.core.day import DayType
+from pytariff.core.tariff import DemandTariff, GenericTariff, TimeOfUseTariff
+from pytariff.core.unit import DemandUnit
+
+
+def _child(start: str, end: str, rate: float, metric: str = "kWh", **days_applied: Any) -> dict[str, Any]:
+    return {
+        "start_time": start,
+        "end_time": end,
+        "tzinfo": "Australia/Sydney",
+        "days_applied": days_applied or {"day_types": "ALL_DAYS"},
+        "charge": {
+            "blocks": [{"rate": {"currency": "AUD", "value": rate}, "from_quantity": 0, "to_quantity": float("inf")}],
+            "unit": {"metric": metric, "convention": "Passive", "direction": "Import"},
+            "reset_data": {"anchor": "2023-01-01T00:00:00+11:00", "period": "1D"},
+        },
+    }
+
+
+def _tariff(key: str, tariff_type: str, *children: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "key": key,
+        "type": tariff_type,
+        "start": "2023-01-01",
+        "end": "2023-12-31",
+        "tzinfo": "Australia/Sydney",
+        "children": list(children),
+    }
+
+
+HOLIDAYS = {"country": "AU", "subdiv": "NSW", "years": [2023]}
+RECORDS = [
+    _tariff(
+        "tou",
+        "TimeOfUseTariff",
+        _child("16:00", "21:00", 0.5, day_types=["BUSINESS_DAYS"], holidays=HOLIDAYS),
+        _child("21:00", "16:00", 0.2, day_types=["BUSINESS_DAYS"], holidays=HOLIDAYS),
+    ),
+    _tariff("demand", "DemandTariff", _child("00:00", "00:00", 0.5, metric="kW")),
+    _tariff("generic", "GenericTariff", _child("00:00", "00:00", 0.2)),
+]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "\n".join(json.dumps(x) for x in RECORDS),
+        json.dumps(RECORDS).encode(),
+    ],
+)
+def test_parse_catalog(data: str | bytes) -> None:
+    """"""
+
+    catalog = parse_catalog(data)
+
+    assert list(catalog) == ["tou", "demand", "generic"]
+    assert isinstance(catalog["tou"], TimeOfUseTariff)
+    assert isinstance(catalog["demand"], DemandTariff)
+    assert type(catalog["generic"]) is GenericTariff
+
+    peak, off_peak = catalog["tou"].children
+    assert peak.start_time == time(16, tzinfo=ZoneInfo("Australia/Sydney"))
+    assert peak.days_applied.day_types == (DayType.BUSINESS_DAYS,)
+    assert date(2023, 12, 25) in peak.days_applied.holidays  # type: ignore
+
+    demand_charge = catalog["demand"].children[0].charge
+    assert isinstance(demand_charge, DemandCharge)
+    assert isinstance(demand_charge.unit, DemandUnit)
+
+
+def test_parse_catalog_shares_identical_sub_objects() -> None:
+    """"""
+
+    catalog = parse_catalog("\n".join(json.dumps(x) for x in RECORDS))
+    peak, off_peak = catalog["tou"].children
+    demand, generic = catalog["demand"].children[0], catalog["generic"].children[0]
+
+    assert peak.days_applied is off_peak.days_applied
+    assert peak.charge.unit is off_peak.charge.unit
+    assert peak.charge.reset_data is demand.charge.reset_data
+    assert demand.charge.blocks[0].rate is peak.charge.blocks[0].rate
+    assert generic.charge.blocks[0].rate is off_peak.charge.blocks[0].rate
+
+    # units are shared only between charges of the same unit type
+    assert demand.charge.unit is not generic.charge.unit
+
+
+def test_parse_catalog_custom_holidays() -> None:
+    """"""
+
+    record = _tariff(
+        "custom",
+        "GenericTariff",
+        _child("00:00", "00:00", 0.2, day_types=["HOLIDAYS"], holidays={"dates": ["2023-06-01"]}),
+    )
+    tariff = parse_catalog(json.dumps(record))["custom"]
+    assert list(tariff.children[0].days_applied.holidays) == [date(2023, 6, 1)]  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        [RECORDS[1], RECORDS[1]],
+        [{k: v for k, v in RECORDS[1].items() if k != "key"}],
+    ],
+)
+def test_parse_catalog_invalid_keys_raise(records: list[dict[str, Any]]) -> None:
+    """"""
+
+    with pytest.raises(ValueError):
+        parse_catalog(json.dumps(records))
+
+
+def test_load_and_compile_catalog(tmp_path: Path) -> None:
+    """"""
+
+    (tmp_path / "catalog.ndjson").write_text("\n".join(json.dumps(x) for x in RECORDS))
+    catalog = load_catalog(tmp_path / "catalog.ndjson")
+    plans = compile_catalog(catalog)
+
+    assert list(plans) == list(catalog)
+    assert all(plans[key] is catalog[key].compile() for key in catalog)
+
+
+def test_parse_catalog_shares_registered_calendars() -> None:
+    """Calendars over fixed years are shared between catalogs, through the calendar registry"""
+
+    first, second = parse_catalog(json.dumps(RECORDS)), parse_catalog(json.dumps(RECORDS))
+
+    holidays = first["tou"].children[0].days_applied.holidays
+    assert holidays is second["tou"].children[1].days_applied.holidays
+    assert CALENDARS.key_of(holidays) == CalendarKey(country="AU", subdiv="NSW", years=(2023,))  # type: ignore
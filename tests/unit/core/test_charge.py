@@ -4,12 +4,18 @@ from pydantic import ValidationError
 import pytest
 
 from pytariff.core.block import ConsumptionBlock, DemandBlock, TariffBlock
-from pytariff.core.charge import ConsumptionCharge, ExportConsumptionCharge, ImportConsumptionCharge, TariffCharge
+from pytariff.core.charge import (
+    ConsumptionCharge,
+    DemandCharge,
+    ExportConsumptionCharge,
+    ImportConsumptionCharge,
+    TariffCharge,
+)
 from pytariff.core.typing import Consumption, Demand
 from pytariff.core.unit import SignConvention, TradeDirection
-from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.reset import Ratchet, ResetData, ResetPeriod, ResetScope
 from pytariff.core.rate import TariffRate
-from pytariff.core.unit import ConsumptionUnit, DemandUnit, TariffUnit
+from pytariff.core.unit import ConsumptionUnit, DemandUnit, TariffUnit, UsageChargeMethod
 
 
 def test_tariff_charge_valid_construction():
@@ -30,6 +36,53 @@ def test_tariff_charge_valid_construction():
     ),
 
 
+@pytest.mark.parametrize(
+    "bounds, raises",
+    [
+        (((0, 10), (10, 20), (20, float("inf"))), False),
+        (((20, float("inf")), (0, 10), (10, 20)), False),  # unordered
+        (((0, 10), (20, 30)), False),  # gap
+        (((0, 10), (5, 20)), True),
+        (((20, 30), (0, 100)), True),  # one block contains another
+        (((0, 100), (10, 20), (30, 40)), True),  # overlap with a block other than the previous
+        (((0, 10), (0, 10)), True),
+    ],
+)
+def test_tariff_charge_block_overlap(bounds: tuple[tuple[float, float], ...], raises: bool) -> None:
+    """The sorted check agrees with the pairwise intersection of blocks"""
+
+    blocks = tuple(TariffBlock(rate=None, from_quantity=lo, to_quantity=hi) for lo, hi in bounds)
+    assert any(bool(x & y) for i, x in enumerate(blocks) for j, y in enumerate(blocks) if i != j) == raises
+
+    def _charge() -> TariffCharge:
+        return TariffCharge(
+            blocks=blocks,
+            unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive),
+            reset_data=None,
+        )
+
+    if raises:
+        with pytest.raises(ValueError):
+            _charge()
+    else:
+        assert [x.from_quantity for x in _charge().blocks] == sorted(x.from_quantity for x in blocks)
+
+
+def test_tariff_charge_many_blocks() -> None:
+    """"""
+
+    blocks = tuple(
+        TariffBlock(rate=TariffRate(currency="AUD", value=i), from_quantity=i, to_quantity=i + 1)
+        for i in reversed(range(1000))
+    )
+    charge = TariffCharge(
+        blocks=blocks,
+        unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive),
+        reset_data=None,
+    )
+    assert [x.from_quantity for x in charge.blocks] == list(range(1000))
+
+
 @pytest.mark.parametrize(
     "blocks_tuple, unit, reset_data, raises",
     [
@@ -569,3 +622,91 @@ def test_tariff_charge_hash(charge_a: TariffCharge, charge_b: TariffCharge, is_e
         assert hash(charge_a) == hash(charge_b)
     else:
         assert hash(charge_a) != hash(charge_b)
+
+
+def test_demand_charge_reset_scope() -> None:
+    """Demand is aggregated over every row of each reset period by default, and over the rows at which its charge
+    applies where ResetScope.ACTIVE_ROWS is chosen"""
+
+    blocks = (DemandBlock(from_quantity=0, to_quantity=float("inf"), rate=TariffRate(currency="AUD", value=1)),)
+    unit = DemandUnit(metric=Demand.kW, direction=TradeDirection.Import, convention=SignConvention.Passive)
+    reset_data = ResetData(anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")), period=ResetPeriod.FIRST_OF_MONTH)
+
+    demand_charge = DemandCharge(blocks=blocks, unit=unit, reset_data=reset_data)
+    assert demand_charge.reset_scope == ResetScope.ALL_ROWS
+    assert demand_charge != DemandCharge(
+        blocks=blocks, unit=unit, reset_data=reset_data, reset_scope=ResetScope.ACTIVE_ROWS
+    )
+
+
+@pytest.mark.parametrize("top_n, raises", [(None, True), (0, True), (1, False), (4, False)])
+def test_tariff_charge_top_n_mean_requires_top_n(top_n: int | None, raises: bool) -> None:
+    """"""
+
+    def _charge() -> TariffCharge:
+        return TariffCharge(
+            blocks=(TariffBlock(from_quantity=0, to_quantity=float("inf"), rate=TariffRate(currency="AUD", value=1)),),
+            unit=TariffUnit(metric=Demand.kW, direction=TradeDirection.Import, convention=SignConvention.Passive),
+            reset_data=None,
+            method=UsageChargeMethod.top_n_mean,
+            top_n=top_n,
+        )
+
+    if raises:
+        with pytest.raises(ValidationError):
+            _charge()
+    else:
+        assert _charge().top_n == top_n
+
+
+@pytest.mark.parametrize(
+    "method, raises",
+    [(UsageChargeMethod.max, False), (UsageChargeMethod.mean, False), (UsageChargeMethod.cumsum, True)],
+)
+def test_tariff_charge_ratchet_requires_period_method(method: UsageChargeMethod, raises: bool) -> None:
+    """"""
+
+    def _charge() -> TariffCharge:
+        return TariffCharge(
+            blocks=(TariffBlock(from_quantity=0, to_quantity=float("inf"), rate=TariffRate(currency="AUD", value=1)),),
+            unit=TariffUnit(metric=Demand.kW, direction=TradeDirection.Import, convention=SignConvention.Passive),
+            reset_data=ResetData(
+                anchor=datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC")),
+                period=ResetPeriod.FIRST_OF_MONTH,
+                ratchet=Ratchet(percentage=80.0),
+            ),
+            method=method,
+        )
+
+    if raises:
+        with pytest.raises(ValidationError):
+            _charge()
+    else:
+        assert _charge().reset_data.ratchet == Ratchet(percentage=80.0, periods=11)
+
+
+@pytest.mark.parametrize(
+    "coincident_peaks, raises",
+    [
+        ((), True),
+        ((datetime(2023, 1, 1, 17),), True),  # naive
+        ((datetime(2023, 1, 1, 17, tzinfo=ZoneInfo("UTC")),), False),
+    ],
+)
+def test_tariff_charge_coincident_peak_requires_peaks(coincident_peaks: tuple[datetime, ...], raises: bool) -> None:
+    """"""
+
+    def _charge() -> TariffCharge:
+        return TariffCharge(
+            blocks=(TariffBlock(from_quantity=0, to_quantity=float("inf"), rate=TariffRate(currency="AUD", value=1)),),
+            unit=TariffUnit(metric=Demand.kW, direction=TradeDirection.Import, convention=SignConvention.Passive),
+            reset_data=None,
+            method=UsageChargeMethod.coincident_peak,
+            coincident_peaks=coincident_peaks,
+        )
+
+    if raises:
+        with pytest.raises(ValidationError):
+            _charge()
+    else:
+        assert _charge().coincident_peaks == coincident_peaks
@@ -1,9 +1,19 @@
-from datetime import date, datetime
+from datetime import date, datetime, time
 from typing import Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
 import pytest
 
 from holidays import HolidayBase, country_holidays
-from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied, intersection_mask
+from pytariff.core.interval import TariffInterval
+from pytariff.core.rate import TariffRate
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection
 
 
 @pytest.mark.parametrize(
@@ -324,3 +334,137 @@ def test_days_applied_intersection(
     """"""
 
     assert (candidate_other & days_applied_instance).day_types_equal(expected_intersection)
+
+
+@pytest.mark.parametrize("day_type_a", list(DayType))
+@pytest.mark.parametrize("day_type_b", list(DayType))
+def test_day_type_intersection_mask(day_type_a: DayType, day_type_b: DayType) -> None:
+    """The bitmask intersection agrees with DayType.__and__"""
+
+    expected = day_type_a.bit if day_type_a & day_type_b else 0
+    assert intersection_mask(day_type_a.bit, day_type_b.bit) == expected
+
+
+def _weekday_name_membership(other: date, days_applied: DaysApplied) -> bool:
+    """Membership as determined from the name of the weekday of other"""
+
+    day_types = days_applied.day_types if isinstance(days_applied.day_types, tuple) else (days_applied.day_types,)
+    day_type = DayType[other.strftime("%A").upper()]
+    return (
+        DayType.ALL_DAYS in day_types
+        or day_type in day_types
+        or (DayType.WEEKDAYS in day_types and day_type not in (DayType.SATURDAY, DayType.SUNDAY))
+        or (DayType.WEEKENDS in day_types and day_type in (DayType.SATURDAY, DayType.SUNDAY))
+        or (DayType.BUSINESS_DAYS in day_types and other not in days_applied.holidays)  # type: ignore
+        or (DayType.HOLIDAYS in day_types and other in days_applied.holidays)  # type: ignore
+    )
+
+
+@pytest.mark.parametrize(
+    "day_types",
+    [
+        DayType.MONDAY,
+        (DayType.SATURDAY, DayType.TUESDAY),
+        (DayType.WEEKDAYS,),
+        (DayType.WEEKENDS, DayType.HOLIDAYS),
+        (DayType.BUSINESS_DAYS,),
+        (DayType.SUNDAY, DayType.BUSINESS_DAYS),
+        (DayType.HOLIDAYS,),
+    ],
+)
+def test_days_applied_membership_by_bitmask(day_types: tuple[DayType, ...] | DayType) -> None:
+    """"""
+
+    days_applied = DaysApplied(day_types=day_types, holidays=country_holidays("AUS", years=2020))
+    for other in (date.fromordinal(date(2020, 1, 1).toordinal() + i) for i in range(366)):
+        assert (other in days_applied) is _weekday_name_membership(other, days_applied)
+
+
+def test_days_applied_equality_ignores_order_of_day_types() -> None:
+    """"""
+
+    a = DaysApplied(day_types=(DayType.MONDAY, DayType.TUESDAY))
+    b = DaysApplied(day_types=(DayType.TUESDAY, DayType.MONDAY))
+
+    assert a == b
+    assert hash(a) == hash(b)
+    assert DaysApplied(day_types=DayType.MONDAY) == DaysApplied(day_types=(DayType.MONDAY,))
+    assert DaysApplied(day_types=(DayType.WEEKDAYS,)) != DaysApplied(
+        day_types=(DayType.MONDAY, DayType.TUESDAY, DayType.WEDNESDAY, DayType.THURSDAY, DayType.FRIDAY)
+    )
+    assert DaysApplied() == DaysApplied()
+    assert DaysApplied() != DaysApplied(day_types=(DayType.ALL_DAYS,))
+
+
+def test_days_applied_bitmask_follows_day_types() -> None:
+    """The cached bitmask is recomputed if day_types is reassigned"""
+
+    days_applied = DaysApplied(day_types=(DayType.MONDAY,))
+    assert days_applied.bitmask == DayType.MONDAY.bit
+    assert date(2020, 1, 7) not in days_applied
+
+    days_applied.day_types = (DayType.TUESDAY,)
+    assert days_applied.bitmask == DayType.TUESDAY.bit
+    assert date(2020, 1, 7) in days_applied
+
+
+def test_days_applied_intersection_of_weekdays_and_business_days() -> None:
+    """Neither WEEKDAYS nor BUSINESS_DAYS contains the other, whether or not both have holidays"""
+
+    holidays = country_holidays("AUS", years=2020)
+    intersection = DaysApplied(day_types=(DayType.WEEKDAYS,), holidays=holidays) & DaysApplied(
+        day_types=(DayType.BUSINESS_DAYS,), holidays=holidays
+    )
+
+    assert intersection.day_types is None
+    assert date(2020, 12, 25) in intersection.holidays  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "day_types",
+    [
+        None,
+        (DayType.WEEKENDS,),
+        (DayType.WEDNESDAY, DayType.HOLIDAYS),
+        (DayType.BUSINESS_DAYS,),
+        (DayType.ALL_DAYS,),
+    ],
+)
+@pytest.mark.parametrize("tz", [None, "UTC", "Australia/Sydney"])
+def test_days_applied_contains_index(day_types: Optional[tuple[DayType, ...]], tz: Optional[str]) -> None:
+    """Membership of a whole index agrees with the membership of each of its elements"""
+
+    days_applied = DaysApplied(day_types=day_types, holidays=country_holidays("AUS", years=2023))
+    index = pd.date_range(start="2023-12-20", end="2024-01-10", freq="7h", tz=tz)
+
+    assert list(days_applied.contains_index(index)) == [x in days_applied for x in index]
+
+
+def test_days_applied_hash_is_stable_as_holidays_expand() -> None:
+    """The hash of a DaysApplied (and of its interval) is unchanged as its holidays expand, e.g. on compile()"""
+
+    utc = ZoneInfo("UTC")
+    days_applied = DaysApplied(day_types=DayType.BUSINESS_DAYS, holidays=country_holidays("AUS", years=2023))
+    child = TariffInterval(
+        start_time=time(0),
+        end_time=time(0),
+        days_applied=days_applied,
+        tzinfo=utc,
+        charge=TariffCharge(
+            blocks=(
+                TariffBlock(rate=TariffRate(currency="AUD", value=1.0), from_quantity=0, to_quantity=float("inf")),
+            ),
+            unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive),
+            reset_data=None,
+        ),
+    )
+    children, expected = {child}, hash(days_applied)
+
+    GenericTariff(
+        start=datetime(2023, 1, 1, tzinfo=utc), end=datetime(2024, 12, 31, tzinfo=utc), children=(child,)
+    ).compile()
+    assert hash(days_applied) == expected and child in children
+
+    date(2025, 1, 1) in days_applied
+    assert hash(days_applied) == expected and child in children
+    assert 2025 in days_applied.holidays.years  # the holidays did expand
@@ -0,0 +1,77 @@
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from pytariff.core.fixed_point import FixedPoint, Rounding, round_divide, round_float
+from pytariff.core.tariff import GenericTariff
+
+UTC = ZoneInfo("UTC")
+
+
+@pytest.mark.parametrize(
+    "rounding, expected",
+    [
+        (Rounding.HALF_EVEN, [-2, -2, -1, 0, 0, 1, 2, 2]),
+        (Rounding.HALF_UP, [-3, -2, -1, -1, 1, 1, 2, 3]),
+        (Rounding.DOWN, [-2, -1, -1, 0, 0, 1, 1, 2]),
+    ],
+)
+def test_fixed_point_rounding(rounding: Rounding, expected: list[int]) -> None:
+    """Floats and integer quotients round alike"""
+
+    halves = np.array([-2.5, -1.5, -1.2, -0.5, 0.5, 1.2, 1.5, 2.5])
+    np.testing.assert_array_equal(round_float(halves, rounding), expected)
+    np.testing.assert_array_equal(round_divide((halves * 10).astype(np.int64), 10, rounding), expected)
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"quantity_scale": 0}, {"rate_scale": -1}, {"cost_scale": 7}, {"cost_scale": 10_000_000_000}]
+)
+def test_fixed_point_invalid_scales(kwargs: dict) -> None:
+    """"""
+
+    with pytest.raises(ValidationError):
+        FixedPoint(**kwargs)
+
+
+def test_fixed_point_costs() -> None:
+    """"""
+
+    fixed_point = FixedPoint(cost_scale=100)
+    quantities = fixed_point.quantities(np.array([1.0005, 0.0015, 2.0]))
+    rates = fixed_point.rates(np.array([0.1234565, 0.5, 0.25]))
+
+    np.testing.assert_array_equal(quantities, [1000, 2, 2000])
+    np.testing.assert_array_equal(rates, [123456, 500000, 250000])
+    np.testing.assert_array_equal(fixed_point.costs(quantities, rates), [12, 0, 50])
+    np.testing.assert_array_equal(fixed_point.to_currency([12, 0, 50]), [0.12, 0.0, 0.5])
+
+
+@pytest.mark.parametrize("shape", [(288,), (288, 3)])
+def test_tariff_plan_evaluate_fixed_point(
+    DEFAULT_GENERIC_TARIFF: Callable[..., GenericTariff], shape: tuple[int, ...]
+) -> None:
+    """Fixed-point costs are int64, within rounding of the float costs, and totalled exactly"""
+
+    tariff = DEFAULT_GENERIC_TARIFF((0.1234567, 0, 1), (0.3, 1, float("inf")))
+    index = pd.date_range(start="2023-03-01", end="2023-03-02", freq="5min", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(0, 2, shape)
+    plan = tariff.compile()
+    fixed_point = FixedPoint()
+
+    float_cost, _ = plan.evaluate(index, -usage)
+    import_cost, export_cost = plan.evaluate(index, -usage, fixed_point=fixed_point)
+
+    assert import_cost.dtype == export_cost.dtype == np.int64 and import_cost.shape == float_cost.shape
+    assert not export_cost.any()
+    # each row is within half a Wh at the rate, plus half a unit of rate and of cost
+    np.testing.assert_allclose(fixed_point.to_currency(import_cost), float_cost, atol=2e-4)
+
+    quantities = np.rint(usage * 1000).astype(np.int64)
+    rates = np.where(usage < 1, 123457, 300000)
+    np.testing.assert_array_equal(import_cost[0], np.rint(quantities * rates / 1000).astype(np.int64))
+    assert import_cost.sum() == int(import_cost[0].astype(object).sum())
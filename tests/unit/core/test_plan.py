@@ -0,0 +1,485 @@
+import pickle
+from dataclasses import fields, replace
+from datetime import datetime, time
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from holidays import country_holidays
+
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
+from pytariff.core.plan import (
+    EXPORT,
+    IMPORT,
+    METHODS,
+    NO_MARKET,
+    NO_RESET,
+    RESET_PERIODS,
+    RESET_SCOPES,
+    PlanCatalog,
+    TariffPlan,
+    save_plans,
+)
+from pytariff.core.rate import AsOf, MarketRate, TariffRate
+from pytariff.core.reset import Ratchet, ResetData, ResetPeriod, ResetScope
+from pytariff.core.tariff import GenericTariff, TimeOfUseTariff
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection, UsageChargeMethod
+
+UTC = ZoneInfo("UTC")
+
+
+def _charge(
+    direction: TradeDirection, rate: float, method: UsageChargeMethod = UsageChargeMethod.identity
+) -> TariffCharge:
+    return TariffCharge(
+        blocks=(
+            TariffBlock(rate=TariffRate(currency="AUD", value=rate), from_quantity=0, to_quantity=10),
+            TariffBlock(rate=TariffRate(currency="AUD", value=rate / 2), from_quantity=10, to_quantity=float("inf")),
+        ),
+        unit=TariffUnit(metric=Consumption.kWh, direction=direction, convention=SignConvention.Passive),
+        reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.DAILY),
+        method=method,
+    )
+
+
+@pytest.fixture
+def TOU_TARIFF() -> TimeOfUseTariff:
+    holidays = country_holidays("AUS", years=2023)
+    return TimeOfUseTariff(
+        start=datetime(2023, 1, 1),
+        end=datetime(2023, 12, 31),
+        tzinfo=UTC,
+        children=(
+            TariffInterval(
+                start_time=time(16),
+                end_time=time(21),
+                days_applied=DaysApplied(day_types=(DayType.BUSINESS_DAYS,), holidays=holidays),
+                tzinfo=UTC,
+                charge=_charge(TradeDirection.Import, 2.0, UsageChargeMethod.cumsum),
+            ),
+            TariffInterval(
+                start_time=time(21),
+                end_time=time(16),
+                days_applied=DaysApplied(day_types=(DayType.BUSINESS_DAYS,), holidays=holidays),
+                tzinfo=UTC,
+                charge=_charge(TradeDirection.Import, 1.0),
+            ),
+        ),
+    )
+
+
+def test_compile_tariff_plan(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """"""
+
+    plan = TOU_TARIFF.compile()
+
+    assert plan.child_ids == tuple(str(x.uuid) for x in TOU_TARIFF.children)
+    assert list(plan.child_window_start) == [16 * 60, 21 * 60]
+    assert list(plan.child_window_end) == [21 * 60, 16 * 60]
+    assert [METHODS[x] for x in plan.child_method] == [UsageChargeMethod.cumsum, UsageChargeMethod.identity]
+    assert list(plan.child_direction) == [IMPORT, IMPORT]
+    assert [RESET_PERIODS[x] for x in plan.child_reset_period] == [ResetPeriod.DAILY, ResetPeriod.DAILY]
+    assert [RESET_SCOPES[x] for x in plan.child_reset_scope] == [ResetScope.ALL_ROWS, ResetScope.ALL_ROWS]
+    assert list(plan.block_offsets) == [0, 2, 4]
+    assert list(plan.block_rate) == [2.0, 1.0, 1.0, 0.5]
+
+    # holidays are expanded over the years in which the tariff is defined
+    holidays = plan.holiday_dates[slice(*plan.holiday_offsets[:2])]
+    assert np.datetime64("2023-12-25") in holidays
+    assert all(x.astype(object).year == 2023 for x in holidays)
+
+
+def test_compile_tariff_plan_is_immutable_and_cached(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """"""
+
+    plan = TOU_TARIFF.compile()
+    assert TOU_TARIFF.compile() is plan
+
+    with pytest.raises(ValueError):
+        plan.block_rate[0] = 0.0
+
+    with pytest.raises(AttributeError):
+        plan.resolution = "1h"  # type: ignore
+
+
+def test_compile_tariff_plan_without_reset_or_direction() -> None:
+    """"""
+
+    charge = _charge(TradeDirection.Export, 1.0)
+    charge.reset_data = None
+    tariff = GenericTariff(
+        start=datetime(2023, 1, 1),
+        end=datetime(2023, 12, 31),
+        tzinfo=UTC,
+        children=(
+            TariffInterval(
+                start_time=time(0),
+                end_time=time(0),
+                days_applied=DaysApplied(day_types=DayType.ALL_DAYS),
+                tzinfo=UTC,
+                charge=charge,
+            ),
+        ),
+    )
+    plan = tariff.compile()
+
+    assert list(plan.child_reset_period) == [NO_RESET]
+    assert list(plan.child_direction) == [EXPORT]
+    assert (plan.child_window_start[0], plan.child_window_end[0]) == (0, 24 * 60)
+
+
+def test_tariff_plan_evaluate_applies_each_child_in_its_own_window(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """Each child is only charged within its own time window and days applied"""
+
+    index = pd.date_range(start="2023-12-24", end="2023-12-28", freq="1h", tz=UTC, inclusive="left")
+    plan = TOU_TARIFF.compile()
+    import_cost, export_cost = plan.evaluate(index, -np.ones(len(index)))
+
+    assert import_cost.shape == export_cost.shape == (2, len(index))
+    assert not export_cost.any()
+
+    peak, off_peak = import_cost
+    hour, weekday = index.hour.to_numpy(), index.weekday.to_numpy()
+    is_holiday = index.normalize().isin([pd.Timestamp("2023-12-25", tz=UTC), pd.Timestamp("2023-12-26", tz=UTC)])
+    is_business_day = ~is_holiday
+
+    assert not (peak.astype(bool) & off_peak.astype(bool)).any()
+    assert list(peak.astype(bool)) == list(is_business_day & (hour >= 16) & (hour < 21))
+    assert list(off_peak.astype(bool)) == list(is_business_day & ((hour >= 21) | (hour < 16)))
+
+    # the peak charge is levied on the (daily) cumulative usage, which is past the first block by 1600
+    assert list(peak[peak > 0][:5]) == [17.0, 18.0, 19.0, 20.0, 21.0]
+    assert weekday[0] == 6  # 24/12/2023 is a Sunday, and a business day
+
+
+@pytest.mark.parametrize("method", [UsageChargeMethod.cumsum, UsageChargeMethod.mean, UsageChargeMethod.max])
+def test_tariff_plan_evaluate_reset_scope(TOU_TARIFF: TimeOfUseTariff, method: UsageChargeMethod) -> None:
+    """Charges aggregate usage over every row of each reset period, or over the rows at which they apply alone"""
+
+    index = pd.date_range(start="2023-12-27", end="2023-12-28", freq="1h", tz=UTC, inclusive="left")
+    usage = -np.arange(1.0, len(index) + 1)
+    TOU_TARIFF.children[0].charge.method = method
+    all_rows = TOU_TARIFF.compile()
+    active_rows = replace(all_rows, child_reset_scope=np.array([RESET_SCOPES.index(ResetScope.ACTIVE_ROWS)] * 2))
+
+    peak = slice(16, 21)
+    expected = {
+        # each aggregate is past the first block, so is charged at a rate of 1.0
+        UsageChargeMethod.cumsum: (np.cumsum(np.arange(1.0, 25))[peak], np.cumsum(np.arange(17.0, 22))),
+        UsageChargeMethod.mean: ([12.5] * 5, [19.0] * 5),
+        UsageChargeMethod.max: ([24.0] * 5, [21.0] * 5),
+    }[method]
+
+    all_rows_cost, _ = all_rows.evaluate(index, usage)
+    active_rows_cost, _ = active_rows.evaluate(index, usage)
+    np.testing.assert_allclose(all_rows_cost[0, peak], expected[0])
+    np.testing.assert_allclose(active_rows_cost[0, peak], expected[1])
+    assert not all_rows_cost[0, ~np.isin(np.arange(24), np.arange(16, 21))].any()
+    np.testing.assert_array_equal(all_rows_cost[1], active_rows_cost[1])  # the identity charge has nothing to reset
+
+
+def test_tariff_plan_evaluate_unordered_index_raises(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """Reset periods cannot be segmented over an unordered index"""
+
+    index = pd.date_range(start="2023-12-24", end="2023-12-28", freq="1h", tz=UTC, inclusive="left")
+    with pytest.raises(ValueError):
+        TOU_TARIFF.compile().evaluate(index[::-1], -np.ones(len(index)))
+
+
+@pytest.mark.parametrize(
+    "reset_scope, expected",
+    [(ResetScope.ALL_ROWS, [16.0, 17.0, 18.0, 19.0, 20.0]), (ResetScope.ACTIVE_ROWS, [17.0, 17.5, 18.0, 19.0, 20.0])],
+)
+def test_tariff_plan_evaluate_rolling_mean(
+    TOU_TARIFF: TimeOfUseTariff, reset_scope: ResetScope, expected: list[float]
+) -> None:
+    """The rolling mean is taken over the trailing window of each row, of every row or of the active rows alone"""
+
+    index = pd.date_range(start="2023-12-27", end="2023-12-28", freq="1h", tz=UTC, inclusive="left")
+    TOU_TARIFF.children[0].charge.method = UsageChargeMethod.rolling_mean
+    TOU_TARIFF.children[0].charge.window = "3h"
+    plan = replace(TOU_TARIFF.compile(), child_reset_scope=np.array([RESET_SCOPES.index(reset_scope)] * 2))
+
+    import_cost, _ = plan.evaluate(index, -np.arange(1.0, len(index) + 1))
+    np.testing.assert_allclose(import_cost[0, 16:21], expected)  # each mean is past the first block, at a rate of 1.0
+
+
+@pytest.mark.parametrize("per_day", [False, True])
+@pytest.mark.parametrize("reset_scope", [ResetScope.ALL_ROWS, ResetScope.ACTIVE_ROWS])
+def test_tariff_plan_evaluate_top_n_mean(TOU_TARIFF: TimeOfUseTariff, per_day: bool, reset_scope: ResetScope) -> None:
+    """The top-n mean of each month is that of its n greatest values, or of the maxima of its n greatest days"""
+
+    index = pd.date_range(start="2023-10-15", end="2023-12-15", freq="1h", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(0, 5, (len(index), 3))
+    charge = TOU_TARIFF.children[0].charge
+    charge.method, charge.top_n, charge.top_n_per_day = UsageChargeMethod.top_n_mean, 4, per_day
+    charge.reset_data = ResetData(anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.FIRST_OF_MONTH)
+    plan = replace(TOU_TARIFF.compile(), child_reset_scope=np.array([RESET_SCOPES.index(reset_scope)] * 2))
+
+    import_cost, _ = plan.evaluate(index, -usage)
+    applies = plan.applies(index)[0]
+    for n in range(usage.shape[1]):
+        frame = pd.DataFrame({"usage": usage[:, n], "month": index.month, "day": index.date}, index=index)
+        if reset_scope == ResetScope.ACTIVE_ROWS:
+            frame = frame[applies]
+        if per_day:
+            frame = frame.groupby(["month", "day"]).max()
+        expected = frame.groupby("month")["usage"].apply(lambda x: x.nlargest(4).mean())
+
+        # every mean is within the first block, at a rate of 2.0
+        np.testing.assert_allclose(import_cost[0, applies, n], 2.0 * expected[index.month[applies]].to_numpy())
+        assert not import_cost[0, ~applies, n].any()
+
+
+def test_tariff_plan_evaluate_top_n_mean_per_day_of_tariff() -> None:
+    """The days of a top-n mean are those of the tariff's timezone, not that of the index"""
+
+    sydney = ZoneInfo("Australia/Sydney")
+    charge = TariffCharge(
+        blocks=(TariffBlock(rate=TariffRate(currency="AUD", value=1.0), from_quantity=0, to_quantity=float("inf")),),
+        unit=TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive),
+        reset_data=ResetData(anchor=datetime(2023, 1, 1, tzinfo=sydney), period=ResetPeriod.FIRST_OF_MONTH),
+        method=UsageChargeMethod.top_n_mean,
+        top_n=2,
+        top_n_per_day=True,
+    )
+    interval = TariffInterval(
+        start_time=time(0),
+        end_time=time(0),
+        days_applied=DaysApplied(day_types=DayType.ALL_DAYS),
+        tzinfo=sydney,
+        charge=charge,
+    )
+    plan = GenericTariff(
+        start=datetime(2023, 1, 1, tzinfo=sydney), end=datetime(2023, 12, 31, tzinfo=sydney), children=(interval,)
+    ).compile()
+    index = pd.date_range(start="2023-06-01", end="2023-06-04", freq="1h", tz=UTC, inclusive="left")
+    usage = np.ones(len(index))
+    usage[[13, 15]] = 5.0  # on one day in UTC, but at 11pm on the 1st and 1am on the 2nd in Sydney
+
+    import_cost, _ = plan.evaluate(index, -usage)
+    local_cost, _ = plan.evaluate(index.tz_convert(sydney), -usage)
+
+    np.testing.assert_allclose(import_cost, local_cost)
+    np.testing.assert_allclose(import_cost[0], 5.0)  # the mean of two days' maxima of 5.0, at a rate of 1.0
+
+
+@pytest.mark.parametrize("periods", [1, 3, 11])
+def test_tariff_plan_evaluate_ratchet(TOU_TARIFF: TimeOfUseTariff, periods: int) -> None:
+    """Each month is charged on the greater of its peak and 80% of the greatest peak of the previous months"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-12-31", freq="1h", tz=UTC, inclusive="left")
+    peaks = np.array([6.0, 1.0, 2.0, 8.0, 1.0, 1.0, 7.0, 1.0, 1.0, 1.0, 1.0, 9.0])
+    usage = np.random.default_rng(0).uniform(0.5, 1.0, (len(index), 2)) * peaks[index.month - 1, np.newaxis]
+    charge = TOU_TARIFF.children[0].charge
+    charge.method = UsageChargeMethod.max
+    charge.reset_data = ResetData(
+        anchor=datetime(2023, 1, 1, tzinfo=UTC),
+        period=ResetPeriod.FIRST_OF_MONTH,
+        ratchet=Ratchet(percentage=80.0, periods=periods),
+    )
+
+    import_cost, _ = TOU_TARIFF.compile().evaluate(index, -usage)
+    applies = TOU_TARIFF.compile().applies(index)[0]
+    for n in range(usage.shape[1]):
+        monthly_max = pd.Series(usage[:, n]).groupby(index.month).max().to_numpy()
+        expected = [
+            max([x] + [0.8 * y for y in monthly_max[slice(max(k - periods, 0), k)]]) for k, x in enumerate(monthly_max)
+        ]
+
+        # every charge is within the first block, at a rate of 2.0
+        np.testing.assert_allclose(import_cost[0, applies, n], 2.0 * np.array(expected)[index.month[applies] - 1])
+
+
+def test_tariff_plan_evaluate_coincident_peak(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """Each month is charged on the mean usage of each meter at the coincident peaks within it"""
+
+    index = pd.date_range(start="2023-03-01", end="2023-05-01", freq="5min", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(0, 5, (len(index), 3))
+    peaks = [datetime(2023, 3, 6, 17, tzinfo=UTC), datetime(2023, 3, 9, 18, 32, tzinfo=UTC)]
+    peaks += [datetime(2023, 4, 12, 16, 5, tzinfo=UTC), datetime(2023, 6, 1, 17, tzinfo=UTC)]  # the last is unmetered
+    charge = TOU_TARIFF.children[0].charge
+    charge.method, charge.coincident_peaks = UsageChargeMethod.coincident_peak, tuple(peaks)
+    charge.reset_data = ResetData(anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.FIRST_OF_MONTH)
+    plan = TOU_TARIFF.compile()
+
+    import_cost, _ = plan.evaluate(index, -usage)
+    applies = plan.applies(index)[0]
+    rows = index.get_indexer(pd.DatetimeIndex(peaks[:3]).floor("5min"))
+    expected = {3: usage[rows[:2]].mean(axis=0), 4: usage[rows[2]]}
+
+    # every mean is within the first block, at a rate of 2.0
+    for month, mean in expected.items():
+        in_month = applies & (index.month == month)
+        np.testing.assert_allclose(import_cost[0, in_month], np.broadcast_to(2.0 * mean, (in_month.sum(), 3)))
+    assert len(plan.peak_times) == 4
+
+
+def test_tariff_plan_evaluate_fleet_matches_apply_to(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """Evaluating a fleet of meters at once is equivalent to applying the tariff to each meter"""
+
+    index = pd.date_range(start="2023-03-01", end="2023-03-08", freq="5min", tz=UTC, inclusive="left")
+    handlers = [
+        MeterProfileHandler(
+            pd.DataFrame(index=index, data={"profile": np.random.default_rng(n).normal(0, 1, len(index))})
+        )
+        for n in range(3)
+    ]
+    usage = np.stack([x._pytariff_resample(x.profile, "5T").profile.to_numpy() for x in handlers], axis=1)
+    import_cost, export_cost = TOU_TARIFF.compile().evaluate(index, usage)
+
+    for n, handler in enumerate(handlers):
+        cost_df = TOU_TARIFF.apply_to(
+            handler, tariff_unit=TariffUnit(metric=Consumption.kWh, convention=SignConvention.Passive)
+        )
+        np.testing.assert_allclose(cost_df.import_cost, import_cost[:, :, n].sum(axis=0))
+        np.testing.assert_allclose(cost_df.export_cost, export_cost[:, :, n].sum(axis=0))
+
+
+def test_tariff_plan_evaluate_outside_tariff_is_zero(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """"""
+
+    index = pd.date_range(start="2022-12-30", end="2023-01-05", freq="1h", tz=UTC, inclusive="left")
+    import_cost, _ = TOU_TARIFF.compile().evaluate(index, -np.ones(len(index)))
+
+    assert not import_cost[:, index < pd.Timestamp(2023, 1, 1, tz=UTC)].any()
+    assert import_cost[:, index >= pd.Timestamp(2023, 1, 1, tz=UTC)].any()
+
+
+def _assert_plans_equal(plan: TariffPlan, other: TariffPlan) -> None:
+    for f in fields(TariffPlan):
+        value, other_value = getattr(plan, f.name), getattr(other, f.name)
+        if isinstance(value, np.ndarray):
+            assert value.dtype == other_value.dtype
+            np.testing.assert_array_equal(value, other_value)
+        else:
+            assert value == other_value
+
+
+def test_plan_catalog_round_trip(TOU_TARIFF: TimeOfUseTariff, tmp_path: Path) -> None:
+    """Plans saved to file are loaded lazily, as read-only views over the memory-mapped file"""
+
+    plan = TOU_TARIFF.compile()
+    plans = {"tou": plan, "other": replace(plan, tz="fixed:36000", block_rate=np.zeros(4))}
+    save_plans(tmp_path / "plans.arrow", plans)
+    catalog = PlanCatalog(tmp_path / "plans.arrow")
+
+    assert list(catalog) == ["tou", "other"]
+    assert len(catalog) == 2
+    for key, plan in plans.items():
+        _assert_plans_equal(catalog[key], plan)
+
+    assert catalog["tou"] is catalog["tou"]
+    assert not catalog["tou"].block_rate.flags.writeable
+    assert catalog["tou"].holiday_dates.dtype == np.dtype("datetime64[D]")
+
+    # array columns have 64-bit offsets, such that a catalog may hold more than 2 ** 31 values of any one field
+    schema = pa.ipc.open_file(pa.memory_map(str(tmp_path / "plans.arrow"), "r")).schema
+    assert pa.types.is_large_list(schema.field("block_rate").type)
+
+    index = pd.date_range(start="2023-12-24", end="2023-12-28", freq="1h", tz=UTC, inclusive="left")
+    np.testing.assert_array_equal(
+        catalog["tou"].evaluate(index, -np.ones(len(index))), plans["tou"].evaluate(index, -np.ones(len(index)))
+    )
+
+
+@pytest.mark.parametrize("as_of", list(AsOf))
+def test_tariff_plan_evaluate_market_rate(TOU_TARIFF: TimeOfUseTariff, tmp_path: Path, as_of: AsOf) -> None:
+    """Blocks priced by a MarketRate are charged at the price of each row, for a fleet at once"""
+
+    index = pd.date_range(start="2023-06-01", end="2023-06-03", freq="5min", tz=UTC, inclusive="left")
+    prices = pd.Series(
+        np.random.default_rng(0).uniform(50, 150, 96), pd.date_range("2023-06-01", periods=96, freq="30min", tz=UTC)
+    )
+    market = MarketRate(currency="AUD", times=prices.index.tz_localize(None), prices=prices.to_numpy(), as_of=as_of)
+    charge = TOU_TARIFF.children[1].charge
+    charge.blocks = (replace(charge.blocks[0], rate=market), charge.blocks[1])
+    plan = TOU_TARIFF.compile()
+    usage = np.random.default_rng(1).uniform(0, 1, (len(index), 2))
+
+    import_cost, _ = plan.evaluate(index, -usage)
+    applies = plan.applies(index)[1]
+    expected = np.nan_to_num(market.values_at(index))[:, np.newaxis] * usage  # identity usage is in the first block
+    np.testing.assert_allclose(import_cost[1], np.where(applies[:, np.newaxis], expected, 0.0))
+    assert len(plan.market_offsets) == 2 and list(plan.block_market) == [NO_MARKET, NO_MARKET, 0, NO_MARKET]
+
+    save_plans(tmp_path / "plans.arrow", {"market": plan})
+    _assert_plans_equal(PlanCatalog(tmp_path / "plans.arrow")["market"], plan)
+
+
+def test_plan_catalog_invalid_file_raises(tmp_path: Path) -> None:
+    """"""
+
+    save_plans(tmp_path / "empty.arrow", {})
+    assert len(PlanCatalog(tmp_path / "empty.arrow")) == 0
+
+    table = pa.table({"key": ["tou"]})
+    with pa.OSFile(str(tmp_path / "invalid.arrow"), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    with pytest.raises(ValueError):
+        PlanCatalog(tmp_path / "invalid.arrow")
+
+
+def test_tariff_plan_pickle(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """"""
+
+    plan = TOU_TARIFF.compile()
+    _assert_plans_equal(pickle.loads(pickle.dumps(plan)), plan)
+
+
+def test_tariff_plan_applies_matches_contains(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """The week-minute tables agree with the membership of each child, and of the tariff, at every time"""
+
+    index = pd.date_range(start="2022-12-20", end="2023-01-10", freq="10min", tz=UTC)
+    applies = TOU_TARIFF.compile().applies(index)
+
+    # holidays are only compiled over the years of the tariff
+    in_2023 = index.year == 2023
+    for child, child_applies in zip(TOU_TARIFF.children, applies):
+        assert list(child_applies[in_2023]) == [x.to_pydatetime() in child for x in index[in_2023]]
+
+    is_child_contained = np.array([any(x.to_pydatetime() in child for child in TOU_TARIFF.children) for x in index])
+    np.testing.assert_array_equal(TOU_TARIFF.contains_index(index), in_2023 & is_child_contained)
+
+
+def test_tariff_plan_schedule_groups_children(TOU_TARIFF: TimeOfUseTariff) -> None:
+    """Children which share a timezone and holidays share one table, of 14 rows of 1440 minutes"""
+
+    (group,) = TOU_TARIFF.compile().schedule
+    assert list(group.children) == [0, 1]
+    assert group.table.shape == (14 * 1440, 2)
+    assert not (group.table[:, 0] & group.table[:, 1]).any()
+    assert not group.table[slice(7 * 1440, None)].any()  # both children apply on business days alone
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        ("2022-12-01", "2023-01-06"),  # begins before the tariff
+        ("2023-12-28", "2024-01-05"),  # ends after the tariff
+        ("2024-02-01", "2024-02-03"),  # entirely after the tariff
+    ],
+)
+def test_tariff_plan_evaluate_only_within_validity_window(TOU_TARIFF: TimeOfUseTariff, start: str, end: str) -> None:
+    """Rows outside of [start, end] of the tariff cost nothing, whether or not the index is sorted"""
+
+    index = pd.date_range(start=start, end=end, freq="30min", tz=UTC, inclusive="left")
+    usage = -np.ones((len(index), 2))
+    plan = TOU_TARIFF.compile()
+    import_cost, _ = plan.evaluate(index, usage)
+
+    is_valid = (index >= pd.Timestamp(2023, 1, 1, tz=UTC)) & (index <= pd.Timestamp(2023, 12, 31, tz=UTC))
+    assert not import_cost[:, ~is_valid].any()
+    assert import_cost[:, is_valid].any() == is_valid.any()
+    np.testing.assert_array_equal(TOU_TARIFF.contains_index(index), is_valid & plan.applies(index).any(axis=0))
+
+    order = np.random.default_rng(0).permutation(len(index))
+    np.testing.assert_array_equal(TOU_TARIFF.contains_index(index[order]), TOU_TARIFF.contains_index(index)[order])
@@ -0,0 +1,93 @@
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytariff._internal.segment import segment_cumsum, segment_sum
+from pytariff.core.dataframe.profile import MeterProfileHandler
+from pytariff.core.fixed_point import FixedPoint
+from pytariff.core.precision import Precision
+from pytariff.core.reset import ResetPeriod
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection, UsageChargeMethod
+
+UTC = ZoneInfo("UTC")
+U = 2.0**-24  # the unit roundoff of float32
+
+
+@pytest.fixture
+def TARIFF(DEFAULT_GENERIC_TARIFF: Callable[..., GenericTariff]) -> Callable[..., GenericTariff]:
+    def _tariff(method: UsageChargeMethod, window: Optional[str] = None) -> GenericTariff:
+        return DEFAULT_GENERIC_TARIFF(
+            (0.1234567, 0, float("inf")), reset_period=ResetPeriod.FIRST_OF_MONTH, method=method, window=window
+        )
+
+    return _tariff
+
+
+def test_segment_sums_accumulate_in_float64() -> None:
+    """Sums of float32 values are accumulated, and returned, in float64"""
+
+    values = np.full(2**25, 1.0, dtype=np.float32)  # beyond 2 ** 24, float32 accumulation stalls
+    starts = np.array([0])
+
+    assert segment_sum(values, starts).dtype == np.float64 and segment_sum(values, starts)[0] == 2**25
+    assert segment_cumsum(values, starts)[-1] == 2**25
+    assert segment_sum(np.ones(4, dtype=np.int64), starts).dtype == np.int64
+
+
+@pytest.mark.parametrize(
+    "method, window",
+    [
+        (UsageChargeMethod.identity, None),
+        (UsageChargeMethod.mean, None),
+        (UsageChargeMethod.max, None),
+        (UsageChargeMethod.cumsum, None),
+        (UsageChargeMethod.rolling_mean, "2h"),
+    ],
+)
+def test_tariff_plan_evaluate_single_precision(
+    TARIFF: Callable[..., GenericTariff], method: UsageChargeMethod, window: Optional[str]
+) -> None:
+    """Single precision costs are float32 and within the documented relative error of 4u of double precision costs"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-03-01", freq="5min", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(0, 10, (len(index), 4))
+    plan = TARIFF(method, window).compile()
+
+    double, _ = plan.evaluate(index, -usage)
+    single, export_cost = plan.evaluate(index, -usage, precision=Precision.SINGLE)
+
+    assert single.dtype == export_cost.dtype == np.float32 and single.shape == double.shape
+    np.testing.assert_allclose(single, double, rtol=4 * U)
+    np.testing.assert_allclose(single.sum(axis=1, dtype=np.float64), double.sum(axis=1), rtol=4 * U)
+
+
+def test_fixed_point_requires_double_precision(TARIFF: Callable[..., GenericTariff]) -> None:
+    """"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-01-02", freq="5min", tz=UTC, inclusive="left")
+    with pytest.raises(ValueError):
+        TARIFF(UsageChargeMethod.identity).compile().evaluate(
+            index, np.zeros(len(index)), fixed_point=FixedPoint(), precision=Precision.SINGLE
+        )
+
+
+def test_generic_tariff_apply_to_single_precision(TARIFF: Callable[..., GenericTariff]) -> None:
+    """Child costs are float32, and their totals float64"""
+
+    index = pd.date_range(start="2023-01-01", end="2023-01-03", freq="30min", tz=UTC, inclusive="left")
+    profile = pd.DataFrame({"profile": -np.linspace(0, 5, len(index))}, index=index)
+    unit = TariffUnit(metric=Consumption.kWh, direction=TradeDirection._null, convention=SignConvention.Passive)
+    tariff = TARIFF(UsageChargeMethod.identity)
+
+    double = tariff.apply_to(MeterProfileHandler(profile), unit)
+    single = tariff.apply_to(MeterProfileHandler(profile), unit, precision=Precision.SINGLE)
+
+    child_id = tariff.compile().child_ids[0]
+    assert single[f"cost_import_{child_id}"].dtype == np.float32
+    assert single["total_cost"].dtype == np.float64
+    np.testing.assert_allclose(single["total_cost"], double["total_cost"], rtol=4 * U)
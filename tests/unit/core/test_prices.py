@@ -0,0 +1,102 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from pytariff.core.plan import PlanCatalog, save_plans
+from pytariff.core.prices import PRICES, PriceStore
+from pytariff.core.rate import MarketRate
+from pytariff.core.tariff import GenericTariff
+
+UTC = ZoneInfo("UTC")
+INDEX = pd.date_range(start="2023-01-01", end="2023-01-08", freq="5min", tz=UTC, inclusive="left")
+
+
+@pytest.fixture
+def STORE(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[PriceStore]:
+    monkeypatch.setattr(PRICES, "directory", tmp_path / "prices")
+    PRICES.clear()
+    PRICES.write("NSW1", "AUD", INDEX.tz_localize(None), np.arange(len(INDEX), dtype=np.float64))
+    yield PRICES
+    PRICES.clear()
+
+
+def test_price_store_write_and_map(tmp_path: Path) -> None:
+    """Series are sorted when written, and mapped read-only, once per store"""
+
+    store = PriceStore(tmp_path)
+    times = np.array(["2023-01-01T01:00", "2023-01-01T00:00"], dtype="datetime64[ns]")
+    store.write("VIC1", "AUD", times, [2.0, 1.0])
+
+    assert ("VIC1", "AUD") in store and ("VIC1", "USD") not in store
+    assert [x.name for x in tmp_path.iterdir()] == ["VIC1-AUD.npy"]  # times and prices are replaced together
+    mapped_times, prices = store.series("VIC1", "AUD")
+    assert isinstance(mapped_times, np.memmap) and isinstance(prices, np.memmap)
+    assert list(mapped_times) == sorted(times) and list(prices) == [1.0, 2.0]
+    assert not prices.flags.writeable
+    assert store.series("VIC1", "AUD")[1] is prices
+
+    with pytest.raises(ValueError):
+        store.write("VIC1", "AUD", times[[0, 0]], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        store.write("../VIC1", "AUD", times, [1.0, 2.0])
+    with pytest.raises(ValueError):
+        store.series("QLD1", "AUD")
+    with pytest.raises(ValueError):
+        PriceStore().series("VIC1", "AUD")
+    with pytest.raises(ValueError, match="no directory"):
+        PriceStore().write("VIC1", "AUD", times, [1.0, 2.0])
+
+
+def test_price_store_invalid_file(tmp_path: Path) -> None:
+    """A file which does not hold a row of times and a row of prices is not mapped"""
+
+    np.save(tmp_path / "VIC1-AUD.npy", np.zeros((3, 4), dtype=np.int64))
+    with pytest.raises(ValueError):
+        PriceStore(tmp_path).series("VIC1", "AUD")
+
+
+def test_price_store_range_is_a_view(STORE: PriceStore) -> None:
+    """"""
+
+    times, prices = STORE.range("NSW1", "AUD", datetime(2023, 1, 2, tzinfo=UTC), datetime(2023, 1, 3, tzinfo=UTC))
+
+    assert len(times) == len(prices) == 288
+    assert times[0] == np.datetime64("2023-01-02T00:00", "ns") and prices[0] == 288.0
+    assert np.shares_memory(prices, STORE.series("NSW1", "AUD")[1])
+
+
+def test_market_rate_references_price_store(STORE: PriceStore) -> None:
+    """MarketRates of the store share its mapped series, which plans reference by region and currency"""
+
+    rate = MarketRate(currency="AUD", region="NSW1")
+    assert rate.series[1] is STORE.series("NSW1", "AUD")[1]
+    assert rate == MarketRate(currency="AUD", region="NSW1") and hash(rate) == hash(
+        MarketRate(currency="AUD", region="NSW1")
+    )
+    np.testing.assert_array_equal(rate.values_at(INDEX[slice(10, 20)]), np.arange(10.0, 20.0))
+
+    with pytest.raises(ValidationError):
+        MarketRate(currency="USD", region="NSW1")
+    with pytest.raises(ValidationError):
+        MarketRate(currency="AUD", region="NSW1", prices=[1.0], times=INDEX[:1].tz_localize(None))
+
+
+def test_tariff_plan_evaluate_price_store(
+    DEFAULT_GENERIC_TARIFF: Callable[..., GenericTariff], STORE: PriceStore, tmp_path: Path
+) -> None:
+    """"""
+
+    tariff = DEFAULT_GENERIC_TARIFF((MarketRate(currency="AUD", region="NSW1"), 0, float("inf")))
+    plan = tariff.compile()
+    assert plan.market_region == ("NSW1",) and len(plan.market_prices) == 0
+
+    save_plans(tmp_path / "plans.arrow", {"spot": plan})
+    usage = np.ones((len(INDEX), 2))
+    import_cost, _ = PlanCatalog(tmp_path / "plans.arrow")["spot"].evaluate(INDEX, -usage)
+    np.testing.assert_array_equal(import_cost[0], np.repeat(np.arange(len(INDEX), dtype=np.float64)[:, None], 2, 1))
@@ -0,0 +1,77 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from pytariff.core.rate import AsOf, MarketRate
+
+UTC = ZoneInfo("UTC")
+TIMES = np.array(["2023-01-01T00:00", "2023-01-01T01:00", "2023-01-01T02:00"], dtype="datetime64[ns]")
+PRICES = np.array([10.0, 20.0, 40.0])
+
+
+@pytest.mark.parametrize(
+    "as_of, expected",
+    [
+        (AsOf.PREVIOUS, [np.nan, 10.0, 10.0, 20.0, 40.0, 40.0]),
+        (AsOf.NEXT, [10.0, 10.0, 20.0, 20.0, 40.0, np.nan]),
+        (AsOf.INTERPOLATE, [np.nan, 10.0, 15.0, 20.0, 40.0, np.nan]),
+    ],
+)
+def test_market_rate_values_at(as_of: AsOf, expected: list[float]) -> None:
+    """"""
+
+    rate = MarketRate(currency="AUD", times=TIMES, prices=PRICES, as_of=as_of)
+    index = pd.DatetimeIndex(
+        [
+            "2022-12-31T23:00",
+            "2023-01-01T00:00",
+            "2023-01-01T00:30",
+            "2023-01-01T01:00",
+            "2023-01-01T02:00",
+            "2023-01-02",
+        ],
+        tz=UTC,
+    )
+
+    np.testing.assert_array_equal(rate.values_at(index), expected)
+    np.testing.assert_array_equal(rate.values_at(index.tz_convert("Australia/Sydney")), expected)
+    assert rate.get_value(datetime(2023, 1, 1, 1, tzinfo=UTC)) == 20.0
+
+
+def test_market_rate_from_rate_lookup() -> None:
+    """A rate_lookup, given by keyword or position, is sorted into arrays of times and prices, and kept as given"""
+
+    sydney = ZoneInfo("Australia/Sydney")
+    rate_lookup = {datetime(2023, 1, 1, 12, tzinfo=sydney): 20.0, datetime(2023, 1, 1, 0, tzinfo=UTC): 10.0}
+    rate = MarketRate(currency="AUD", rate_lookup=rate_lookup)
+
+    assert rate.rate_lookup == rate_lookup and rate.times is None
+    assert rate == MarketRate(rate_lookup, "AUD")
+    assert list(rate.series[0]) == list(TIMES[:2])
+    assert list(rate.series[1]) == [10.0, 20.0]
+    assert not rate.series[0].flags.writeable
+    assert rate == MarketRate(currency="AUD", times=TIMES[:2], prices=[10.0, 20.0])
+    assert hash(rate) == hash(MarketRate(currency="AUD", times=TIMES[:2][::-1], prices=[20.0, 10.0]))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"currency": "", "times": TIMES, "prices": PRICES},
+        {"times": TIMES},
+        {"times": TIMES, "prices": PRICES[:2]},
+        {"times": TIMES[[0, 0, 1]], "prices": PRICES},  # duplicate times
+        {"rate_lookup": {datetime(2023, 1, 1): 1.0}},  # naive
+        {"rate_lookup": {datetime(2023, 1, 1, tzinfo=UTC): 1.0}, "times": TIMES, "prices": PRICES},
+    ],
+)
+def test_market_rate_invalid_series(kwargs: dict) -> None:
+    """"""
+
+    with pytest.raises(ValidationError):
+        MarketRate(**{"currency": "AUD", **kwargs})
@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Callable, Iterator
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from pytariff._internal.segment import segment_quantile, segment_sum
+from pytariff.core.plan import PlanCatalog, save_plans
+from pytariff.core.reducer import REDUCERS, ReducerRegistry
+from pytariff.core.reset import ResetPeriod
+from pytariff.core.tariff import GenericTariff
+from pytariff.core.unit import UsageChargeMethod
+
+UTC = ZoneInfo("UTC")
+
+
+def _p95(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    return segment_quantile(values, starts, 0.95)
+
+
+@pytest.fixture
+def P95() -> Iterator[str]:
+    REDUCERS.register("test_p95", _p95)
+    yield "test_p95"
+    REDUCERS.unregister("test_p95")
+
+
+@pytest.fixture
+def TARIFF(DEFAULT_GENERIC_TARIFF: Callable[..., GenericTariff]) -> Callable[[str], GenericTariff]:
+    def _tariff(reducer: str) -> GenericTariff:
+        return DEFAULT_GENERIC_TARIFF(
+            (1.0, 0, 100), reset_period=ResetPeriod.DAILY, method=UsageChargeMethod.registered, reducer=reducer
+        )
+
+    return _tariff
+
+
+def test_reducer_registry() -> None:
+    """"""
+
+    registry = ReducerRegistry()
+    assert registry.register("p95", _p95) is _p95
+    registry.register("p95", _p95)  # registering the same reducer again is allowed
+    assert "p95" in registry and len(registry) == 1 and list(registry) == ["p95"]
+
+    with pytest.raises(ValueError):
+        registry.register("p95", segment_sum)
+    registry.register("p95", segment_sum, replace=True)
+    assert registry.get("p95") is segment_sum
+
+    with pytest.raises(ValueError):
+        registry.register("", _p95)
+    with pytest.raises(ValueError):
+        registry.register("bad", lambda values: values)  # type: ignore
+
+    registry.unregister("p95")
+    with pytest.raises(ValueError):
+        registry.get("p95")
+
+
+def test_reducer_registry_reduce_checks_shape() -> None:
+    """"""
+
+    registry = ReducerRegistry()
+    registry.register("identity", lambda values, starts: values)
+    with pytest.raises(ValueError):
+        registry.reduce("identity", np.arange(4.0), np.array([0, 2]))
+
+
+def test_charge_reducer_must_be_registered(TARIFF: Callable[[str], GenericTariff]) -> None:
+    """"""
+
+    with pytest.raises(ValidationError):
+        TARIFF("test_unregistered")
+
+
+@pytest.mark.parametrize("shape", [(72,), (72, 3)])
+def test_tariff_plan_evaluate_registered_reducer(
+    TARIFF: Callable[[str], GenericTariff], P95: str, shape: tuple[int, ...]
+) -> None:
+    """The registered reducer is applied to every reset period (of every meter) at once"""
+
+    index = pd.date_range(start="2023-03-01", end="2023-03-04", freq="1h", tz=UTC, inclusive="left")
+    usage = np.random.default_rng(0).uniform(0, 10, shape)
+    plan = TARIFF(P95).compile()
+    import_cost, _ = plan.evaluate(index, -usage)
+
+    days = usage.reshape((3, 24) + shape[1:])
+    expected = np.repeat(np.quantile(days, 0.95, axis=1), 24, axis=0)
+    np.testing.assert_allclose(import_cost[0], expected)
+    assert plan.child_reducer == (P95,)
+
+
+def test_registered_reducer_round_trips_by_name(
+    TARIFF: Callable[[str], GenericTariff], P95: str, tmp_path: Path
+) -> None:
+    """Plans reference reducers by name, resolved when the plan is evaluated"""
+
+    save_plans(tmp_path / "plans.arrow", {"p95": TARIFF(P95).compile()})
+    plan = PlanCatalog(tmp_path / "plans.arrow")["p95"]
+    assert plan.child_reducer == (P95,)
+
+    index = pd.date_range(start="2023-03-01", end="2023-03-02", freq="1h", tz=UTC, inclusive="left")
+    usage = np.arange(24.0)
+    np.testing.assert_allclose(plan.evaluate(index, -usage)[0][0], np.quantile(usage, 0.95))
+
+    REDUCERS.unregister(P95)
+    with pytest.raises(ValueError):
+        plan.evaluate(index, -usage)
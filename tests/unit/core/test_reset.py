@@ -1,7 +1,11 @@
 from datetime import datetime
+from zoneinfo import ZoneInfo
+import pandas as pd
 import pytest
 
-from pytariff.core.reset import ResetPeriod
+from pydantic import ValidationError
+
+from pytariff.core.reset import Ratchet, ResetData, ResetPeriod
 
 
 @pytest.mark.parametrize(
@@ -34,3 +38,40 @@ def test_reset_period_count_occurences_method(
     and until the 'until' time that the given ResetPeriod has occurred"""
 
     assert reset_period.count_occurences(until=until_datetime, reference=ref_datetime) == exp_num_occurences
+
+
+@pytest.mark.parametrize(
+    "reset_period, ref_datetime",
+    [
+        (ResetPeriod.QUARTER_HOURLY, datetime(2023, 1, 1, 0, 7, tzinfo=ZoneInfo("UTC"))),
+        (ResetPeriod.HOURLY, datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC"))),
+        (ResetPeriod.DAILY, datetime(2023, 1, 1, 6, tzinfo=ZoneInfo("Australia/Brisbane"))),
+        (ResetPeriod.WEEKLY, datetime(2023, 1, 3, tzinfo=ZoneInfo("UTC"))),
+        (ResetPeriod.FIRST_OF_MONTH, datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC"))),
+        (ResetPeriod.FIRST_OF_MONTH, datetime(2023, 1, 17, 12, tzinfo=ZoneInfo("Australia/Brisbane"))),
+        (ResetPeriod.FIRST_OF_QUARTER, datetime(2023, 2, 2, tzinfo=ZoneInfo("UTC"))),
+    ],
+)
+def test_reset_period_period_ids_match_count_occurences(reset_period: ResetPeriod, ref_datetime: datetime) -> None:
+    """The vectorised period ids must agree with the scalar count at every element of the index"""
+
+    index = pd.date_range(start="2022-12-31T13:00:00", end="2023-12-31", freq="7h13min", tz=ZoneInfo("UTC"))
+    expected = [reset_period.count_occurences(until=t.to_pydatetime(), reference=ref_datetime) for t in index]
+    assert list(reset_period._period_ids(index, reference=ref_datetime)) == expected
+
+
+@pytest.mark.parametrize(
+    "percentage, periods, raises", [(80.0, 11, False), (100.0, 1, False), (0.0, 11, True), (80.0, 0, True)]
+)
+def test_ratchet_validation(percentage: float, periods: int, raises: bool) -> None:
+    """"""
+
+    if raises:
+        with pytest.raises(ValidationError):
+            Ratchet(percentage=percentage, periods=periods)
+    else:
+        ratchet = Ratchet(percentage=percentage, periods=periods)
+        anchor = datetime(2023, 1, 1, tzinfo=ZoneInfo("UTC"))
+        assert ResetData(anchor=anchor, period=ResetPeriod.FIRST_OF_MONTH, ratchet=ratchet) != ResetData(
+            anchor=anchor, period=ResetPeriod.FIRST_OF_MONTH
+        )
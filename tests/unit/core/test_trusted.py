@@ -0,0 +1,133 @@
+from datetime import datetime, time
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from pytariff.core.block import TariffBlock
+from pytariff.core.charge import TariffCharge
+from pytariff.core.day import DayType, DaysApplied
+from pytariff.core.interval import TariffInterval
+from pytariff.core.rate import TariffRate
+from pytariff.core.reset import ResetData, ResetPeriod
+from pytariff.core.tariff import TimeOfUseTariff
+from pytariff.core.trusted import construct, validate_tree
+from pytariff.core.typing import Consumption
+from pytariff.core.unit import SignConvention, TariffUnit, TradeDirection
+
+UTC = ZoneInfo("UTC")
+UNIT = TariffUnit(metric=Consumption.kWh, direction=TradeDirection.Import, convention=SignConvention.Passive)
+DAYS_APPLIED = DaysApplied(day_types=(DayType.ALL_DAYS,))
+
+
+def _charge(*blocks: tuple[float, float]) -> TariffCharge:
+    return construct(
+        TariffCharge,
+        blocks=tuple(
+            construct(TariffBlock, rate=TariffRate("AUD", 1.0), from_quantity=lo, to_quantity=hi) for lo, hi in blocks
+        ),
+        unit=UNIT,
+        reset_data=construct(ResetData, anchor=datetime(2023, 1, 1, tzinfo=UTC), period=ResetPeriod.DAILY),
+    )
+
+
+def _tou_tariff(peak_blocks: tuple[tuple[float, float], ...] = ((0, float("inf")),)) -> TimeOfUseTariff:
+    charge = _charge((0, float("inf")))
+    return construct(
+        TimeOfUseTariff,
+        start=datetime(2023, 1, 1),
+        end=datetime(2023, 12, 31),
+        tzinfo=UTC,
+        children=(
+            construct(
+                TariffInterval,
+                start_time=time(0, tzinfo=UTC),
+                end_time=time(12, tzinfo=UTC),
+                days_applied=DAYS_APPLIED,
+                tzinfo=UTC,
+                charge=_charge(*peak_blocks),
+            ),
+            construct(
+                TariffInterval,
+                start_time=time(12, tzinfo=UTC),
+                end_time=time(23, 59, tzinfo=UTC),
+                days_applied=DAYS_APPLIED,
+                tzinfo=UTC,
+                charge=charge,
+            ),
+        ),
+    )
+
+
+def test_construct_matches_validated_construction() -> None:
+    """"""
+
+    trusted = _tou_tariff()
+    validated = TimeOfUseTariff(
+        start=datetime(2023, 1, 1),
+        end=datetime(2023, 12, 31),
+        tzinfo=UTC,
+        children=trusted.children,
+    )
+
+    assert isinstance(trusted, TimeOfUseTariff)
+    assert trusted.children == validated.children
+    assert isinstance(trusted.uuid, UUID) and trusted.uuid != validated.uuid
+    assert isinstance(trusted.children[0].charge.blocks[0].uuid, UUID)
+
+
+def test_construct_skips_validation() -> None:
+    """"""
+
+    # an inverted block would fail validation, but is accepted as-is when trusted
+    block = construct(TariffBlock, rate=None, from_quantity=10.0, to_quantity=0.0)
+    assert (block.from_quantity, block.to_quantity) == (10.0, 0.0)
+
+    # a naive start is not made aware, as it is by the validators
+    assert _tou_tariff().start.tzinfo is None
+
+
+def test_construct_missing_field_raises() -> None:
+    """"""
+
+    with pytest.raises(ValueError):
+        construct(TariffBlock, rate=None, from_quantity=0.0)
+
+    with pytest.raises(ValueError):
+        construct(TariffInterval, start_time=None, end_time=None, days_applied=DAYS_APPLIED)
+
+
+def test_validate_tree() -> None:
+    """"""
+
+    tariff = validate_tree(_tou_tariff())
+
+    # validators which normalise their models are applied
+    assert tariff.start == datetime(2023, 1, 1, tzinfo=UTC)
+    assert tariff.end == datetime(2023, 12, 31, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    "peak_blocks",
+    [
+        ((0, 10), (5, float("inf"))),  # blocks overlap
+        ((10, 0),),  # block from_quantity > to_quantity
+    ],
+)
+def test_validate_tree_raises(peak_blocks: tuple[tuple[float, float], ...]) -> None:
+    """"""
+
+    with pytest.raises(ValueError):
+        validate_tree(_tou_tariff(peak_blocks))
+
+
+def test_validate_tree_validates_shared_models_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """"""
+
+    calls = []
+    validator = DaysApplied.__pydantic_decorators__.model_validators["validate_holidays_present_if_day_type_holidays"]
+    monkeypatch.setattr(validator, "func", lambda days_applied: calls.append(days_applied) or days_applied)
+
+    # both children share DAYS_APPLIED
+    validate_tree(_tou_tariff())
+    assert calls == [DAYS_APPLIED]